@@ -0,0 +1,609 @@
+"""
+Offline benchmark for the assessment pipeline.
+
+Starts local stand-ins for the Ollama (/api/tags, /api/generate) and Hugging Face inference
+HTTP APIs, installs stub Gemini, Groq and Cohere clients in main's provider client registry,
+and runs steps 1-4 end to end with scripted answers. Every stand-in has a configurable
+latency distribution, error rate and timeout rate. The report covers assessment and step
+latency percentiles, provider calls per assessment and what fallbacks cost.
+
+    python benchmark.py --assessments 20 --concurrency 4 --profile flaky
+
+Latencies in the profiles are in realistic seconds and are multiplied by --time-scale
+(default 0.02) before sleeping, so a run finishes quickly; reported latencies are scaled
+back to simulated seconds.
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import re
+import logging
+import argparse
+import tempfile
+import threading
+import contextlib
+import statistics
+from types import SimpleNamespace
+from functools import partial
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+CLIENT_TIMEOUT = 60 # Simulated seconds before a provider call times out (main's default)
+
+
+class ProviderProfile:
+    """
+    Behaviour of one stand-in provider: lognormal latency around `median_latency` seconds,
+    plus the fraction of requests that fail outright or hang past the client timeout. With
+    `rpm`, requests beyond that many per (simulated) minute are answered with 429.
+    """
+
+    def __init__(self, median_latency=1.0, sigma=0.4, error_rate=0.0, timeout_rate=0.0, rpm=None):
+        self.median_latency = median_latency
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.rpm = rpm
+
+    def sample(self, rng):
+        """
+        Returns ("ok" | "error" | "timeout", latency in simulated seconds).
+        """
+        latency = rng.lognormvariate(math.log(self.median_latency), self.sigma)
+        roll = rng.random()
+        if roll < self.timeout_rate:
+            return "timeout", CLIENT_TIMEOUT
+        if roll < self.timeout_rate + self.error_rate:
+            return "error", latency * 0.2
+        return "ok", latency
+
+
+PROFILES = {
+    "healthy": {
+        "ollama": ProviderProfile(4.0, 0.5),
+        "gemini": ProviderProfile(1.5, 0.3),
+        "huggingface": ProviderProfile(2.0, 0.5),
+        "groq": ProviderProfile(0.6, 0.3),
+        "cohere": ProviderProfile(1.2, 0.3),
+    },
+    "flaky": {
+        "ollama": ProviderProfile(4.0, 0.8, timeout_rate=0.15),
+        "gemini": ProviderProfile(1.5, 0.5, error_rate=0.3),
+        "huggingface": ProviderProfile(2.0, 0.5, error_rate=0.2),
+        "groq": ProviderProfile(0.6, 0.3, error_rate=0.1),
+        "cohere": ProviderProfile(1.2, 0.3),
+    },
+    "ollama-down": {
+        "ollama": None, # No server: connection refused
+        "gemini": ProviderProfile(1.5, 0.3),
+        "huggingface": ProviderProfile(2.0, 0.5),
+        "groq": ProviderProfile(0.6, 0.3),
+        "cohere": ProviderProfile(1.2, 0.3),
+    },
+    "quota": {
+        "ollama": ProviderProfile(4.0, 0.5),
+        "gemini": ProviderProfile(1.5, 0.3, rpm=15),
+        "huggingface": ProviderProfile(2.0, 0.5, rpm=30),
+        "groq": ProviderProfile(0.6, 0.3, rpm=30),
+        "cohere": ProviderProfile(1.2, 0.3, rpm=20),
+    },
+    "gemini-down": {
+        "ollama": ProviderProfile(4.0, 0.5),
+        "gemini": ProviderProfile(1.5, 0.3, error_rate=1.0),
+        "huggingface": ProviderProfile(2.0, 0.5),
+        "groq": ProviderProfile(0.6, 0.3),
+        "cohere": ProviderProfile(1.2, 0.3),
+    },
+}
+
+
+def load_profiles(path):
+    """
+    Returns PROFILES extended with the profiles in a JSON file shaped like
+    {"profile": {"provider": {"median_latency": 2.0, "error_rate": 0.1, ...} or null}}.
+    A profile named like a built-in one starts from it, a new one from "healthy", and each
+    provider starts from its settings there, so only what changes needs to be given.
+    null removes that provider's stand-in, as in "ollama-down".
+    """
+    with open(path) as f:
+        overrides = json.load(f)
+    if not isinstance(overrides, dict):
+        raise ValueError(f"{path}: expected a JSON object of profiles.")
+    profiles = dict(PROFILES)
+    for name, providers in overrides.items():
+        base = PROFILES.get(name, PROFILES["healthy"])
+        profile = dict(base)
+        for provider, fields in (providers or {}).items():
+            if provider not in PROFILES["healthy"]:
+                raise ValueError(f"{path}: unknown provider '{provider}' in profile '{name}'.")
+            if fields is None:
+                profile[provider] = None
+                continue
+            start = base.get(provider) or PROFILES["healthy"][provider]
+            try:
+                profile[provider] = ProviderProfile(**{**vars(start), **fields})
+            except TypeError as e:
+                raise ValueError(f"{path}: bad settings for {provider} in profile '{name}': {e}") from None
+        profiles[name] = profile
+    return profiles
+
+
+def scripted_response(prompt):
+    """
+    Plausible output for each prompt the pipeline sends.
+    """
+    if "key checkpoints" in prompt:
+        return json.dumps(["Technical readiness", "Regulatory compliance", "Financial feasibility", "Market demand"])
+    if "JSON object that maps each checklist item" in prompt:
+        items = re.findall(r"^\s*- (.+)$", prompt, re.MULTILINE)
+        return json.dumps({item: ["Is there documented evidence for this?", "Who owns this and by when?"]
+                           for item in items})
+    if "validation questions" in prompt:
+        return json.dumps(["Is there documented evidence for this?", "Who owns this and by when?"])
+    if "CONCLUSION: PROCEED" in prompt:
+        return "CONCLUSION: PROCEED\nThe checklist answers support feasibility. Next: pilot and review."
+    if "Persona" in prompt:
+        return "1. The main risks have mitigations.\n2. The budget covers the first phase.\n3. Scope is realistic."
+    return "Each checkpoint looks reasonably addressed; regulatory evidence needs more detail."
+
+
+def _chunks(text, size=3):
+    words = text.split(" ")
+    for idx in range(0, len(words), size):
+        yield " ".join(words[idx:idx + size]) + (" " if idx + size < len(words) else "")
+
+
+class StubRateLimitError(Exception):
+    """
+    What the SDK stand-ins raise for a 429, shaped like the real SDKs' rate-limit errors.
+    """
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"{name} stand-in: 429 Too Many Requests")
+        self.status_code = 429
+        self.headers = {"retry-after": f"{retry_after:.3f}"}
+
+
+class StandIn:
+    """
+    Shared behaviour of a stand-in provider: samples an outcome from its profile, sleeps for
+    the scaled latency and either returns a scripted response or raises.
+    """
+
+    def __init__(self, name, profile, time_scale, seed):
+        self.name = name
+        self.profile = profile
+        self.time_scale = time_scale
+        self.rate_limited = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._accepted = deque() # Times of requests inside the current quota window
+
+    def sample(self):
+        """
+        Returns (outcome, simulated seconds); outcome "rate_limited" comes with the Retry-After
+        delay in real seconds.
+        """
+        with self._lock:
+            if self.profile.rpm:
+                now, window = time.time(), 60 * self.time_scale
+                while self._accepted and self._accepted[0] <= now - window:
+                    self._accepted.popleft()
+                if len(self._accepted) >= self.profile.rpm:
+                    self.rate_limited += 1
+                    return "rate_limited", self._accepted[0] + window - now
+                self._accepted.append(now)
+            return self.profile.sample(self._rng)
+
+    def respond(self, prompt, timeout=None):
+        """
+        `timeout` is the client's timeout in real seconds, as main passes it to the SDK.
+        """
+        timeout = CLIENT_TIMEOUT if timeout is None else min(CLIENT_TIMEOUT, timeout / self.time_scale)
+        outcome, latency = self.sample()
+        if outcome == "rate_limited":
+            raise StubRateLimitError(self.name, latency)
+        if outcome == "timeout" or latency >= timeout:
+            time.sleep(timeout * self.time_scale)
+            raise TimeoutError(f"{self.name} stand-in timed out")
+        time.sleep(latency * self.time_scale)
+        if outcome == "error":
+            raise RuntimeError(f"{self.name} stand-in returned a simulated 500")
+        return scripted_response(prompt)
+
+
+# --- HTTP stand-ins ---
+def _json_body(handler):
+    length = int(handler.headers.get("Content-Length", 0))
+    return json.loads(handler.rfile.read(length) or b"{}")
+
+
+def _send_json(handler, status, payload, headers=None):
+    body = json.dumps(payload).encode()
+    handler.send_response(status)
+    for name, value in (headers or {}).items():
+        handler.send_header(name, value)
+    handler.send_header("Content-Type", "application/json")
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+def make_ollama_handler(stand_in, model_name):
+    class OllamaHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path == "/api/tags":
+                _send_json(self, 200, {"models": [{"name": model_name}]})
+            else:
+                body = b"Ollama is running"
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        def do_POST(self):
+            payload = _json_body(self)
+            if self.path != "/api/generate":
+                _send_json(self, 404, {"error": "not found"})
+                return
+            outcome, latency = stand_in.sample()
+            if outcome == "timeout":
+                time.sleep(CLIENT_TIMEOUT * stand_in.time_scale * 1.5) # Outlive the client's timeout
+                return
+            time.sleep(latency * stand_in.time_scale)
+            if outcome == "error":
+                _send_json(self, 500, {"error": "simulated model failure"})
+                return
+            text = scripted_response(payload.get("prompt", ""))
+            if not payload.get("stream", True):
+                _send_json(self, 200, {"model": payload.get("model"), "response": text, "done": True})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for chunk in _chunks(text):
+                self.wfile.write((json.dumps({"response": chunk, "done": False}) + "\n").encode())
+            self.wfile.write((json.dumps({"response": "", "done": True}) + "\n").encode())
+            self.close_connection = True
+
+    return OllamaHandler
+
+
+def make_huggingface_handler(stand_in):
+    class HuggingFaceHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            payload = _json_body(self)
+            outcome, latency = stand_in.sample()
+            if outcome == "rate_limited":
+                _send_json(self, 429, {"error": "Rate limit reached"}, {"Retry-After": f"{latency:.3f}"})
+                return
+            if outcome == "timeout":
+                time.sleep(CLIENT_TIMEOUT * stand_in.time_scale * 1.5)
+                return
+            time.sleep(latency * stand_in.time_scale)
+            if outcome == "error":
+                _send_json(self, 503, {"error": "Model is currently loading"})
+                return
+            _send_json(self, 200, [{"generated_text": scripted_response(payload.get("inputs", ""))}])
+
+    return HuggingFaceHandler
+
+
+def start_server(handler_class):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=f"stand-in-{server.server_address[1]}", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# --- SDK stand-ins ---
+class StubGeminiModel:
+    model_name = "models/gemini-1.5-flash-latest"
+
+    def __init__(self, stand_in):
+        self.stand_in = stand_in
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        text = self.stand_in.respond(prompt, (request_options or {}).get("timeout"))
+        if stream:
+            return (SimpleNamespace(text=chunk) for chunk in _chunks(text))
+        return SimpleNamespace(text=text)
+
+
+class StubGroqClient:
+    def __init__(self, stand_in):
+        self.stand_in = stand_in
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.models = SimpleNamespace(list=lambda: [])
+
+    def _create(self, messages, model, stream=False, timeout=None, **kwargs):
+        text = self.stand_in.respond(messages[-1]["content"], timeout)
+        if stream:
+            return (SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))]) for chunk in _chunks(text))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class StubCohereClient:
+    def __init__(self, stand_in):
+        self.stand_in = stand_in
+        self.models = SimpleNamespace(list=lambda: [])
+
+    def chat(self, model, message, request_options=None, **kwargs):
+        return SimpleNamespace(text=self.stand_in.respond(message, (request_options or {}).get("timeout_in_seconds")))
+
+    def chat_stream(self, model, message, request_options=None, **kwargs):
+        text = self.stand_in.respond(message, (request_options or {}).get("timeout_in_seconds"))
+        return (SimpleNamespace(event_type="text-generation", text=chunk) for chunk in _chunks(text))
+
+
+# --- Harness ---
+def percentile(values, pct):
+    """
+    Nearest-rank percentile; 0.0 for an empty list.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _latency_stats(values):
+    return {
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "max": round(max(values), 3) if values else 0.0,
+        "mean": round(statistics.fmean(values), 3) if values else 0.0,
+    }
+
+
+def prepare_environment(trace_path, profile=None, time_scale=1.0, client_limits=True):
+    """
+    Configures main through its environment variables. Must run before main is imported.
+    Client-side rate limits mirror the stand-ins' quotas on the benchmark's clock, or are
+    disabled with client_limits=False.
+    """
+    for name in ("GEMINI", "HUGGINGFACE", "GROQ", "COHERE"):
+        spec = (profile or {}).get(name.lower())
+        rpm = spec.rpm if spec is not None and spec.rpm and client_limits else 0
+        os.environ[f"{name}_RPM"] = str(int(rpm / time_scale))
+        os.environ[f"{name}_TPM"] = "0"
+    os.environ.update({
+        "RATE_LIMIT_MAX_WAIT": str(120 * time_scale),
+        "RATE_LIMIT_FALLBACK_WAIT": str(5 * time_scale),
+        "RATE_LIMIT_BACKOFF_BASE": str(1 * time_scale),
+        "RATE_LIMIT_MAX_BACKOFF": str(60 * time_scale),
+        "HEALTH_UNKNOWN_LATENCY": str(10 * time_scale), # Compared against the scaled deadlines
+        "HEALTH_OPEN_SECONDS": str(30 * time_scale),
+        "HEALTH_MAX_OPEN_SECONDS": str(600 * time_scale),
+        "HEALTH_TRIAL_TIMEOUT": str(120 * time_scale),
+        "HEALTH_PROBE_INTERVAL": str(10 * time_scale),
+        "HTTP_RETRY_BACKOFF": str(0.5 * time_scale), # urllib3's back-off before retrying the stand-ins' 503s
+        "PROVIDER_HEDGE_DELAY": str(5 * time_scale),
+        "GEMINI_API_KEY": "benchmark",
+        "HUGGINGFACE_API_TOKEN": "benchmark",
+        "GROQ_API_KEY": "benchmark",
+        "COHERE_API_KEY": "benchmark",
+        "RESPONSE_CACHE_BACKEND": "none", # Every assessment should reach the stand-ins
+        "SEMANTIC_CACHE": "0",
+        "METRICS_TRACE_PATH": trace_path,
+        "METRICS_PROMETHEUS_PATH": "",
+    })
+
+
+def install_stand_ins(main, profile, time_scale, seed):
+    """
+    Starts the HTTP stand-ins and registers the SDK stubs with main. Returns the servers and
+    the stand-ins by provider name.
+    """
+    stand_ins = {name: StandIn(name, spec, time_scale, seed + idx)
+                 for idx, (name, spec) in enumerate(profile.items()) if spec is not None}
+    servers = []
+
+    if "ollama" in stand_ins:
+        server, url = start_server(make_ollama_handler(stand_ins["ollama"], main.OLLAMA_MODEL_CONFIG))
+        servers.append(server)
+        main.OLLAMA_BASE_URL = url
+    else:
+        main.OLLAMA_BASE_URL = "http://127.0.0.1:9" # Nothing listens here: connection refused
+    if "huggingface" in stand_ins:
+        server, url = start_server(make_huggingface_handler(stand_ins["huggingface"]))
+        servers.append(server)
+        main.HUGGINGFACE_API_URL = url
+
+    stubs = {"gemini": StubGeminiModel, "groq": StubGroqClient, "cohere": StubCohereClient}
+    for name, stub_class in stubs.items():
+        if name in stand_ins:
+            main._provider_clients[name] = stub_class(stand_ins[name])
+
+    # The HTTP providers honour main's timeouts, scaled to the benchmark's clock
+    scaled_timeout = CLIENT_TIMEOUT * time_scale
+    main.PROVIDER_QUERIES["ollama"] = partial(main.query_ollama, timeout=scaled_timeout)
+    main.PROVIDER_QUERIES["huggingface"] = partial(main.query_huggingface, timeout=scaled_timeout)
+    main.PROVIDER_STREAMS["ollama"] = partial(main.stream_ollama, timeout=scaled_timeout)
+    return servers, stand_ins
+
+
+def run_benchmark(assessments=20, concurrency=4, profile_name="healthy", time_scale=0.02,
+                  dispatch_mode=None, seed=7, verbose=False, client_limits=True, industries=0, deadline=None,
+                  profiles=None):
+    """
+    Runs `assessments` full assessments against the stand-ins and returns the report dict.
+    With industries > 0, assessments cycle through that many industries, so concurrent
+    assessments send identical step 1 and step 2 prompts. `deadline` overrides main's
+    ASSESSMENT_DEADLINE (simulated seconds; 0 disables it). `profiles` replaces PROFILES,
+    e.g. with the result of load_profiles.
+    """
+    profile = (profiles or PROFILES)[profile_name]
+    trace_file = tempfile.NamedTemporaryFile(prefix="benchmark_trace_", suffix=".jsonl", delete=False)
+    trace_file.close()
+    prepare_environment(trace_file.name, profile, time_scale, client_limits)
+    import main
+
+    if not verbose:
+        for handler in logging.getLogger().handlers:
+            handler.setLevel(logging.CRITICAL)
+    if dispatch_mode:
+        main.PROVIDER_DISPATCH_MODE = dispatch_mode
+    if deadline is not None:
+        main.ASSESSMENT_DEADLINE = deadline
+    assessment_deadline = main.ASSESSMENT_DEADLINE
+    # Deadlines run on the real clock; put them on the benchmark's
+    main.ASSESSMENT_DEADLINE *= time_scale
+    main.STEP_DEADLINES = {kind: seconds * time_scale for kind, seconds in main.STEP_DEADLINES.items()}
+
+    servers, stand_ins = install_stand_ins(main, profile, time_scale, seed)
+    main.check_ollama_server()
+
+    def assess(idx):
+        data = {}
+        started = time.time()
+        industry = f"Benchmark industry {idx % industries if industries > 0 else idx}"
+        main.run_assessment(data, industry=industry, answer_fn=lambda item, q_idx, q_text: "Yes, documented and on track.")
+        return (time.time() - started) / time_scale
+
+    started = time.time()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+         ThreadPoolExecutor(max_workers=concurrency) as pool:
+        assessment_latencies = list(pool.map(assess, range(assessments)))
+    wall_clock = time.time() - started
+
+    for server in servers:
+        server.shutdown()
+
+    with open(trace_file.name) as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    os.unlink(trace_file.name)
+
+    calls = [e for e in events if e["type"] == "provider_call" and e["outcome"] not in ("skipped", "coalesced")]
+    coalesced = sum(1 for e in events if e["type"] == "provider_call" and e["outcome"] == "coalesced")
+    deadline_calls = [e for e in events if e["type"] == "provider_call" and "deadline" in (e["error"] or "")]
+    dispatches = [e for e in events if e["type"] == "dispatch"]
+    steps = {}
+    for e in events:
+        if e["type"] == "step":
+            steps.setdefault(e["step"], []).append(e["latency_s"] / time_scale)
+    providers = {}
+    for e in calls:
+        entry = providers.setdefault(e["provider"], {"calls": 0, "failures": 0, "latencies": []})
+        entry["calls"] += 1
+        entry["failures"] += e["outcome"] == "failure"
+        entry["latencies"].append(e["latency_s"] / time_scale)
+    failed_call_seconds = sum(e["latency_s"] for e in calls if e["outcome"] == "failure") / time_scale
+
+    return {
+        "profile": profile_name,
+        "dispatch_mode": main.PROVIDER_DISPATCH_MODE,
+        "assessments": assessments,
+        "concurrency": concurrency,
+        "time_scale": time_scale,
+        "wall_clock_seconds": round(wall_clock, 3),
+        "assessment_latency": _latency_stats(assessment_latencies),
+        "step_latency": {step: _latency_stats(values) for step, values in steps.items()},
+        "industries": industries,
+        "calls_per_assessment": round(len(calls) / assessments, 2),
+        "coalesced_per_assessment": round(coalesced / assessments, 2),
+        "providers": {name: {"calls": p["calls"], "failures": p["failures"], **_latency_stats(p["latencies"])}
+                      for name, p in sorted(providers.items())},
+        "rate_limits": {
+            name: {"429s": stand_ins[name].rate_limited if name in stand_ins else 0,
+                   "queued_seconds": round(limiter["queued_seconds"] / time_scale, 3),
+                   "queue_timeouts": limiter["queue_timeouts"]}
+            for name, limiter in main.rate_limit_report().items()
+        },
+        "deadline": {
+            "assessment_seconds": assessment_deadline,
+            "assessments_over": sum(1 for latency in assessment_latencies if assessment_deadline and latency > assessment_deadline),
+            "calls_skipped": sum(1 for e in deadline_calls if e["outcome"] == "skipped"),
+            "calls_cut_short": sum(1 for e in deadline_calls if e["outcome"] == "failure"),
+        },
+        "fallback": {
+            "hops_per_assessment": round(sum(d["fallback_hops"] for d in dispatches) / assessments, 2),
+            "failed_call_seconds_per_assessment": round(failed_call_seconds / assessments, 3),
+            "dispatches_with_no_answer": sum(1 for d in dispatches if d["winner"] is None),
+        },
+    }
+
+
+def print_report(report):
+    print(f"📊 Benchmark: profile={report['profile']} mode={report['dispatch_mode']} "
+          f"assessments={report['assessments']} concurrency={report['concurrency']} "
+          f"(wall clock {report['wall_clock_seconds']}s at time scale {report['time_scale']})")
+    print("   All latencies below are in simulated seconds.")
+    lat = report["assessment_latency"]
+    print(f"   Assessment latency: p50 {lat['p50']}s, p95 {lat['p95']}s, max {lat['max']}s")
+    for step, st in report["step_latency"].items():
+        print(f"   {step}: p50 {st['p50']}s, p95 {st['p95']}s")
+    print(f"   Provider calls per assessment: {report['calls_per_assessment']} "
+          f"(+{report['coalesced_per_assessment']} shared with a concurrent identical call)")
+    for name, st in report["providers"].items():
+        print(f"   {name}: {st['calls']} calls, {st['failures']} failed, p50 {st['p50']}s, p95 {st['p95']}s")
+    for name, rl in report["rate_limits"].items():
+        if rl["429s"] or rl["queued_seconds"] or rl["queue_timeouts"]:
+            print(f"   {name} rate limits: {rl['429s']} 429s, {rl['queued_seconds']}s queued, {rl['queue_timeouts']} queue timeouts")
+    dl = report["deadline"]
+    if dl["assessment_seconds"]:
+        print(f"   Deadline {dl['assessment_seconds']}s: {dl['assessments_over']} assessments over, "
+              f"{dl['calls_skipped']} calls skipped and {dl['calls_cut_short']} cut short for lack of time")
+    fb = report["fallback"]
+    print(f"   Fallback: {fb['hops_per_assessment']} hops/assessment, "
+          f"{fb['failed_call_seconds_per_assessment']}s/assessment spent in failed calls, "
+          f"{fb['dispatches_with_no_answer']} dispatches with no answer")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark for the assessment pipeline.")
+    parser.add_argument("--assessments", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--profile", default="healthy",
+                        help=f"Stand-in behaviour: {', '.join(sorted(PROFILES))} or one from --profile-file.")
+    parser.add_argument("--profile-file", metavar="PATH",
+                        help="JSON file of profiles that override or add to the built-in ones.")
+    parser.add_argument("--time-scale", type=float, default=0.02,
+                        help="Multiplier applied to simulated latencies and timeouts.")
+    parser.add_argument("--mode", choices=["sequential", "race", "hedge"],
+                        help="Provider dispatch mode (defaults to PROVIDER_DISPATCH_MODE).")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-client-limits", action="store_true",
+                        help="Disable main's client-side rate limiting (stand-in quotas still apply).")
+    parser.add_argument("--industries", type=int, default=0,
+                        help="Cycle assessments through this many industries (0: a different one each).")
+    parser.add_argument("--deadline", type=float,
+                        help="Assessment deadline in simulated seconds (default: main's ASSESSMENT_DEADLINE; 0 disables it).")
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON.")
+    parser.add_argument("--verbose", action="store_true", help="Show main's log output.")
+    args = parser.parse_args(argv)
+    try:
+        args.profiles = load_profiles(args.profile_file) if args.profile_file else PROFILES
+    except (OSError, ValueError) as e: # json.JSONDecodeError is a ValueError
+        parser.error(f"--profile-file: {e}")
+    if args.profile not in args.profiles:
+        parser.error(f"unknown profile '{args.profile}' (choose from {', '.join(sorted(args.profiles))})")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    benchmark_report = run_benchmark(args.assessments, args.concurrency, args.profile, args.time_scale,
+                                     args.mode, args.seed, args.verbose, not args.no_client_limits, args.industries,
+                                     args.deadline, args.profiles)
+    print_report(benchmark_report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(benchmark_report, f, indent=2)
+    sys.exit(0)
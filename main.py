@@ -1,22 +1,163 @@
 import os
 import json
 import requests
-import google.generativeai as genai
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import MaxRetryError, ResponseError
 import sys
 import time
 import logging
-
-# Additional imports for new APIs
-import cohere
-from typing import Optional
+import hashlib
+import sqlite3
+import threading
+import argparse
+import contextlib
+import subprocess
+import statistics
+import uuid
+import functools
+import re
+import math
+import random
+import ast
+import copy
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 # --- Configuration ---
-OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_BASE_URL = os.environ.get('OLLAMA_BASE_URL', "http://localhost:11434")
+HUGGINGFACE_API_URL = os.environ.get('HUGGINGFACE_API_URL', "https://api-inference.huggingface.co")
 OLLAMA_MODEL_CONFIG = "dolphin-mistral:7b" # Renamed to avoid conflict with the variable that can be set to None
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 HUGGINGFACE_API_TOKEN = os.environ.get('HUGGINGFACE_API_TOKEN')
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
 COHERE_API_KEY = os.environ.get('COHERE_API_KEY')
+GEMINI_MODEL_NAME = 'gemini-1.5-flash-latest'
+
+# --- Provider dispatch configuration ---
+# "sequential" walks the fallback chain one provider at a time (original behaviour),
+# "race" queries the first PROVIDER_RACE_WIDTH providers concurrently,
+# "hedge" sends a backup request to the next provider every PROVIDER_HEDGE_DELAY seconds.
+PROVIDER_DISPATCH_MODE = os.environ.get('PROVIDER_DISPATCH_MODE', 'sequential')
+PROVIDER_RACE_WIDTH = int(os.environ.get('PROVIDER_RACE_WIDTH', '2'))
+PROVIDER_HEDGE_DELAY = float(os.environ.get('PROVIDER_HEDGE_DELAY', '5'))
+PROVIDER_FALLBACK_CHAIN = ["ollama", "gemini", "huggingface", "groq", "cohere"]
+# Ask for every checkpoint's questions in one call; only items missing from the reply are re-requested
+QUESTION_BATCHING = os.environ.get('QUESTION_BATCHING', '1').lower() not in ('0', 'false', 'no')
+# Tasks of one assessment executed concurrently by the graph scheduler; each assessment has its own pool
+WORKFLOW_WORKERS = int(os.environ.get('WORKFLOW_WORKERS', '8'))
+
+# --- Batch mode configuration ---
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', '4')) # Projects assessed concurrently
+BATCH_DEFAULT_ANSWER = "No information provided."
+
+# --- Response cache configuration ---
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'sqlite') # sqlite | memory | none
+RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH', 'llm_response_cache.sqlite3')
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', str(7 * 24 * 3600))) # seconds
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '2000'))
+
+# --- Semantic cache configuration ---
+# Checklists and validation questions are reused for near-identical industries ("FinTech",
+# "fintech", "Fin-Tech"). Requires numpy; without it the semantic cache is disabled.
+# It follows RESPONSE_CACHE_BACKEND: off with "none", in memory only with "memory".
+SEMANTIC_CACHE_ENABLED = os.environ.get('SEMANTIC_CACHE', '1').lower() not in ('0', 'false', 'no') \
+    and RESPONSE_CACHE_BACKEND != 'none'
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get('SEMANTIC_CACHE_THRESHOLD', '0.85')) # Cosine similarity for a hit
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get('SEMANTIC_CACHE_MAX_ENTRIES', '1000'))
+SEMANTIC_CACHE_DIMENSIONS = int(os.environ.get('SEMANTIC_CACHE_DIMENSIONS', '512')) # Hashed feature buckets
+SEMANTIC_CACHE_PATH = os.environ.get('SEMANTIC_CACHE_PATH', 'llm_semantic_cache.sqlite3') \
+    if RESPONSE_CACHE_BACKEND != 'memory' else '' # Empty: memory only
+
+# --- HTTP connection pool configuration (shared by all provider clients) ---
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', '10'))
+HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', '2'))
+HTTP_RETRY_BACKOFF = float(os.environ.get('HTTP_RETRY_BACKOFF', '0.5'))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get('HTTP_KEEPALIVE_EXPIRY', '60')) # seconds, for SDK (httpx) clients
+
+# --- Streaming configuration ---
+# When enabled, the long generations in steps 2-4 are printed token by token as they arrive
+STREAM_OUTPUT = os.environ.get('STREAM_OUTPUT', '1').lower() not in ('0', 'false', 'no')
+
+# --- Prompt budget configuration ---
+# Context window (in tokens) assumed for each provider's default model, and how much of it
+# is left free for the response. Prompts larger than the remainder are shrunk before sending.
+PROVIDER_CONTEXT_TOKENS = {
+    "ollama": int(os.environ.get('OLLAMA_CONTEXT_TOKENS', '2048')),
+    "gemini": 32000,
+    "huggingface": 1024,
+    "groq": 8192,
+    "cohere": 32000,
+}
+PROMPT_OUTPUT_RESERVE_TOKENS = int(os.environ.get('PROMPT_OUTPUT_RESERVE_TOKENS', '512'))
+CHARS_PER_TOKEN = 4 # Rough average for English text; good enough for budgeting
+COMPACT_ANSWER_CHARS = 160 # Answer length kept when the verification summary has to be shortened
+
+# --- Rate limit configuration ---
+# Client-side quota per provider as (requests/minute, tokens/minute); 0 means unlimited. The
+# defaults approximate each provider's free tier; set them to your plan's limits.
+PROVIDER_RATE_LIMITS = {
+    "ollama": (0, 0),
+    "gemini": (int(os.environ.get('GEMINI_RPM', '15')), int(os.environ.get('GEMINI_TPM', '1000000'))),
+    "huggingface": (int(os.environ.get('HUGGINGFACE_RPM', '0')), int(os.environ.get('HUGGINGFACE_TPM', '0'))),
+    "groq": (int(os.environ.get('GROQ_RPM', '30')), int(os.environ.get('GROQ_TPM', '30000'))),
+    "cohere": (int(os.environ.get('COHERE_RPM', '20')), int(os.environ.get('COHERE_TPM', '0'))),
+}
+RATE_LIMIT_MAX_WAIT = float(os.environ.get('RATE_LIMIT_MAX_WAIT', '120')) # Longest a call queues before giving up
+RATE_LIMIT_FALLBACK_WAIT = float(os.environ.get('RATE_LIMIT_FALLBACK_WAIT', '5')) # ...when dispatch has another provider to try
+RATE_LIMIT_MAX_RETRIES = int(os.environ.get('RATE_LIMIT_MAX_RETRIES', '2')) # Retries on the same provider after a 429
+RATE_LIMIT_BACKOFF_BASE = float(os.environ.get('RATE_LIMIT_BACKOFF_BASE', '1')) # Seconds; doubles per consecutive 429
+RATE_LIMIT_MAX_BACKOFF = float(os.environ.get('RATE_LIMIT_MAX_BACKOFF', '60'))
+PROVIDER_INITIAL_CONCURRENCY = int(os.environ.get('PROVIDER_INITIAL_CONCURRENCY', '2')) # Starting adaptive limit
+PROVIDER_MAX_CONCURRENCY = int(os.environ.get('PROVIDER_MAX_CONCURRENCY', '8'))
+
+# --- Deadline configuration ---
+# Time budget in seconds for one assessment's model calls, and for each workflow step within it
+# (a step also stops when the assessment's budget runs out). Time spent waiting for the user's
+# answers does not count. 0 disables a budget.
+ASSESSMENT_DEADLINE = float(os.environ.get('ASSESSMENT_DEADLINE', '600'))
+STEP_DEADLINES = {
+    "criteria": float(os.environ.get('CRITERIA_DEADLINE', '90')),
+    "questions": float(os.environ.get('QUESTIONS_DEADLINE', '90')),
+    "analysis": float(os.environ.get('ANALYSIS_DEADLINE', '120')),
+    "pro_argument": float(os.environ.get('PRO_ARGUMENT_DEADLINE', '120')),
+    "debate": float(os.environ.get('DEBATE_DEADLINE', '180')),
+    "conclusion": float(os.environ.get('CONCLUSION_DEADLINE', '120')),
+}
+
+# --- Request coalescing configuration ---
+# Concurrent identical (provider, model, prompt) calls share one in-flight request
+REQUEST_COALESCING = os.environ.get('REQUEST_COALESCING', '1').lower() not in ('0', 'false', 'no')
+
+# --- Ollama runtime configuration ---
+OLLAMA_KEEP_ALIVE = os.environ.get('OLLAMA_KEEP_ALIVE', '30m') # How long the server keeps the model loaded after a request
+OLLAMA_NUM_PREDICT = int(os.environ.get('OLLAMA_NUM_PREDICT', str(PROMPT_OUTPUT_RESERVE_TOKENS))) # Max tokens generated
+OLLAMA_WARMUP = os.environ.get('OLLAMA_WARMUP', '1').lower() not in ('0', 'false', 'no') # Load the model at startup
+OLLAMA_WARMUP_TIMEOUT = float(os.environ.get('OLLAMA_WARMUP_TIMEOUT', '300')) # Model loads on CPU-only boxes are slow
+# Providers whose query function accepts json_mode=True to constrain output to valid JSON
+JSON_MODE_PROVIDERS = {"ollama"}
+
+# --- Provider health / circuit breaker configuration ---
+HEALTH_EWMA_ALPHA = float(os.environ.get('HEALTH_EWMA_ALPHA', '0.3')) # Weight of the newest sample
+HEALTH_FAILURE_THRESHOLD = int(os.environ.get('HEALTH_FAILURE_THRESHOLD', '3')) # Consecutive failures before opening
+HEALTH_OPEN_SECONDS = float(os.environ.get('HEALTH_OPEN_SECONDS', '30')) # Initial cool-down of an open circuit
+HEALTH_MAX_OPEN_SECONDS = float(os.environ.get('HEALTH_MAX_OPEN_SECONDS', '600'))
+HEALTH_PROBE_INTERVAL = float(os.environ.get('HEALTH_PROBE_INTERVAL', '10'))
+HEALTH_UNKNOWN_LATENCY = float(os.environ.get('HEALTH_UNKNOWN_LATENCY', '10')) # Assumed latency before any sample
+HEALTH_TRIAL_TIMEOUT = float(os.environ.get('HEALTH_TRIAL_TIMEOUT', '120')) # Half-open trial held longer than this is re-probed
+
+# --- Instrumentation configuration ---
+# Set either path to an empty string to disable that output
+METRICS_TRACE_PATH = os.environ.get('METRICS_TRACE_PATH', 'llm_trace.jsonl') # One JSON event per line, appended
+METRICS_PROMETHEUS_PATH = os.environ.get('METRICS_PROMETHEUS_PATH', 'llm_metrics.prom') # Prometheus text format
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# --- Assessment journal configuration ---
+# Completed workflow tasks and typed answers are appended here as they happen, so `--resume`
+# can continue an interrupted assessment. Set to an empty string to disable.
+ASSESSMENT_JOURNAL_PATH = os.environ.get('ASSESSMENT_JOURNAL_PATH', 'assessment_journal.jsonl')
 
 # --- Global variable for Ollama model, can be set to None if server is down ---
 # This allows us to disable Ollama dynamically
@@ -28,507 +169,3413 @@ logger = logging.getLogger(__name__)
 
 
 if not GEMINI_API_KEY:
-    logger.critical("🚨 GEMINI_API_KEY environment variable not set. Please set it to proceed.")
-    exit()
+    logger.warning("🚨 GEMINI_API_KEY environment variable not set. Gemini is disabled; steps that rely on it will report missing output.")
 
-genai.configure(api_key=GEMINI_API_KEY)
-gemini_model_instance = genai.GenerativeModel('gemini-1.5-flash-latest') # Renamed for clarity
+# --- Deadlines ---
+# The deadline of the work running on this thread (see deadline_scope)
+_deadline_state = threading.local()
 
-# Setup Cohere client if API key is available
-cohere_client: Optional[cohere.Client] = None
-if COHERE_API_KEY:
-    try:
-        cohere_client = cohere.Client(COHERE_API_KEY)
-        logger.info("Cohere client initialized.")
-    except Exception as e:
-        logger.error(f"Failed to initialize Cohere client: {e}")
 
-def query_huggingface(prompt, model_id="gpt2", timeout=30):
+class Deadline:
     """
-    Query Hugging Face Inference API for text generation.
-    Requires HUGGINGFACE_API_TOKEN environment variable.
+    A time budget. remaining() is the time left on this budget and on every enclosing one, so
+    a step's budget never outlasts its assessment's. The clock stops inside paused(), which is
+    used while waiting for the user. seconds=None or 0 means no limit of its own.
     """
-    if not HUGGINGFACE_API_TOKEN:
-        logger.warning("HUGGINGFACE_API_TOKEN not set. Skipping Hugging Face query.")
-        return None
 
-    headers = {
-        "Authorization": f"Bearer {HUGGINGFACE_API_TOKEN}",
-        "Accept": "application/json"
-    }
-    api_url = f"https://api-inference.huggingface.co/models/{model_id}"
-    payload = {
-        "inputs": prompt,
-        "options": {"wait_for_model": True}
-    }
-    try:
-        logger.info(f"Querying Hugging Face model: {model_id}")
-        response = requests.post(api_url, headers=headers, json=payload, timeout=timeout)
-        response.raise_for_status()
-        data = response.json()
-        if isinstance(data, dict) and "error" in data:
-            logger.error(f"Hugging Face API error: {data['error']}")
-            return None
-        # The response is usually a list of generated texts
-        if isinstance(data, list) and len(data) > 0 and "generated_text" in data[0]:
-            return data[0]["generated_text"].strip()
-        logger.error(f"Unexpected Hugging Face response format: {data}")
-        return None
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Hugging Face API request failed: {e}")
-        return None
+    def __init__(self, seconds=None, parent=None, name="deadline"):
+        self.name = name
+        self.parent = parent
+        self.expires_at = time.monotonic() + seconds if seconds else math.inf
+        self._paused_since = None
+        self._pauses = 0
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        with self._lock:
+            now = self._paused_since if self._paused_since is not None else time.monotonic()
+            remaining = self.expires_at - now
+        if self.parent is not None:
+            remaining = min(remaining, self.parent.remaining())
+        return remaining
+
+    def _pause(self):
+        with self._lock:
+            if self._pauses == 0:
+                self._paused_since = time.monotonic()
+            self._pauses += 1
+        if self.parent is not None:
+            self.parent._pause()
+
+    def _resume(self):
+        if self.parent is not None:
+            self.parent._resume()
+        with self._lock:
+            self._pauses -= 1
+            if self._pauses == 0:
+                self.expires_at += time.monotonic() - self._paused_since
+                self._paused_since = None
+
+    @contextlib.contextmanager
+    def paused(self):
+        self._pause()
+        try:
+            yield
+        finally:
+            self._resume()
+
 
-def query_groq(prompt, system_message=None, model="llama3-8b-8192"):
+def current_deadline():
+    return getattr(_deadline_state, "deadline", None)
+
+
+@contextlib.contextmanager
+def deadline_scope(deadline):
     """
-    Query Groq API for text generation.
-    Requires GROQ_API_KEY environment variable.
+    Makes `deadline` the current thread's deadline for the duration of the block.
     """
-    if not GROQ_API_KEY:
-        logger.warning("GROQ_API_KEY not set. Skipping Groq query.")
-        return None
+    previous = current_deadline()
+    _deadline_state.deadline = deadline
     try:
-        from groq import Groq
-    except ImportError:
-        logger.error("Groq package not installed. Please install with 'pip install groq'.")
-        return None
+        yield deadline
+    finally:
+        _deadline_state.deadline = previous
 
-    try:
-        groq_client = Groq(api_key=GROQ_API_KEY)
-        messages = []
-        if system_message:
-            messages.append({"role": "system", "content": system_message})
-        messages.append({"role": "user", "content": prompt})
-
-        chat_completion = groq_client.chat.completions.create(
-            messages=messages,
-            model=model,
-        )
-        return chat_completion.choices[0].message.content.strip()
-    except Exception as e:
-        logger.error(f"Groq API request failed: {e}")
-        return None
 
+def run_with_deadline(deadline, func, *args, **kwargs):
+    """
+    Runs func under the given deadline. Used to carry the caller's deadline into pool threads.
+    """
+    with deadline_scope(deadline):
+        return func(*args, **kwargs)
 
-project_data = {}
 
-def query_gemini(prompt, model_instance=None, timeout=60):
+@contextlib.contextmanager
+def deadline_paused():
     """
-    Query Google Gemini API for text generation.
-    Requires GEMINI_API_KEY environment variable.
+    Stops the current deadline's clock (and its enclosing ones') while waiting for the user.
     """
-    if not GEMINI_API_KEY:
-        logger.warning("GEMINI_API_KEY not set. Skipping Gemini query.")
-        return None
-    if model_instance is None:
-        model_instance = gemini_model_instance
+    deadline = current_deadline()
+    if deadline is None:
+        yield
+        return
+    with deadline.paused():
+        yield
+
+
+def time_remaining():
+    deadline = current_deadline()
+    return deadline.remaining() if deadline is not None else math.inf
 
-    try:
-        logger.info("Querying Gemini model...")
-        response = model_instance.generate_content(prompt, request_options={'timeout': timeout})
-        return response.text.strip()
-    except Exception as e:
-        logger.error(f"Gemini API request failed: {e}")
-        return None
 
-def query_cohere(prompt, model="command-r"):
+def request_timeout(timeout, provider):
     """
-    Query Cohere API for text generation.
-    Requires COHERE_API_KEY environment variable.
+    Timeout for one provider request: the provider's own timeout, cut down to the time left
+    on the current deadline. Returns 0 if the deadline has passed; the request must then be
+    skipped, and the call is recorded as skipped rather than as a provider failure.
     """
-    if not cohere_client:
-        logger.warning("Cohere client not initialized. Skipping Cohere query.")
-        return None
-    try:
-        response = cohere_client.chat(
-            model=model,
-            message=prompt
-        )
-        return response.text.strip()
-    except Exception as e:
-        logger.error(f"Cohere API request failed: {e}")
-        return None
+    timeout = min(timeout, time_remaining())
+    _deadline_state.request_timeout = timeout
+    if timeout <= 0:
+        _call_state.throttled = "deadline reached"
+        logger.warning(f"⌛ Deadline reached. Skipping {provider} request.")
+        return 0
+    return timeout
 
-project_data = {}
 
-def step_1_define_criteria():
-    logger.info("\n--- 1️⃣ Define the Checklist Criteria ---")
-    industry = input("Please enter the industry for the software project (e.g., 'FinTech', 'Healthcare', 'E-commerce'): ")
-    project_data['industry'] = industry
+class DeadlineRetry(Retry):
+    """
+    urllib3 retry policy that stops retrying once the current deadline has no room left for
+    another attempt with the same timeout.
+    """
 
-    prompt = f"""
-    You are an AI assistant helping to define project readiness checklists.
-    For a project in the '{industry}' industry/domain, generate a structured list of 3-5 key checkpoints
-    that must be met before proceeding.
-    Focus on high-level categories like: financial feasibility, regulatory compliance, technical readiness.
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        remaining = time_remaining()
+        if remaining < getattr(_deadline_state, "request_timeout", 0) or remaining <= 0:
+            raise MaxRetryError(_pool, url, error or ResponseError("deadline reached")) from error
+        return super().increment(method, url, response, error, _pool, _stacktrace)
 
-    Example for 'software project': Scalability, security compliance, API integrations.
-    Example for 'healthcare AI solution': FDA approval, patient data protection, ethical AI use.
 
-    Output the list as a JSON array of strings. For example:
-    ["Checkpoint 1", "Checkpoint 2", "Checkpoint 3"]
-    """
+# --- Provider Client Registry ---
+# Clients are created once and shared by every step and thread, so connections (and TLS
+# sessions) are kept alive between checkpoints instead of being rebuilt for every call.
+# SDKs are imported on first use of their provider, so startup does not pay for them.
+_provider_clients = {}
+_provider_clients_lock = threading.Lock()
+_provider_init_errors = {} # provider -> reason its client could not be created
 
-    raw_checklist = None
-    if OLLAMA_MODEL: # Check if Ollama is enabled
-        logger.info(f"🤖 Asking Ollama ({OLLAMA_MODEL}) to generate checklist criteria...")
-        raw_checklist = query_ollama(prompt)
 
-    if raw_checklist is None:
-        logger.warning("⚠️ Ollama failed or was skipped. Falling back to Gemini for checklist generation...")
-        raw_checklist = query_gemini(prompt)
+def build_http_session():
+    """
+    Creates a requests.Session with a keep-alive connection pool and retries on
+    connection errors and transient gateway errors, as long as the current deadline allows.
+    429s are not retried here: Retry-After is left to the provider's rate limiter, which
+    must see every attempt.
+    """
+    retry = DeadlineRetry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False,
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def build_httpx_client():
+    """
+    Creates a pooled httpx.Client for SDKs (Groq, Cohere) that accept a custom HTTP client.
+    """
+    import httpx
+    limits = httpx.Limits(
+        max_connections=HTTP_POOL_SIZE,
+        max_keepalive_connections=HTTP_POOL_SIZE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.Client(limits=limits, timeout=httpx.Timeout(60.0, connect=10.0))
 
-    if raw_checklist is None:
-        logger.warning("⚠️ Gemini failed or was skipped. Falling back to Hugging Face for checklist generation...")
-        raw_checklist = query_huggingface(prompt, model_id="gpt2")
 
-    if raw_checklist is None:
-        logger.warning("⚠️ Hugging Face failed or was skipped. Falling back to Groq for checklist generation...")
-        raw_checklist = query_groq(prompt)
+# The SDKs' own retries are turned off: they would retry 429s behind the rate limiter's back
+def build_groq_client():
+    from groq import Groq
+    return Groq(api_key=GROQ_API_KEY, max_retries=0, http_client=build_httpx_client())
 
-    if raw_checklist is None:
-        logger.warning("⚠️ Groq failed or was skipped. Falling back to Cohere for checklist generation...")
-        raw_checklist = query_cohere(prompt)
 
-    logger.info(f"AI's raw response for checklist:\n{raw_checklist}")
+def build_cohere_client():
+    import cohere
+    return cohere.Client(COHERE_API_KEY, max_retries=0, httpx_client=build_httpx_client())
 
-    try:
-        if raw_checklist is None:
-            raise ValueError("AI failed to provide any checklist response.")
-        parsed_checklist = json.loads(raw_checklist)
-        if not isinstance(parsed_checklist, list) or not all(isinstance(item, str) for item in parsed_checklist):
-            raise ValueError("Checklist is not a list of strings.")
-        project_data['checklist_criteria'] = parsed_checklist
-    except (json.JSONDecodeError, ValueError) as e:
-        logger.warning(f"⚠️ AI did not return a valid JSON list for checklist. Error: {e}")
-        logger.info("Attempting to extract checklist items manually or generate new using Gemini...")
-        cleanup_prompt = f"""
-        The following text is supposed to be a JSON list of project checklist items, but it might be malformed or missing:
-        ---
-        {raw_checklist if raw_checklist else "No content provided by previous AI."}
-        ---
-        Please extract the checklist items and format them as a valid JSON array of strings.
-        If you cannot extract a meaningful list, generate a new list of 3-5 checklist items for a '{industry}' project.
-        """
-        cleaned_checklist_str = query_gemini(cleanup_prompt)
-        logger.info(f"Gemini's cleaned or generated checklist string: {cleaned_checklist_str}")
-        try:
-            if cleaned_checklist_str is None:
-                raise ValueError("Gemini failed to provide a cleaned/new checklist.")
-            project_data['checklist_criteria'] = json.loads(cleaned_checklist_str)
-            if not isinstance(project_data['checklist_criteria'], list) or len(project_data['checklist_criteria']) == 0:
-                raise ValueError("Invalid or empty checklist from Gemini cleanup.")
-        except (json.JSONDecodeError, ValueError) as e_cleanup:
-            logger.error(f"🚨 Failed to produce a valid JSON checklist even after cleanup. Error: {e_cleanup}. Generating a default list.")
-            project_data['checklist_criteria'] = [
-                "Technical feasibility assessment",
-                "Financial viability analysis",
-                "Regulatory compliance check",
-                "Resource availability confirmation",
-                "Market demand validation"
-            ]
 
-    logger.info("\n✅ Generated Checklist Criteria:")
-    for i, item in enumerate(project_data.get('checklist_criteria', [])):
-        print(f"   {i+1}. {item}") # Using print for direct user output
+def build_gemini_model():
+    import google.generativeai as genai
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel(GEMINI_MODEL_NAME)
 
 
-def step_2_multiprompt_verification():
-    logger.info("\n--- 2️⃣ Multiprompt Verification & Data Analysis ---")
-    if not project_data.get('checklist_criteria') or \
-       ("Error" in project_data['checklist_criteria'][0] if project_data['checklist_criteria'] else True):
-        logger.error("🚨 Cannot proceed: Checklist criteria not defined or error in definition.")
-        project_data['verification_results'] = {}
-        project_data['gemini_analysis_report'] = "Skipped: Checklist definition failed."
-        return
+PROVIDER_CLIENT_FACTORIES = {
+    "ollama": build_http_session,
+    "huggingface": build_http_session,
+    "gemini": build_gemini_model,
+    "groq": build_groq_client,
+    "cohere": build_cohere_client,
+}
 
-    project_data['verification_results'] = {}
-    user_answers_summary = []
 
-    for i, item in enumerate(project_data['checklist_criteria']):
-        print(f"\n🔍 Verifying Checkpoint {i+1}: {item}") # User-facing print
+def get_provider_client(name):
+    """
+    Returns the shared client for a provider, creating it on first use.
+    Raises whatever the factory raises (e.g. ImportError for a missing SDK).
+    """
+    client = _provider_clients.get(name)
+    if client is not None:
+        return client
+    with _provider_clients_lock:
+        if name not in _provider_clients:
+            _provider_clients[name] = PROVIDER_CLIENT_FACTORIES[name]()
+        return _provider_clients[name]
 
-        prompt_questions = f"""
-        For the project checklist item: '{item}' in a '{project_data['industry']}' context,
-        generate 2-3 specific validation questions to assess if this checkpoint is met.
-        Frame them as direct questions the user should answer.
-        Output as a JSON array of strings. Example:
-        ["Question 1?", "Question 2?"]
-        """
-        
-        raw_questions = None
-        if OLLAMA_MODEL:
-            logger.info(f"🤖 Asking Ollama ({OLLAMA_MODEL}) for validation questions...")
-            raw_questions = query_ollama(prompt_questions)
-        
-        if raw_questions is None:
-            logger.warning("⚠️ Ollama failed or was skipped for question generation. Falling back to Gemini...")
-            raw_questions = query_gemini(prompt_questions)
 
-        if raw_questions is None:
-            logger.warning("⚠️ Gemini failed or was skipped for question generation. Falling back to Hugging Face...")
-            raw_questions = query_huggingface(prompt_questions, model_id="gpt2")
+def try_get_provider_client(name):
+    """
+    Returns the shared client for a provider, or None if it cannot be created (e.g. the SDK
+    is not installed). A failed initialization disables only that provider.
+    """
+    if name in _provider_init_errors:
+        return None
+    try:
+        return get_provider_client(name)
+    except ImportError as e:
+        logger.error(f"{name} SDK not installed ({e}). Install it with 'pip install -r requirements.txt'. Disabling {name}.")
+        _provider_init_errors[name] = str(e)
+    except Exception as e:
+        logger.error(f"Failed to initialize {name} client: {e}. Disabling {name}.")
+        _provider_init_errors[name] = str(e)
+    return None
 
-        if raw_questions is None:
-            logger.warning("⚠️ Hugging Face failed or was skipped for question generation. Falling back to Groq...")
-            raw_questions = query_groq(prompt_questions)
 
-        if raw_questions is None:
-            logger.warning("⚠️ Groq failed or was skipped for question generation. Falling back to Cohere...")
-            raw_questions = query_cohere(prompt_questions)
+# --- Response Cache ---
+# Per-thread information about the provider call in progress (e.g. whether it was served from cache)
+_call_state = threading.local()
 
-        logger.info(f"AI's raw response for questions:\n{raw_questions}")
 
-        questions = None
-        try:
-            if raw_questions is None:
-                raise ValueError("AI failed to provide questions.")
-            questions = json.loads(raw_questions)
-            if not isinstance(questions, list) or not all(isinstance(q, str) for q in questions):
-                raise ValueError("Not a list of strings")
-        except (json.JSONDecodeError, ValueError, TypeError) as e:
-            logger.warning(f"⚠️ AI did not return valid JSON questions. Error: {e}. Using generic questions.")
-            questions = [f"What is the status of '{item}'?", f"What evidence supports the completion of '{item}'?"]
-
-        item_answers = {"checkpoint": item, "questions": questions, "answers": []}
-        for q_idx, q_text in enumerate(questions):
-            answer = input(f"    Q{q_idx+1}: {q_text}\n   Your Answer: ")
-            item_answers["answers"].append({"question": q_text, "answer": answer})
-            user_answers_summary.append(f"For '{item}', Q: {q_text} A: {answer}")
-            time.sleep(0.2) # Reduced sleep time
-
-        project_data['verification_results'][item] = item_answers
-
-    user_answers_full_text = "\n".join(user_answers_summary)
-    prompt_analysis = f"""
-    Project Type: {project_data['industry']}
-    Checklist Criteria and User Answers:
-    {user_answers_full_text}
+def response_cache_key(provider, model, prompt, *extra):
+    """
+    Builds a content-addressed cache key from the provider, model and prompt (plus any extra
+    request parameters that change the output, such as a system message).
+    """
+    payload = json.dumps([provider, str(model), prompt, *extra], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-    Based on the user's answers:
-    1. Analyze the provided information for each checkpoint.
-    2. Briefly "cross-reference" against common knowledge of outcomes or best practices for such projects.
-       (e.g., "The financial projections seem optimistic given typical market entry costs for similar SaaS products.")
-    3. Provide a short (1-2 sentence) assessment for each checkpoint (e.g., "Seems well-addressed", "Requires more detail", "Potential risk area").
-    4. Provide an overall brief summary statement about the project's current state based on these answers.
 
-    Output your analysis clearly, perhaps point by point for each checkpoint, and then the overall summary.
+class ResponseCache:
+    """
+    Base class for response caches. Subclasses implement _get/_set/_delete/_clear; this class
+    keeps the hit/miss counters. A cache that stores nothing (the "none" backend) is just this
+    class. The key of the last lookup is kept per thread, so a provider call can drop the
+    response it produced if the caller rejects it.
     """
-    logger.info("\n🤖 Asking Gemini to analyze answers and simulate cross-referencing...")
-    analysis_report = query_gemini(prompt_analysis)
-    project_data['gemini_analysis_report'] = analysis_report if analysis_report else "Gemini failed to provide analysis."
-    
-    print("\n📊 Gemini's Analysis Report:") # User-facing print
-    print(project_data['gemini_analysis_report'])
 
+    def __init__(self, ttl=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        _call_state.cache_key = key
+        value = self._get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if value is not None:
+            _call_state.cache_hit = True
+        return value
+
+    def set(self, key, value):
+        if value is None:
+            return
+        self._set(key, value)
+
+    def delete(self, key):
+        if key is not None:
+            self._delete(key)
+
+    def clear(self):
+        self._clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def _get(self, key):
+        return None
 
-def step_3_counterargument_simulation():
-    logger.info("\n--- 3️⃣ Counterargument Simulation – Debate Between Two AI Personas ---")
-    if not project_data.get('checklist_criteria') or \
-       not project_data.get('gemini_analysis_report') or \
-       "Skipped" in project_data.get('gemini_analysis_report', ""):
-        logger.warning("🚨 Cannot proceed with debate: Checklist or analysis report missing/skipped.")
-        project_data['debate'] = {"pro_argument_ollama": "Skipped", "against_argument_gemini": "Skipped due to missing prior data."}
-        return
+    def _set(self, key, value):
+        pass
+
+    def _delete(self, key):
+        pass
+
+    def _clear(self):
+        pass
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    In-process LRU cache with TTL. Contents are lost when the process exits.
+    """
 
-    project_summary = f"""
-    Project Type: {project_data['industry']}
-    Current Status & Analysis:
-    {json.dumps(project_data.get('verification_results'), indent=2)}
-    Gemini's Initial Analysis: {project_data.get('gemini_analysis_report')}
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._entries = OrderedDict() # key -> (created_at, value)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if self.ttl and time.time() - created_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    On-disk cache backed by a single SQLite file, shared across runs.
+    Entries expire after `ttl` seconds; the least recently used entries are evicted
+    once the table grows beyond `max_entries`.
     """
 
-    pro_argument = None
-    if OLLAMA_MODEL:
-        prompt_pro = f"""
-        You are Persona A, an optimistic but realistic project advocate.
-        Given the following project summary, argue WHY the project should proceed.
-        Address potential risks highlighted in the analysis by offering potential solutions or mitigations.
-        Keep your argument concise (2-3 key points).
+    def __init__(self, path=RESPONSE_CACHE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    def _get(self, key):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            return value
+
+    def _set(self, key, value):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def _delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+
+def create_response_cache(backend=RESPONSE_CACHE_BACKEND):
+    """
+    Builds the response cache for the configured backend. Falls back to an in-memory cache
+    if the SQLite file cannot be opened.
+    """
+    if backend == "none":
+        return ResponseCache()
+    if backend == "memory":
+        return MemoryResponseCache()
+    if backend != "sqlite":
+        logger.warning(f"Unknown response cache backend '{backend}'. Using in-memory cache.")
+        return MemoryResponseCache()
+    try:
+        return SQLiteResponseCache()
+    except sqlite3.Error as e:
+        logger.error(f"Failed to open response cache at {RESPONSE_CACHE_PATH}: {e}. Using in-memory cache.")
+        return MemoryResponseCache()
 
-        Project Summary:
-        {project_summary}
 
-        Your Pro-Project Argument:
-        """
-        logger.info(f"\n🤖 Asking Ollama ({OLLAMA_MODEL}) for Pro-Project Argument (Persona A)...")
-        pro_argument = query_ollama(prompt_pro)
-    
-    if pro_argument is None and OLLAMA_MODEL: # Log if Ollama was attempted but failed
-        logger.warning("Ollama failed to provide a pro-argument.")
-    elif pro_argument is None: # Ollama was skipped
-         logger.info("Ollama was skipped for pro-argument. Pro-argument will be missing or generated by Gemini if implemented as fallback.")
-         # For now, we just note it's missing if Ollama is the designated pro-arguer
-         pro_argument = "Pro-argument (Ollama) not available or failed."
+response_cache = create_response_cache()
 
 
-    project_data['debate_pro_argument'] = pro_argument
-    print("\n👍 Persona A (Pro-Project - Ollama):") # User-facing print
-    print(pro_argument)
+# --- Semantic Cache ---
+SEMANTIC_KEY_PARTS = 2 # Most key texts per entry, e.g. (industry, checklist item)
 
-    prompt_against = f"""
-    You are Persona B, a cautious and critical project evaluator.
-    Given the following project summary AND the Pro-Project argument (if available), highlight critical challenges,
-    unaddressed risks, or reasons why the project might fail or needs significant reconsideration.
-    Recommend caution if necessary. Keep your argument concise (2-3 key points).
 
-    Project Summary:
-    {project_summary}
+def normalize_key_text(text):
+    """
+    Lowercases and strips punctuation so that "Fin-Tech", "fintech" and "FinTech " compare equal.
+    """
+    text = str(text).lower().replace("&", " and ")
+    text = re.sub(r"(?<=\w)[-'’](?=\w)", "", text)
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
 
-    Persona A's Pro-Project Argument:
-    {pro_argument if pro_argument else "Pro-argument not available."}
 
-    Your Critical Counter-Argument (Persona B):
+def key_text_features(text):
     """
-    logger.info("\n🤖 Asking Gemini for Against-Project Argument (Persona B)...")
-    against_argument = query_gemini(prompt_against)
-    project_data['debate_against_argument'] = against_argument if against_argument else "Gemini failed to provide counter-argument."
-    
-    print("\n👎 Persona B (Against-Project - Gemini):") # User-facing print
-    print(project_data['debate_against_argument'])
+    Character trigrams of the text with spaces removed ("health care" ~ "healthcare"),
+    plus whole words.
+    """
+    text = normalize_key_text(text)
+    compact = f"^{text.replace(' ', '')}$"
+    features = [f"c:{compact[i:i + 3]}" for i in range(len(compact) - 2)]
+    features.extend(f"w:{word}" for word in text.split())
+    return features
 
-    project_data['debate'] = {
-        "pro_argument_ollama": project_data['debate_pro_argument'],
-        "against_argument_gemini": project_data['debate_against_argument']
-    }
 
-def step_4_ai_generated_conclusion():
-    logger.info("\n--- 4️⃣ AI-Generated Conclusion – Proceed or Reconsider? ---")
-    if not project_data.get('debate') or \
-       "Skipped" in project_data['debate'].get('pro_argument_ollama', "") or \
-       "Skipped" in project_data['debate'].get('against_argument_gemini', ""):
-        logger.warning("🚨 Cannot proceed with final conclusion: Debate simulation missing or skipped.")
-        project_data['final_conclusion'] = "Reconsider: Debate simulation was not performed or failed."
-        return
+class SemanticCache:
+    """
+    Near-duplicate cache for generated lists (checklists, validation questions).
+
+    Each entry is keyed by a kind and one or more short texts, e.g. ("questions", industry, item).
+    Key texts are embedded with the hashing trick over key_text_features and L2-normalized.
+    A lookup hits when every key text is at least `threshold` cosine-similar to the entry's
+    and the numbers in them are the same ("Plan 2" never matches "Plan 3"). Vectors live in a
+    preallocated NumPy array of max_entries rows; when it is full the least recently used entry
+    is replaced. With a path, entries are also stored in SQLite and re-embedded at start.
+    numpy is imported on first use; if it is missing the cache is disabled.
+    """
 
-    # Ensure debate arguments are strings for the prompt
-    pro_arg_text = project_data['debate'].get('pro_argument_ollama', "Not available")
-    if pro_arg_text is None: pro_arg_text = "Not available"
-    
-    against_arg_text = project_data['debate'].get('against_argument_gemini', "Not available")
-    if against_arg_text is None: against_arg_text = "Not available"
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+                 dimensions=SEMANTIC_CACHE_DIMENSIONS, ttl=RESPONSE_CACHE_TTL, path=SEMANTIC_CACHE_PATH,
+                 enabled=SEMANTIC_CACHE_ENABLED):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.dimensions = dimensions
+        self.ttl = ttl
+        self.path = path
+        self.enabled = enabled and max_entries > 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._np = None
+        self._conn = None
+        self._entries = [] # slot -> (kind, parts, numbers, value, created_at) or None
+        self._slots = {} # (kind, normalized parts) -> slot
+        self._vectors = None # (max_entries, SEMANTIC_KEY_PARTS, dimensions) float32
+        self._last_used = None # slot -> last hit or insert time
+
+    def _ensure_loaded(self):
+        # Caller holds self._lock
+        if self._np is not None or not self.enabled:
+            return self.enabled
+        try:
+            import numpy as np
+        except ImportError:
+            logger.info("numpy is not installed. Semantic cache disabled.")
+            self.enabled = False
+            return False
+        self._np = np
+        self._vectors = np.zeros((self.max_entries, SEMANTIC_KEY_PARTS, self.dimensions), dtype=np.float32)
+        self._last_used = np.zeros(self.max_entries)
+        if self.path:
+            try:
+                self._load()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to open semantic cache at {self.path}: {e}. Keeping it in memory only.")
+                self._conn = None
+        return True
+
+    def _load(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS semantic_entries ("
+                "kind TEXT NOT NULL, parts TEXT NOT NULL, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL, PRIMARY KEY (kind, parts))"
+            )
+            if self.ttl:
+                self._conn.execute("DELETE FROM semantic_entries WHERE created_at < ?", (now - self.ttl,))
+            rows = self._conn.execute(
+                "SELECT kind, parts, value, created_at, last_access FROM semantic_entries "
+                "ORDER BY last_access DESC LIMIT ?", (self.max_entries,)
+            ).fetchall()
+            self._conn.execute(
+                "DELETE FROM semantic_entries WHERE rowid NOT IN "
+                "(SELECT rowid FROM semantic_entries ORDER BY last_access DESC LIMIT ?)", (self.max_entries,)
+            )
+        for kind, parts, value, created_at, last_access in reversed(rows):
+            self._insert(kind, json.loads(parts), json.loads(value), created_at, last_access)
+
+    def _embed(self, text):
+        vector = self._np.zeros(self.dimensions, dtype=self._np.float32)
+        for feature in key_text_features(text):
+            digest = zlib.crc32(feature.encode("utf-8"))
+            # The sign bit keeps hash collisions from always adding up
+            vector[digest % self.dimensions] += 1.0 if digest & 0x80000000 else -1.0
+        norm = self._np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _embed_parts(self, parts):
+        matrix = self._np.zeros((SEMANTIC_KEY_PARTS, self.dimensions), dtype=self._np.float32)
+        for i, part in enumerate(parts):
+            matrix[i] = self._embed(part)
+        return matrix
+
+    @staticmethod
+    def _numbers(parts):
+        return tuple(sorted(set(re.findall(r"\d+", " ".join(normalize_key_text(p) for p in parts)))))
+
+    def _expired(self, slot, now):
+        entry = self._entries[slot]
+        return entry is None or (self.ttl and now - entry[4] > self.ttl)
+
+    def _insert(self, kind, parts, value, created_at, last_used):
+        # Caller holds self._lock; returns the evicted (kind, parts) if a live entry was replaced
+        key = (kind, tuple(normalize_key_text(p) for p in parts))
+        evicted = None
+        slot = self._slots.get(key)
+        if slot is None:
+            if len(self._entries) < self.max_entries:
+                slot = len(self._entries)
+                self._entries.append(None)
+            else:
+                slot = int(self._np.argmin(self._last_used))
+                old = self._entries[slot]
+                if old is not None:
+                    evicted = (old[0], old[1])
+                    del self._slots[(old[0], tuple(normalize_key_text(p) for p in old[1]))]
+                    self.evictions += 1
+            self._slots[key] = slot
+        self._entries[slot] = (kind, list(parts), self._numbers(parts), value, created_at)
+        self._vectors[slot] = self._embed_parts(parts)
+        self._last_used[slot] = last_used
+        return evicted
+
+    def lookup(self, kind, *parts):
+        """
+        Returns the stored value of the most similar entry of this kind, or None.
+        """
+        if not self.enabled or not parts or len(parts) > SEMANTIC_KEY_PARTS:
+            return None
+        with self._lock:
+            if not self._ensure_loaded() or not self._entries:
+                self.misses += 1
+                return None
+            now = time.time()
+            numbers = self._numbers(parts)
+            query = self._embed_parts(parts)[:len(parts)]
+            filled = len(self._entries)
+            # Per-part cosine similarity; an entry is only as similar as its least similar key text
+            similarity = self._np.einsum("epd,pd->ep", self._vectors[:filled, :len(parts)], query).min(axis=1)
+            for slot in self._np.argsort(-similarity):
+                if similarity[slot] < self.threshold:
+                    break
+                entry = self._entries[slot]
+                if self._expired(slot, now) or entry[0] != kind or len(entry[1]) != len(parts) or entry[2] != numbers:
+                    continue
+                self.hits += 1
+                self._last_used[slot] = now
+                logger.info(f"♻️ Semantic cache hit for {kind}: {' / '.join(map(str, parts))} ≈ "
+                            f"{' / '.join(entry[1])} (similarity {similarity[slot]:.2f})")
+                if self._conn is not None:
+                    self._execute("UPDATE semantic_entries SET last_access = ? WHERE kind = ? AND parts = ?",
+                                  (now, kind, json.dumps(entry[1])))
+                return copy.deepcopy(entry[3])
+            self.misses += 1
+            return None
 
-    conclusion_input = f"""
-    Project Type: {project_data['industry']}
-    Checklist Verification Summary: {json.dumps(project_data.get('verification_results'), indent=2)}
-    Initial Gemini Analysis: {project_data.get('gemini_analysis_report', 'Not available')}
-    Debate:
-      Pro-Project (Ollama): {pro_arg_text}
-      Against-Project (Gemini): {against_arg_text}
+    def add(self, kind, parts, value):
+        """
+        Stores a generated value (any JSON-serializable object) under the given key texts.
+        """
+        if not self.enabled or not parts or len(parts) > SEMANTIC_KEY_PARTS or value is None:
+            return
+        parts = [str(p) for p in parts]
+        with self._lock:
+            if not self._ensure_loaded():
+                return
+            now = time.time()
+            evicted = self._insert(kind, parts, copy.deepcopy(value), now, now)
+            if self._conn is not None:
+                if evicted:
+                    self._execute("DELETE FROM semantic_entries WHERE kind = ? AND parts = ?",
+                                  (evicted[0], json.dumps(evicted[1])))
+                self._execute("INSERT OR REPLACE INTO semantic_entries (kind, parts, value, created_at, last_access) "
+                              "VALUES (?, ?, ?, ?, ?)", (kind, json.dumps(parts), json.dumps(value), now, now))
+
+    def _execute(self, sql, params):
+        # Caller holds self._lock. A failed write only costs persistence, not the in-memory entry.
+        try:
+            with self._conn:
+                self._conn.execute(sql, params)
+        except sqlite3.Error as e:
+            logger.warning(f"Semantic cache write to {self.path} failed: {e}")
 
-    Based on ALL the information above (checklist results, initial analysis, and the simulated debate),
-    provide a final recommendation: Should the project PROCEED or RECONSIDER?
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": sum(1 for entry in self._entries if entry is not None),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
 
-    If PROCEED:
-      - Briefly confirm feasibility.
-      - Suggest 1-2 high-level next execution steps.
-    If RECONSIDER:
-      - Clearly identify the 1-2 most critical flaws or risks.
-      - Suggest specific modifications or alternative approaches.
 
-    Be decisive but base your recommendation on the provided evidence.
-    Start your response with either "CONCLUSION: PROCEED" or "CONCLUSION: RECONSIDER".
-    """
-    logger.info("\n🤖 Asking Gemini for the Final Conclusion...")
-    final_conclusion = query_gemini(conclusion_input)
-    project_data['final_conclusion'] = final_conclusion if final_conclusion else "Gemini failed to provide a final conclusion."
-    
-    print("\n🏁 AI's Final Recommendation (Gemini):") # User-facing print
-    print(project_data['final_conclusion'])
+semantic_cache = SemanticCache()
 
 
-def check_ollama_server():
+# --- Rate Limiting ---
+def rate_limit_retry_after(exc):
     """
-    Checks if the Ollama server is running and if the configured model is available.
-    Sets the global OLLAMA_MODEL to None if the server is unreachable or model is not found.
+    If exc is a provider's "too many requests" error, returns how many seconds the provider
+    asked us to wait (0.0 if it did not say). Returns None for any other error.
     """
-    global OLLAMA_MODEL
-    logger.info(f"Attempting to connect to Ollama server at {OLLAMA_BASE_URL}...")
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None) or getattr(exc, "code", None)
+    try:
+        status = int(status)
+    except (TypeError, ValueError):
+        status = None
+    if status != 429 and type(exc).__name__ not in ("RateLimitError", "TooManyRequestsError", "ResourceExhausted"):
+        return None
+    headers = getattr(exc, "headers", None) or getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
     try:
-        # Check if server is reachable
-        requests.get(OLLAMA_BASE_URL, timeout=5)
-        logger.info("Ollama server is reachable.")
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return 0.0
 
-        # Check if the model is available
-        model_list_url = f"{OLLAMA_BASE_URL}/api/tags"
-        response = requests.get(model_list_url, timeout=5)
-        response.raise_for_status()
-        models = response.json().get("models", [])
-        available_models = [m["name"] for m in models]
 
-        if OLLAMA_MODEL_CONFIG not in available_models:
-            logger.warning(f"🚨 Configured Ollama model '{OLLAMA_MODEL_CONFIG}' not found on server. Available models: {', '.join(available_models) if available_models else 'None'}")
-            OLLAMA_MODEL = None
-        else:
-            logger.info(f"Configured Ollama model '{OLLAMA_MODEL_CONFIG}' is available.")
+def note_rate_limit(exc):
+    """
+    Called from a query function's error handler: remembers a 429 so the limiter backs off
+    and call_provider retries.
+    """
+    retry_after = rate_limit_retry_after(exc)
+    if retry_after is not None:
+        _call_state.rate_limited = retry_after
 
-    except requests.exceptions.ConnectionError:
-        logger.warning(f"🚨 Ollama server not found at {OLLAMA_BASE_URL}. Disabling Ollama functionality.")
-        OLLAMA_MODEL = None
-    except requests.exceptions.Timeout:
-        logger.warning(f"🚨 Connection to Ollama server timed out at {OLLAMA_BASE_URL}. Disabling Ollama functionality.")
-        OLLAMA_MODEL = None
-    except requests.exceptions.RequestException as e:
-        logger.warning(f"🚨 An error occurred while checking Ollama server: {e}. Disabling Ollama functionality.")
-        OLLAMA_MODEL = None
 
+class RateLimitSlot:
+    def __init__(self, granted):
+        self.granted = granted
+        self.output_text = None
+
+    def completed(self, text):
+        self.output_text = text
 
-def query_ollama(prompt, model=None, timeout=60):
+
+class ProviderRateLimiter:
     """
-    Query the Ollama server for text generation. Returns the generated text or None on failure.
+    Client-side quota for one provider:
+
+    - token buckets for requests/minute and tokens/minute (prompt estimate plus
+      PROMPT_OUTPUT_RESERVE_TOKENS, corrected once the response is known),
+    - a FIFO queue, so callers from different sessions are served in arrival order,
+    - an AIMD concurrency limit: +1/limit per successful request, halved on every 429,
+    - a shared back-off window after a 429, from Retry-After or exponential with jitter.
+
+    A provider without a quota (rpm and tpm both 0) has no concurrency limit until its first
+    429, which starts the adaptive limit from the number of requests then in flight.
     """
-    if OLLAMA_MODEL is None:
-        logger.info("Ollama is disabled or unavailable. Skipping Ollama query.")
-        return None
-    if model is None:
-        model = OLLAMA_MODEL
-    api_url = f"{OLLAMA_BASE_URL}/api/generate"
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False
-    }
-    try:
-        logger.info(f"Querying Ollama model: {model}")
-        response = requests.post(api_url, json=payload, timeout=timeout)
-        response.raise_for_status()
-        data = response.json()
-        if "response" in data:
-            return data["response"].strip()
-        logger.error(f"Unexpected Ollama response format: {data}")
-        return None
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Ollama API request failed: {e}")
-        return None
 
+    def __init__(self, name, rpm=0, tpm=0):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.concurrency_limit = float(PROVIDER_INITIAL_CONCURRENCY) if rpm or tpm else math.inf
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.throttled = 0 # 429 responses
+        self.timeouts = 0 # Calls that gave up waiting in the queue
+        self.queued_seconds = 0.0
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._refilled = time.monotonic()
+        self._backoff_attempts = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        elapsed = now - self._refilled
+        self._refilled = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def _wait_seconds(self, tokens, now):
+        """
+        Seconds until a request of `tokens` may start; math.inf while the concurrency limit is reached.
+        """
+        if self.concurrency_limit != math.inf and self.in_flight >= max(1, int(self.concurrency_limit)):
+            return math.inf
+        waits = [self.blocked_until - now]
+        if self.rpm and self._requests < 1:
+            waits.append((1 - self._requests) * 60 / self.rpm)
+        if self.tpm and self._tokens < min(tokens, self.tpm):
+            waits.append((min(tokens, self.tpm) - self._tokens) * 60 / self.tpm)
+        return max(0.0, *waits)
+
+    def acquire(self, tokens, max_wait=None):
+        """
+        Waits for this caller's turn and quota. Returns False if that takes longer than max_wait.
+        """
+        max_wait = RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        ticket = object()
+        enqueued = time.monotonic()
+        deadline = enqueued + max_wait
+        with self._cond:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait_for = math.inf
+                    if self._queue[0] is ticket:
+                        wait_for = self._wait_seconds(tokens, now)
+                        if wait_for == 0:
+                            if self.rpm:
+                                self._requests -= 1
+                            if self.tpm:
+                                self._tokens -= min(tokens, self.tpm)
+                            self.in_flight += 1
+                            self.queued_seconds += now - enqueued
+                            return True
+                    remaining = deadline - now
+                    if remaining <= 0 or (wait_for != math.inf and wait_for > remaining):
+                        self.timeouts += 1
+                        return False
+                    self._cond.wait(min(wait_for, remaining))
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+
+    def release(self, reserved_tokens, used_tokens=None, retry_after=None):
+        """
+        Ends a request. Returns the back-off delay if the provider answered 429, else None.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            delay = None
+            if used_tokens is not None and self.tpm:
+                self._tokens = min(self.tpm, self._tokens + reserved_tokens - used_tokens)
+            if retry_after is not None:
+                self.throttled += 1
+                if self.concurrency_limit == math.inf:
+                    self.concurrency_limit = float(max(PROVIDER_INITIAL_CONCURRENCY, self.in_flight + 1))
+                self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+                delay = retry_after or min(RATE_LIMIT_MAX_BACKOFF, RATE_LIMIT_BACKOFF_BASE * 2 ** self._backoff_attempts) * random.uniform(0.5, 1.0)
+                self._backoff_attempts += 1
+                self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+                self._requests = min(self._requests, 0.0)
+            elif used_tokens is not None:
+                self._backoff_attempts = 0
+                if self.concurrency_limit != math.inf:
+                    self.concurrency_limit = min(PROVIDER_MAX_CONCURRENCY, self.concurrency_limit + 1 / self.concurrency_limit)
+            self._cond.notify_all()
+            return delay
+
+    @contextlib.contextmanager
+    def slot(self, prompt):
+        """
+        Holds quota for one network request. Query functions call slot.completed(text) on
+        success and note_rate_limit(e) on errors; the slot is released on exit. If no slot was
+        free within the caller's queue timeout (see call_provider), slot.granted is False and
+        the provider must not be called.
+        """
+        reserved = estimate_tokens(prompt) + PROMPT_OUTPUT_RESERVE_TOKENS
+        queue_timeout = getattr(_call_state, "queue_timeout", None) or RATE_LIMIT_MAX_WAIT
+        max_wait = min(queue_timeout, time_remaining()) # Never queue past the current deadline
+        if max_wait <= 0 or not self.acquire(reserved, max_wait):
+            if max_wait < queue_timeout:
+                _call_state.throttled = f"deadline reached while waiting for {self.name}'s rate limit"
+            else:
+                _call_state.throttled = f"waited over {max_wait:.0f}s for {self.name}'s rate limit"
+            logger.warning(f"⏳ Gave up waiting for {self.name}'s rate limit after {max(0.0, max_wait):.0f}s.")
+            yield RateLimitSlot(False)
+            return
+        _call_state.rate_limited = None
+        slot = RateLimitSlot(True)
+        try:
+            yield slot
+        finally:
+            used = None if slot.output_text is None else estimate_tokens(prompt) + estimate_tokens(slot.output_text)
+            delay = self.release(reserved, used, getattr(_call_state, "rate_limited", None))
+            if delay is not None:
+                logger.warning(f"⏳ {self.name} is rate limited. Backing off for {delay:.1f}s.")
 
-if __name__ == "__main__":
-    print("🚀 AI-Powered Checklist System Prototype 🚀") # User-facing print
+    def snapshot(self):
+        with self._cond:
+            return {
+                "concurrency_limit": round(self.concurrency_limit, 2) if self.concurrency_limit != math.inf else None,
+                "in_flight": self.in_flight,
+                "queued": len(self._queue),
+                "throttled": self.throttled,
+                "queue_timeouts": self.timeouts,
+                "queued_seconds": round(self.queued_seconds, 3),
+            }
 
-    check_ollama_server() # This will set OLLAMA_MODEL to None if server is down
 
-    step_1_define_criteria()
-    
-    # Proceed only if checklist criteria were successfully defined
-    if project_data.get('checklist_criteria') and \
-       not ("Error" in project_data['checklist_criteria'][0] if project_data['checklist_criteria'] else True):
-        step_2_multiprompt_verification()
-        step_3_counterargument_simulation()
-        step_4_ai_generated_conclusion()
-    else:
-        logger.error("\n🚨 Workflow halted due to issues in Step 1: Unable to generate valid checklist criteria.")
-        # Ensure essential keys exist for JSON output even if steps are skipped
-        if 'verification_results' not in project_data: project_data['verification_results'] = {}
-        if 'gemini_analysis_report' not in project_data: project_data['gemini_analysis_report'] = "Skipped due to checklist failure."
-        if 'debate' not in project_data: project_data['debate'] = {"pro_argument_ollama": "Skipped", "against_argument_gemini": "Skipped"}
-        if 'final_conclusion' not in project_data: project_data['final_conclusion'] = "Reconsider: Workflow halted early."
+provider_limiters = {name: ProviderRateLimiter(name, *PROVIDER_RATE_LIMITS.get(name, (0, 0))) for name in PROVIDER_FALLBACK_CHAIN}
 
 
-    logger.info("\n--- 📝 Full Project Data Collected ---")
-    try:
-        with open("project_assessment_output.json", "w") as f:
-            json.dump(project_data, f, indent=2)
-        logger.info("\nFull project data saved to project_assessment_output.json")
-    except Exception as e:
-        logger.error(f"Failed to save project data to JSON: {e}")
+def rate_limit_report():
+    return {name: limiter.snapshot() for name, limiter in provider_limiters.items()}
+
+
+# --- Request Coalescing ---
+class SingleFlight:
+    """
+    Lets concurrent callers with the same key share one call: the first caller (the leader)
+    runs it, later callers wait for its result. The leader's exception is re-raised in every
+    waiter. Nothing is kept once the call finishes; caching is the response cache's job.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {} # key -> Future
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, func, *args, timeout=None, **kwargs):
+        """
+        Returns (result, shared), where shared is True if the result came from another caller's call.
+        A waiter gives up after `timeout` seconds with concurrent.futures.TimeoutError; the
+        leader's call carries on.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._in_flight[key] = Future()
+                self.leaders += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if not leader:
+            return future.result(timeout=timeout), True
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self):
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
+
+
+provider_flights = SingleFlight()
+
+
+# --- Instrumentation ---
+PROVIDER_DEFAULT_MODELS = {
+    "gemini": GEMINI_MODEL_NAME,
+    "huggingface": "gpt2",
+    "groq": "llama3-8b-8192",
+    "cohere": "command-r",
+}
+
+
+def provider_model(name):
+    if name == "ollama":
+        return OLLAMA_MODEL or OLLAMA_MODEL_CONFIG
+    return PROVIDER_DEFAULT_MODELS.get(name, "unknown")
+
+
+class _CallErrorCapture(logging.Filter):
+    """
+    The query_* functions log their failures instead of raising them. While a provider call is
+    being instrumented, this filter keeps the last error message logged on that thread so it
+    can be reported as the call's failure reason.
+    """
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR and getattr(_call_state, "capture_errors", False):
+            _call_state.error = record.getMessage()
+        return True
+
+
+logger.addFilter(_CallErrorCapture())
+
+
+class RunMetrics:
+    """
+    Collects provider-call, dispatch and step events for one process run. Each event is
+    appended to the JSONL trace as it happens; aggregates feed the end-of-run summary and
+    the Prometheus exposition.
+    """
+
+    def __init__(self, trace_path=METRICS_TRACE_PATH):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.trace_path = trace_path
+        self._lock = threading.Lock()
+        self.calls = {} # (provider, model, outcome) -> count
+        self.call_latency = {} # (provider, model) -> {"sum", "count", "buckets"}
+        self.chars = {} # (provider, "prompt" | "response") -> total characters
+        self.steps = {} # step -> {"sum", "count", "max", "failures"}
+        self.dispatches = 0
+        self.fallback_hops = 0
+        self.dispatch_failures = 0
+
+    def _trace(self, event):
+        event = {"ts": round(time.time(), 3), "run_id": self.run_id, **event}
+        if not self.trace_path:
+            return
+        try:
+            with open(self.trace_path, "a") as f:
+                f.write(json.dumps(event) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write trace event to {self.trace_path}: {e}")
+            self.trace_path = None
+
+    def record_call(self, provider, model, prompt, response, latency, outcome, purpose=None,
+                    error=None, streamed=False):
+        """
+        outcome is one of "success", "failure", "cache_hit", "coalesced" or "skipped".
+        """
+        with self._lock:
+            key = (provider, str(model), outcome)
+            self.calls[key] = self.calls.get(key, 0) + 1
+            self.chars[(provider, "prompt")] = self.chars.get((provider, "prompt"), 0) + len(prompt or "")
+            self.chars[(provider, "response")] = self.chars.get((provider, "response"), 0) + len(response or "")
+            if outcome in ("success", "failure"):
+                stats = self.call_latency.setdefault((provider, str(model)), {"sum": 0.0, "count": 0, "buckets": [0] * len(LATENCY_BUCKETS)})
+                stats["sum"] += latency
+                stats["count"] += 1
+                for idx, bound in enumerate(LATENCY_BUCKETS):
+                    if latency <= bound:
+                        stats["buckets"][idx] += 1
+            self._trace({
+                "type": "provider_call", "provider": provider, "model": str(model), "purpose": purpose,
+                "outcome": outcome, "cache_hit": outcome == "cache_hit", "streamed": streamed,
+                "latency_s": round(latency, 4), "prompt_chars": len(prompt or ""),
+                "response_chars": len(response or ""), "error": error,
+            })
+
+    def record_dispatch(self, purpose, mode, attempted, winner, latency):
+        hops = max(0, len(attempted) - 1) if winner else len(attempted)
+        with self._lock:
+            self.dispatches += 1
+            self.fallback_hops += hops
+            if winner is None:
+                self.dispatch_failures += 1
+            self._trace({
+                "type": "dispatch", "purpose": purpose, "mode": mode, "attempted": attempted,
+                "winner": winner, "fallback_hops": hops, "latency_s": round(latency, 4),
+            })
+
+    def record_step(self, step, latency, error=None):
+        with self._lock:
+            stats = self.steps.setdefault(step, {"sum": 0.0, "count": 0, "max": 0.0, "failures": 0})
+            stats["sum"] += latency
+            stats["count"] += 1
+            stats["max"] = max(stats["max"], latency)
+            if error:
+                stats["failures"] += 1
+            self._trace({"type": "step", "step": step, "latency_s": round(latency, 4), "error": error})
+
+    def summary(self):
+        """
+        Per-run timing summary: where the wall-clock time went, by step and by provider.
+        """
+        with self._lock:
+            providers = {}
+            for (provider, model, outcome), count in self.calls.items():
+                entry = providers.setdefault(provider, {"model": model, "calls": 0, "success": 0, "failure": 0,
+                                                        "cache_hit": 0, "coalesced": 0, "skipped": 0,
+                                                        "total_latency_s": 0.0})
+                entry["calls"] += count
+                entry[outcome] += count
+            for (provider, model), stats in self.call_latency.items():
+                entry = providers[provider]
+                entry["total_latency_s"] = round(entry["total_latency_s"] + stats["sum"], 3)
+                entry["mean_latency_s"] = round(entry["total_latency_s"] / max(1, entry["success"] + entry["failure"]), 3)
+            steps = {name: {"calls": st["count"], "total_s": round(st["sum"], 3), "max_s": round(st["max"], 3),
+                            "failures": st["failures"]} for name, st in self.steps.items()}
+            return {
+                "run_id": self.run_id,
+                "steps": steps,
+                "providers": providers,
+                "dispatches": self.dispatches,
+                "fallback_hops": self.fallback_hops,
+                "dispatch_failures": self.dispatch_failures,
+            }
+
+    def prometheus_text(self):
+        """
+        Renders the aggregates in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            lines.append("# HELP llm_provider_requests_total Provider calls by outcome.")
+            lines.append("# TYPE llm_provider_requests_total counter")
+            for (provider, model, outcome), count in sorted(self.calls.items()):
+                lines.append(f'llm_provider_requests_total{{provider="{provider}",model="{model}",outcome="{outcome}"}} {count}')
+
+            lines.append("# HELP llm_provider_request_duration_seconds Latency of provider calls that reached the network.")
+            lines.append("# TYPE llm_provider_request_duration_seconds histogram")
+            for (provider, model), stats in sorted(self.call_latency.items()):
+                labels = f'provider="{provider}",model="{model}"'
+                for bound, count in zip(LATENCY_BUCKETS, stats["buckets"]):
+                    lines.append(f'llm_provider_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'llm_provider_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats["count"]}')
+                lines.append(f'llm_provider_request_duration_seconds_sum{{{labels}}} {stats["sum"]:.6f}')
+                lines.append(f'llm_provider_request_duration_seconds_count{{{labels}}} {stats["count"]}')
+
+            lines.append("# HELP llm_provider_chars_total Prompt and response characters per provider.")
+            lines.append("# TYPE llm_provider_chars_total counter")
+            for (provider, kind), count in sorted(self.chars.items()):
+                lines.append(f'llm_provider_chars_total{{provider="{provider}",kind="{kind}"}} {count}')
+
+            lines.append("# HELP llm_step_duration_seconds Wall-clock time spent in each workflow step.")
+            lines.append("# TYPE llm_step_duration_seconds summary")
+            for step, stats in sorted(self.steps.items()):
+                lines.append(f'llm_step_duration_seconds_sum{{step="{step}"}} {stats["sum"]:.6f}')
+                lines.append(f'llm_step_duration_seconds_count{{step="{step}"}} {stats["count"]}')
+            lines.append("# HELP llm_step_failures_total Steps that raised an exception.")
+            lines.append("# TYPE llm_step_failures_total counter")
+            for step, stats in sorted(self.steps.items()):
+                lines.append(f'llm_step_failures_total{{step="{step}"}} {stats["failures"]}')
+
+            lines.append("# HELP llm_dispatch_requests_total Prompts sent through the provider fallback chain.")
+            lines.append("# TYPE llm_dispatch_requests_total counter")
+            lines.append(f"llm_dispatch_requests_total {self.dispatches}")
+            lines.append("# HELP llm_dispatch_fallback_hops_total Extra providers tried before a dispatch succeeded or gave up.")
+            lines.append("# TYPE llm_dispatch_fallback_hops_total counter")
+            lines.append(f"llm_dispatch_fallback_hops_total {self.fallback_hops}")
+            lines.append("# HELP llm_dispatch_failures_total Dispatches where every provider failed.")
+            lines.append("# TYPE llm_dispatch_failures_total counter")
+            lines.append(f"llm_dispatch_failures_total {self.dispatch_failures}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=METRICS_PROMETHEUS_PATH):
+        if not path:
+            return
+        try:
+            with open(path, "w") as f:
+                f.write(self.prometheus_text())
+            logger.info(f"Metrics written to {path}")
+        except OSError as e:
+            logger.error(f"Failed to write metrics to {path}: {e}")
+
+    def log_summary(self):
+        summary = self.summary()
+        logger.info(f"⏱️ Run {summary['run_id']} timing summary:")
+        for step, st in summary["steps"].items():
+            logger.info(f"   {step}: {st['total_s']}s over {st['calls']} run(s) (max {st['max_s']}s, {st['failures']} failed)")
+        for provider, st in summary["providers"].items():
+            logger.info(f"   {provider} ({st['model']}): {st['calls']} calls, {st['success']} ok, {st['failure']} failed, "
+                        f"{st['cache_hit']} cached, {st['coalesced']} coalesced, {st['skipped']} skipped, "
+                        f"{st['total_latency_s']}s total")
+        logger.info(f"   dispatches: {summary['dispatches']}, fallback hops: {summary['fallback_hops']}, "
+                    f"all-providers-failed: {summary['dispatch_failures']}")
+        return summary
+
+
+metrics = RunMetrics()
+
+
+def query_huggingface(prompt, model_id="gpt2", timeout=30):
+    """
+    Query Hugging Face Inference API for text generation.
+    Requires HUGGINGFACE_API_TOKEN environment variable.
+    """
+    if not HUGGINGFACE_API_TOKEN:
+        logger.warning("HUGGINGFACE_API_TOKEN not set. Skipping Hugging Face query.")
+        return None
+
+    headers = {
+        "Authorization": f"Bearer {HUGGINGFACE_API_TOKEN}",
+        "Accept": "application/json"
+    }
+    cache_key = response_cache_key("huggingface", model_id, prompt)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Using cached Hugging Face response ({model_id}).")
+        return cached
+
+    api_url = f"{HUGGINGFACE_API_URL}/models/{model_id}"
+    # Don't wait for cold models: the API would hold the request until the model has loaded,
+    # regardless of our deadline. A loading model answers 503 and the next provider is tried.
+    payload = {
+        "inputs": prompt,
+        "options": {"wait_for_model": False}
+    }
+    with provider_limiters["huggingface"].slot(prompt) as slot:
+        if not slot.granted:
+            return None
+        timeout = request_timeout(timeout, "huggingface")
+        if not timeout:
+            return None
+        try:
+            logger.info(f"Querying Hugging Face model: {model_id}")
+            response = get_provider_client("huggingface").post(api_url, headers=headers, json=payload, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+            if isinstance(data, dict) and "error" in data:
+                logger.error(f"Hugging Face API error: {data['error']}")
+                return None
+            # The response is usually a list of generated texts
+            if isinstance(data, list) and len(data) > 0 and "generated_text" in data[0]:
+                text = data[0]["generated_text"].strip()
+                slot.completed(text)
+                response_cache.set(cache_key, text)
+                return text
+            logger.error(f"Unexpected Hugging Face response format: {data}")
+            return None
+        except requests.exceptions.RequestException as e:
+            note_rate_limit(e)
+            logger.error(f"Hugging Face API request failed: {e}")
+            return None
+
+def query_groq(prompt, system_message=None, model="llama3-8b-8192", timeout=60):
+    """
+    Query Groq API for text generation.
+    Requires GROQ_API_KEY environment variable.
+    """
+    if not GROQ_API_KEY:
+        logger.warning("GROQ_API_KEY not set. Skipping Groq query.")
+        return None
+    cache_key = response_cache_key("groq", model, prompt, system_message)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Using cached Groq response ({model}).")
+        return cached
+    groq_client = try_get_provider_client("groq")
+    if groq_client is None:
+        return None
+
+    with provider_limiters["groq"].slot(prompt) as slot:
+        if not slot.granted:
+            return None
+        timeout = request_timeout(timeout, "groq")
+        if not timeout:
+            return None
+        try:
+            messages = []
+            if system_message:
+                messages.append({"role": "system", "content": system_message})
+            messages.append({"role": "user", "content": prompt})
+
+            chat_completion = groq_client.chat.completions.create(
+                messages=messages,
+                model=model,
+                timeout=timeout,
+            )
+            text = chat_completion.choices[0].message.content.strip()
+            slot.completed(text)
+            response_cache.set(cache_key, text)
+            return text
+        except Exception as e:
+            note_rate_limit(e)
+            logger.error(f"Groq API request failed: {e}")
+            return None
+
+
+project_data = {}
+
+def query_gemini(prompt, model_instance=None, timeout=60):
+    """
+    Query Google Gemini API for text generation.
+    Requires GEMINI_API_KEY environment variable.
+    """
+    if not GEMINI_API_KEY:
+        logger.warning("GEMINI_API_KEY not set. Skipping Gemini query.")
+        return None
+
+    model_name = getattr(model_instance, "model_name", "gemini") if model_instance else f"models/{GEMINI_MODEL_NAME}"
+    cache_key = response_cache_key("gemini", model_name, prompt)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Using cached Gemini response ({model_name}).")
+        return cached
+    if model_instance is None:
+        model_instance = try_get_provider_client("gemini")
+        if model_instance is None:
+            return None
+
+    with provider_limiters["gemini"].slot(prompt) as slot:
+        if not slot.granted:
+            return None
+        timeout = request_timeout(timeout, "gemini")
+        if not timeout:
+            return None
+        try:
+            logger.info("Querying Gemini model...")
+            # retry=None: api_core's default retry runs for up to 600s regardless of the timeout
+            response = model_instance.generate_content(prompt, request_options={'timeout': timeout, 'retry': None})
+            text = response.text.strip()
+            slot.completed(text)
+            response_cache.set(cache_key, text)
+            return text
+        except Exception as e:
+            note_rate_limit(e)
+            logger.error(f"Gemini API request failed: {e}")
+            return None
+
+def query_cohere(prompt, model="command-r", timeout=60):
+    """
+    Query Cohere API for text generation.
+    Requires COHERE_API_KEY environment variable.
+    """
+    if not COHERE_API_KEY:
+        logger.warning("COHERE_API_KEY not set. Skipping Cohere query.")
+        return None
+    cache_key = response_cache_key("cohere", model, prompt)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Using cached Cohere response ({model}).")
+        return cached
+    cohere_client = try_get_provider_client("cohere")
+    if cohere_client is None:
+        return None
+    with provider_limiters["cohere"].slot(prompt) as slot:
+        if not slot.granted:
+            return None
+        timeout = request_timeout(timeout, "cohere")
+        if not timeout:
+            return None
+        try:
+            response = cohere_client.chat(
+                model=model,
+                message=prompt,
+                request_options={"timeout_in_seconds": math.ceil(timeout)},
+            )
+            text = response.text.strip()
+            slot.completed(text)
+            response_cache.set(cache_key, text)
+            return text
+        except Exception as e:
+            note_rate_limit(e)
+            logger.error(f"Cohere API request failed: {e}")
+            return None
+
+project_data = {}
+
+# --- Prompt Assembly ---
+def estimate_tokens(text):
+    """
+    Cheap token estimate (about CHARS_PER_TOKEN characters per token).
+    """
+    return -(-len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Cuts text down to roughly max_tokens, marking the cut.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    marker = " [...truncated]"
+    keep_chars = max_tokens * CHARS_PER_TOKEN - len(marker)
+    if keep_chars <= 0:
+        return "[omitted to fit the context budget]"
+    return text[:keep_chars].rstrip() + marker
+
+
+def compact_verification_summary(verification_results, max_answer_chars=None):
+    """
+    Renders step 2 results as one "Q: ... A: ..." line per question, grouped by checkpoint.
+    Unlike json.dumps of the raw results, each question appears once.
+    """
+    lines = []
+    for checkpoint, result in (verification_results or {}).items():
+        lines.append(f"- {checkpoint}")
+        for qa in result.get("answers", []):
+            answer = (qa.get("answer") or "").strip() or "(no answer)"
+            if max_answer_chars and len(answer) > max_answer_chars:
+                answer = answer[:max_answer_chars].rstrip() + "..."
+            lines.append(f"  Q: {qa.get('question')} A: {answer}")
+    return "\n".join(lines) if lines else "No verification results."
+
+
+def build_budgeted_prompt(template, sections, provider, purpose="prompt"):
+    """
+    Fills a str.format template with the given sections, shrinking them until the prompt fits
+    the provider's context budget (PROVIDER_CONTEXT_TOKENS minus PROMPT_OUTPUT_RESERVE_TOKENS).
+
+    sections maps a placeholder name to {"text": ..., "priority": int, "compact": optional shorter
+    text}. Lowest-priority sections are shrunk first: they are swapped for their compact
+    version where one exists, then truncated.
+    """
+    budget = PROVIDER_CONTEXT_TOKENS.get(provider, 4096) - PROMPT_OUTPUT_RESERVE_TOKENS
+    texts = {name: spec["text"] for name, spec in sections.items()}
+    fixed_tokens = estimate_tokens(template.format(**{name: "" for name in sections}))
+
+    def overflow():
+        return fixed_tokens + sum(estimate_tokens(text) for text in texts.values()) - budget
+
+    order = sorted(sections, key=lambda name: sections[name]["priority"])
+    shrunk = []
+    for name in order:
+        if overflow() <= 0:
+            break
+        compact = sections[name].get("compact")
+        if compact is not None and estimate_tokens(compact) < estimate_tokens(texts[name]):
+            texts[name] = compact
+            shrunk.append(f"{name} (summarized)")
+    for name in order:
+        over = overflow()
+        if over <= 0:
+            break
+        texts[name] = truncate_to_tokens(texts[name], max(0, estimate_tokens(texts[name]) - over))
+        shrunk.append(f"{name} (truncated)")
+
+    prompt = template.format(**texts)
+    if shrunk:
+        logger.info(f"Prompt for {purpose} shrunk to fit {provider}'s budget of {budget} tokens: {', '.join(shrunk)}")
+    logger.info(f"Prompt for {purpose}: ~{estimate_tokens(prompt)} tokens.")
+    return prompt
+
+
+def debate_context_sections(data):
+    """
+    Prompt sections shared by the debate and conclusion prompts. The user's answers are the
+    evidence everything else is derived from, so they rank above the analysis (and the persona
+    arguments callers add at priority 3) and are only cut once those have been.
+    """
+    return {
+        "industry": {"text": str(data.get('industry')), "priority": 100},
+        "verification": {
+            "text": compact_verification_summary(data.get('verification_results')),
+            "compact": compact_verification_summary(data.get('verification_results'), COMPACT_ANSWER_CHARS),
+            "priority": 4,
+        },
+        "analysis": {"text": str(data.get('gemini_analysis_report', 'Not available')), "priority": 2},
+    }
+
+
+# --- Structured Output Extraction ---
+_FENCE_RE = re.compile(r"```(?:json|JSON|python)?\s*(.*?)```", re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",\s*([\]}])")
+_LIST_LINE_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.+?)\s*$")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+
+def _balanced_span_at(text, start, open_char="[", close_char="]"):
+    """
+    Returns the balanced open_char...close_char substring starting at text[start], ignoring
+    brackets inside quotes, or None if it is never closed (e.g. truncated output).
+    """
+    depth, quote, escaped = 0, None, False
+    for end in range(start, len(text)):
+        c = text[end]
+        if quote:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c == open_char:
+            depth += 1
+        elif c == close_char:
+            depth -= 1
+            if depth == 0:
+                return text[start:end + 1]
+    return None
+
+
+def _bracket_spans(text, open_char="[", close_char="]"):
+    """
+    Yields every balanced [...] (or {...}) substring, outermost first, ignoring brackets inside quotes.
+    """
+    for start, char in enumerate(text):
+        if char == open_char:
+            span = _balanced_span_at(text, start, open_char, close_char)
+            if span:
+                yield span
+
+
+def _parse_list_candidate(candidate):
+    """
+    Parses one candidate array, first as JSON, then with common repairs (smart quotes,
+    trailing commas), then as a Python literal (single-quoted strings).
+    """
+    repaired = _TRAILING_COMMA_RE.sub(r"\1", candidate.translate(_SMART_QUOTES))
+    for parse in (json.loads, lambda text: json.loads(_TRAILING_COMMA_RE.sub(r"\1", text)), ast.literal_eval):
+        for text in (candidate, repaired):
+            try:
+                value = parse(text)
+            except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+                continue
+            if isinstance(value, (list, tuple)) and value and all(isinstance(item, str) for item in value):
+                return [item.strip() for item in value if item.strip()]
+    return None
+
+
+def extract_json_list(text, min_items=1):
+    """
+    Finds a list of strings in free-form LLM output without another model call. Handles
+    strict JSON, markdown code fences, leading/trailing prose, trailing commas, smart quotes
+    and single-quoted strings; as a last resort, bulleted or numbered lines are collected.
+    Returns None if nothing usable is found.
+    """
+    if not text:
+        return None
+    blocks = [match.group(1) for match in _FENCE_RE.finditer(text)] + [text]
+    for block in blocks:
+        for candidate in [block.strip(), *_bracket_spans(block)]:
+            items = _parse_list_candidate(candidate)
+            if items and len(items) >= min_items:
+                return items
+    lines = [match.group(1).strip('"\'` ') for match in map(_LIST_LINE_RE.match, text.splitlines()) if match]
+    lines = [line for line in lines if line]
+    return lines if len(lines) >= max(min_items, 2) else None
+
+
+_MAPPING_ENTRY_RE = re.compile(r"""["']([^"'\n]+)["']\s*:\s*(?=\[)""")
+
+
+def extract_json_object(text):
+    """
+    Finds a JSON object mapping keys to lists of strings in free-form LLM output, with the
+    same repairs as extract_json_list. If no complete object parses (e.g. the output was cut
+    off), the complete `"key": [...]` entries are collected one by one. Entries whose value
+    is not a list of strings are dropped. Returns None if nothing usable is found.
+    """
+    if not text:
+        return None
+    blocks = [match.group(1) for match in _FENCE_RE.finditer(text)] + [text]
+    for block in blocks:
+        for candidate in [block.strip(), *_bracket_spans(block, "{", "}")]:
+            repaired = _TRAILING_COMMA_RE.sub(r"\1", candidate.translate(_SMART_QUOTES))
+            for parse in (json.loads, ast.literal_eval):
+                try:
+                    value = parse(repaired)
+                except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+                    continue
+                if isinstance(value, dict):
+                    entries = {str(key): _parse_list_candidate(json.dumps(items)) for key, items in value.items()
+                               if isinstance(items, (list, tuple))}
+                    entries = {key: items for key, items in entries.items() if items}
+                    if entries:
+                        return entries
+    entries = {}
+    for match in _MAPPING_ENTRY_RE.finditer(text):
+        span = _balanced_span_at(text, match.end())
+        items = _parse_list_candidate(span) if span else None
+        if items:
+            entries[match.group(1).strip()] = items
+    return entries or None
+
+
+def define_criteria(data, industry):
+    """
+    Fills data['checklist_criteria'] for the industry.
+    """
+    data['industry'] = industry
+
+    reused_checklist = semantic_cache.lookup("checklist", industry)
+    if reused_checklist:
+        data['checklist_criteria'] = reused_checklist
+    else:
+        checklist = generate_checklist(industry)
+        if checklist:
+            semantic_cache.add("checklist", [industry], checklist)
+            data['checklist_criteria'] = checklist
+        else:
+            if time_remaining() <= 0:
+                logger.warning("⌛ Out of time for checklist generation. Using the default checklist.")
+            else:
+                logger.error("🚨 Failed to produce a valid JSON checklist even after cleanup. Generating a default list.")
+            data['checklist_criteria'] = [
+                "Technical feasibility assessment",
+                "Financial viability analysis",
+                "Regulatory compliance check",
+                "Resource availability confirmation",
+                "Market demand validation"
+            ]
+
+    logger.info("\n✅ Generated Checklist Criteria:")
+    for i, item in enumerate(data.get('checklist_criteria', [])):
+        print(f"   {i+1}. {item}") # Using print for direct user output
+
+
+def generate_checklist(industry):
+    """
+    Asks the provider chain for a checklist for the industry. If the response cannot be
+    repaired locally, asks Gemini to clean it up. Returns None if both fail.
+    """
+    prompt = f"""
+    You are an AI assistant helping to define project readiness checklists.
+    For a project in the '{industry}' industry/domain, generate a structured list of 3-5 key checkpoints
+    that must be met before proceeding.
+    Focus on high-level categories like: financial feasibility, regulatory compliance, technical readiness.
+
+    Example for 'software project': Scalability, security compliance, API integrations.
+    Example for 'healthcare AI solution': FDA approval, patient data protection, ethical AI use.
+
+    Output the list as a JSON array of strings. For example:
+    ["Checkpoint 1", "Checkpoint 2", "Checkpoint 3"]
+    """
+
+    raw_checklist = dispatch_query(prompt, purpose="checklist generation",
+                                   validator=lambda text: bool(extract_json_list(text)), json_output=True)
+
+    logger.info(f"AI's raw response for checklist:\n{raw_checklist}")
+
+    parsed_checklist = extract_json_list(raw_checklist)
+    if parsed_checklist:
+        return parsed_checklist
+    logger.warning("⚠️ AI did not return a usable checklist list, and local repair failed.")
+    logger.info("Attempting to extract checklist items manually or generate new using Gemini...")
+    cleanup_prompt = f"""
+    The following text is supposed to be a JSON list of project checklist items, but it might be malformed or missing:
+    ---
+    {raw_checklist if raw_checklist else "No content provided by previous AI."}
+    ---
+    Please extract the checklist items and format them as a valid JSON array of strings.
+    If you cannot extract a meaningful list, generate a new list of 3-5 checklist items for a '{industry}' project.
+    """
+    cleaned_checklist_str = call_provider("gemini", cleanup_prompt, purpose="checklist cleanup")
+    logger.info(f"Gemini's cleaned or generated checklist string: {cleaned_checklist_str}")
+    return extract_json_list(cleaned_checklist_str)
+
+
+def generate_validation_questions(item, industry):
+    """
+    Asks the provider chain for 2-3 validation questions for a single checklist item, unless
+    the semantic cache has questions for the same item in a near-identical industry.
+    Falls back to generic questions if no valid JSON list is returned.
+    """
+    reused_questions = semantic_cache.lookup("questions", industry, item)
+    if reused_questions:
+        return reused_questions
+
+    prompt_questions = f"""
+        For the project checklist item: '{item}' in a '{industry}' context,
+        generate 2-3 specific validation questions to assess if this checkpoint is met.
+        Frame them as direct questions the user should answer.
+        Output as a JSON array of strings. Example:
+        ["Question 1?", "Question 2?"]
+        """
+
+    raw_questions = dispatch_query(prompt_questions, purpose=f"question generation ('{item}')",
+                                   validator=lambda text: bool(extract_json_list(text)), json_output=True)
+
+    logger.info(f"AI's raw response for questions:\n{raw_questions}")
+
+    questions = extract_json_list(raw_questions)
+    if questions:
+        semantic_cache.add("questions", [industry, item], questions)
+    else:
+        if time_remaining() <= 0:
+            logger.warning(f"⌛ Out of time for question generation ('{item}'). Using generic questions.")
+        else:
+            logger.warning(f"⚠️ AI did not return usable questions for '{item}'. Using generic questions.")
+        questions = [f"What is the status of '{item}'?", f"What evidence supports the completion of '{item}'?"]
+    return questions
+
+
+def _checkpoint_key(text):
+    # "1. Regulatory Compliance:" and "regulatory compliance" name the same checkpoint
+    return re.sub(r"^\d+\s+", "", normalize_key_text(text))
+
+
+def generate_question_batch(checklist, industry):
+    """
+    Asks the provider chain for validation questions for every checklist item in one call and
+    returns a dict of checklist item -> questions. Items the semantic cache already knows are
+    left out of the prompt. Items missing from the reply, or whose questions did not parse,
+    are missing from the result; the caller requests those individually.
+    """
+    questions = {}
+    pending = []
+    for item in checklist:
+        reused = semantic_cache.lookup("questions", industry, item)
+        if reused:
+            questions[item] = reused
+        else:
+            pending.append(item)
+    if len(pending) < 2:
+        return questions # A single item gains nothing from batching
+
+    items_text = "\n".join(f"- {item}" for item in pending)
+    prompt_batch = f"""
+        For a project in the '{industry}' industry/domain, generate 2-3 specific validation questions
+        for each of the following checklist items, to assess if that checkpoint is met.
+        Frame them as direct questions the user should answer.
+
+        Checklist items:
+        {items_text}
+
+        Output a single JSON object that maps each checklist item, copied exactly, to a JSON array of its questions. Example:
+        {{"Checklist item 1": ["Question 1?", "Question 2?"], "Checklist item 2": ["Question 1?", "Question 2?"]}}
+        """
+
+    def usable(text):
+        return bool(extract_json_object(text))
+
+    raw_batch = dispatch_query(prompt_batch, purpose=f"question generation ({len(pending)} checkpoints)",
+                               validator=usable, json_output=True)
+    logger.info(f"AI's raw response for batched questions:\n{raw_batch}")
+
+    entries = {_checkpoint_key(key): items for key, items in (extract_json_object(raw_batch) or {}).items()}
+    for item in pending:
+        item_questions = entries.get(_checkpoint_key(item))
+        if item_questions:
+            questions[item] = item_questions
+            semantic_cache.add("questions", [industry, item], item_questions)
+    missing = [item for item in pending if item not in questions]
+    if missing:
+        logger.warning(f"⚠️ Batched reply had no usable questions for: {', '.join(missing)}. Requesting them individually.")
+    return questions
+
+
+def checkpoint_questions(item, industry, batch):
+    """
+    Questions for one checklist item: taken from the batched reply if it has them, otherwise
+    generated with a call of their own.
+    """
+    if batch and batch.get(item):
+        return batch[item]
+    return generate_validation_questions(item, industry)
+
+
+def ask_user_answer(item, q_idx, q_text):
+    """
+    Default answer source for step 2: asks the user on the terminal.
+    """
+    answer = input(f"    Q{q_idx+1}: {q_text}\n   Your Answer: ")
+    time.sleep(0.2) # Reduced sleep time
+    return answer
+
+
+def collect_checkpoint_answers(item, questions, answer_fn):
+    """
+    Asks answer_fn for each validation question of one checkpoint.
+    """
+    item_answers = {"checkpoint": item, "questions": questions, "answers": []}
+    for q_idx, q_text in enumerate(questions):
+        answer = answer_fn(item, q_idx, q_text)
+        item_answers["answers"].append({"question": q_text, "answer": answer})
+    return item_answers
+
+
+def analyze_answers(data):
+    """
+    Streams Gemini's analysis of the verification answers into data['gemini_analysis_report'].
+    """
+    user_answers_full_text = "\n".join(
+        f"For '{item}', Q: {qa['question']} A: {qa['answer']}"
+        for item, result in data['verification_results'].items()
+        for qa in result["answers"]
+    )
+    prompt_analysis = f"""
+    Project Type: {data['industry']}
+    Checklist Criteria and User Answers:
+    {user_answers_full_text}
+
+    Based on the user's answers:
+    1. Analyze the provided information for each checkpoint.
+    2. Briefly "cross-reference" against common knowledge of outcomes or best practices for such projects.
+       (e.g., "The financial projections seem optimistic given typical market entry costs for similar SaaS products.")
+    3. Provide a short (1-2 sentence) assessment for each checkpoint (e.g., "Seems well-addressed", "Requires more detail", "Potential risk area").
+    4. Provide an overall brief summary statement about the project's current state based on these answers.
+
+    Output your analysis clearly, perhaps point by point for each checkpoint, and then the overall summary.
+    """
+    logger.info("\n🤖 Asking Gemini to analyze answers and simulate cross-referencing...")
+    print("\n📊 Gemini's Analysis Report:") # User-facing print
+    analysis_report = stream_and_print("gemini", prompt_analysis, purpose="answer analysis")
+    data['gemini_analysis_report'] = analysis_report if analysis_report else "Gemini failed to provide analysis."
+    if not analysis_report:
+        print(data['gemini_analysis_report'])
+
+
+PROJECT_SUMMARY_TEMPLATE = """
+    Project Type: {industry}
+    Checklist Answers:
+    {verification}
+    Gemini's Initial Analysis: {analysis}
+    """
+
+
+def debate_inputs_missing(data):
+    return not data.get('checklist_criteria') or \
+       not data.get('gemini_analysis_report') or \
+       "Skipped" in data.get('gemini_analysis_report', "")
+
+
+def generate_pro_argument(data, include_analysis=True, stream=True):
+    """
+    Persona A's argument from Ollama, or None if Ollama is disabled or failed. With
+    include_analysis=False the argument is drafted from the checklist answers alone, so it can
+    be generated while Gemini's analysis is still running.
+    """
+    if not OLLAMA_MODEL:
+        return None
+    sections = debate_context_sections(data)
+    if not include_analysis:
+        sections["analysis"]["text"] = "Not available yet; argue from the checklist answers."
+    prompt_pro = build_budgeted_prompt("""
+        You are Persona A, an optimistic but realistic project advocate.
+        Given the following project summary, argue WHY the project should proceed.
+        Address potential risks highlighted in the analysis by offering potential solutions or mitigations.
+        Keep your argument concise (2-3 key points).
+
+        Project Summary:
+        """ + PROJECT_SUMMARY_TEMPLATE + """
+
+        Your Pro-Project Argument:
+        """, sections, "ollama", purpose="pro-project argument")
+    logger.info(f"\n🤖 Asking Ollama ({OLLAMA_MODEL}) for Pro-Project Argument (Persona A)...")
+    if stream:
+        return stream_and_print("ollama", prompt_pro, purpose="pro-project argument")
+    return call_provider("ollama", prompt_pro, purpose="pro-project argument")
+
+
+def finish_debate(data, pro_argument, pro_argument_printed):
+    """
+    Records Persona A's argument, asks Gemini for Persona B's counter-argument and stores both
+    in data['debate'].
+    """
+    if pro_argument is None and OLLAMA_MODEL: # Log if Ollama was attempted but failed
+        logger.warning("Ollama failed to provide a pro-argument.")
+    elif pro_argument is None: # Ollama was skipped
+         logger.info("Ollama was skipped for pro-argument. Pro-argument will be missing or generated by Gemini if implemented as fallback.")
+    if pro_argument is None:
+         # For now, we just note it's missing if Ollama is the designated pro-arguer
+         pro_argument = "Pro-argument (Ollama) not available or failed."
+
+
+    data['debate_pro_argument'] = pro_argument
+    if not pro_argument_printed:
+        print(pro_argument)
+
+    against_sections = debate_context_sections(data)
+    against_sections["pro_argument"] = {"text": pro_argument if pro_argument else "Pro-argument not available.", "priority": 3}
+    prompt_against = build_budgeted_prompt("""
+    You are Persona B, a cautious and critical project evaluator.
+    Given the following project summary AND the Pro-Project argument (if available), highlight critical challenges,
+    unaddressed risks, or reasons why the project might fail or needs significant reconsideration.
+    Recommend caution if necessary. Keep your argument concise (2-3 key points).
+
+    Project Summary:
+    """ + PROJECT_SUMMARY_TEMPLATE + """
+
+    Persona A's Pro-Project Argument:
+    {pro_argument}
+
+    Your Critical Counter-Argument (Persona B):
+    """, against_sections, "gemini", purpose="counter-argument")
+    logger.info("\n🤖 Asking Gemini for Against-Project Argument (Persona B)...")
+    print("\n👎 Persona B (Against-Project - Gemini):") # User-facing print
+    against_argument = stream_and_print("gemini", prompt_against, purpose="counter-argument")
+    data['debate_against_argument'] = against_argument if against_argument else "Gemini failed to provide counter-argument."
+    if not against_argument:
+        print(data['debate_against_argument'])
+
+    data['debate'] = {
+        "pro_argument_ollama": data['debate_pro_argument'],
+        "against_argument_gemini": data['debate_against_argument']
+    }
+
+def generate_conclusion(data):
+    """
+    Asks Gemini whether to proceed, based on the answers, the analysis and the debate.
+    """
+    logger.info("\n--- 4️⃣ AI-Generated Conclusion – Proceed or Reconsider? ---")
+    if not data.get('debate') or \
+       "Skipped" in data['debate'].get('pro_argument_ollama', "") or \
+       "Skipped" in data['debate'].get('against_argument_gemini', ""):
+        logger.warning("🚨 Cannot proceed with final conclusion: Debate simulation missing or skipped.")
+        data['final_conclusion'] = "Reconsider: Debate simulation was not performed or failed."
+        return
+
+    # Ensure debate arguments are strings for the prompt
+    pro_arg_text = data['debate'].get('pro_argument_ollama', "Not available")
+    if pro_arg_text is None: pro_arg_text = "Not available"
+    
+    against_arg_text = data['debate'].get('against_argument_gemini', "Not available")
+    if against_arg_text is None: against_arg_text = "Not available"
+
+    conclusion_sections = debate_context_sections(data)
+    conclusion_sections["pro_argument"] = {"text": pro_arg_text, "priority": 3}
+    conclusion_sections["against_argument"] = {"text": against_arg_text, "priority": 3}
+    conclusion_input = build_budgeted_prompt("""
+    Project Type: {industry}
+    Checklist Verification Summary:
+    {verification}
+    Initial Gemini Analysis: {analysis}
+    Debate:
+      Pro-Project (Ollama): {pro_argument}
+      Against-Project (Gemini): {against_argument}
+
+    Based on ALL the information above (checklist results, initial analysis, and the simulated debate),
+    provide a final recommendation: Should the project PROCEED or RECONSIDER?
+
+    If PROCEED:
+      - Briefly confirm feasibility.
+      - Suggest 1-2 high-level next execution steps.
+    If RECONSIDER:
+      - Clearly identify the 1-2 most critical flaws or risks.
+      - Suggest specific modifications or alternative approaches.
+
+    Be decisive but base your recommendation on the provided evidence.
+    Start your response with either "CONCLUSION: PROCEED" or "CONCLUSION: RECONSIDER".
+    """, conclusion_sections, "gemini", purpose="final conclusion")
+    logger.info("\n🤖 Asking Gemini for the Final Conclusion...")
+    print("\n🏁 AI's Final Recommendation (Gemini):") # User-facing print
+    final_conclusion = stream_and_print("gemini", conclusion_input, purpose="final conclusion")
+    data['final_conclusion'] = final_conclusion if final_conclusion else "Gemini failed to provide a final conclusion."
+    if not final_conclusion:
+        print(data['final_conclusion'])
+
+
+def check_ollama_server(quiet=False):
+    """
+    Checks if the Ollama server is running and if the configured model is available.
+    Sets the global OLLAMA_MODEL to None if the server is unreachable or model is not found,
+    and back to the configured model once it is available again. Returns True if Ollama is usable.
+    Also used by the health monitor to re-probe Ollama while its circuit is open; with quiet,
+    the outcome is logged at debug level because the outage has already been reported.
+    """
+    global OLLAMA_MODEL
+    log_info = logger.debug if quiet else logger.info
+    log_warning = logger.debug if quiet else logger.warning
+    log_info(f"Attempting to connect to Ollama server at {OLLAMA_BASE_URL}...")
+    try:
+        # Check if server is reachable. Quiet probes skip the pooled session's retries (and their
+        # warnings): the health monitor already retries on its own schedule.
+        session = requests if quiet else get_provider_client("ollama")
+        session.get(OLLAMA_BASE_URL, timeout=5)
+        log_info("Ollama server is reachable.")
+
+        # Check if the model is available
+        model_list_url = f"{OLLAMA_BASE_URL}/api/tags"
+        response = session.get(model_list_url, timeout=5)
+        response.raise_for_status()
+        models = response.json().get("models", [])
+        available_models = [m["name"] for m in models]
+
+        if OLLAMA_MODEL_CONFIG not in available_models:
+            log_warning(f"🚨 Configured Ollama model '{OLLAMA_MODEL_CONFIG}' not found on server. Available models: {', '.join(available_models) if available_models else 'None'}")
+            OLLAMA_MODEL = None
+        else:
+            log_info(f"Configured Ollama model '{OLLAMA_MODEL_CONFIG}' is available.")
+            OLLAMA_MODEL = OLLAMA_MODEL_CONFIG
+
+    except requests.exceptions.ConnectionError:
+        log_warning(f"🚨 Ollama server not found at {OLLAMA_BASE_URL}. Disabling Ollama functionality.")
+        OLLAMA_MODEL = None
+    except requests.exceptions.Timeout:
+        log_warning(f"🚨 Connection to Ollama server timed out at {OLLAMA_BASE_URL}. Disabling Ollama functionality.")
+        OLLAMA_MODEL = None
+    except requests.exceptions.RequestException as e:
+        log_warning(f"🚨 An error occurred while checking Ollama server: {e}. Disabling Ollama functionality.")
+        OLLAMA_MODEL = None
+
+    if OLLAMA_MODEL is None:
+        provider_health["ollama"].trip()
+    return OLLAMA_MODEL is not None
+
+
+def ollama_payload(model, prompt, stream, json_mode=False):
+    """
+    Request body for /api/generate. num_ctx matches the prompt budget (OLLAMA_CONTEXT_TOKENS),
+    so every request, including the warm-up, loads the model with the same context size.
+    """
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": {
+            "num_ctx": PROVIDER_CONTEXT_TOKENS["ollama"],
+            "num_predict": OLLAMA_NUM_PREDICT,
+        },
+    }
+    if json_mode:
+        payload["format"] = "json"
+    return payload
+
+
+def warm_up_ollama():
+    """
+    Loads the Ollama model into memory with an empty prompt, so the first real request does
+    not pay the cold start. Returns True on success.
+    """
+    if OLLAMA_MODEL is None:
+        return False
+    payload = ollama_payload(OLLAMA_MODEL, "", stream=False)
+    del payload["options"]["num_predict"]
+    started = time.time()
+    try:
+        response = get_provider_client("ollama").post(f"{OLLAMA_BASE_URL}/api/generate", json=payload, timeout=OLLAMA_WARMUP_TIMEOUT)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"⚠️ Ollama warm-up failed: {e}")
+        return False
+    logger.info(f"🔥 Ollama model '{OLLAMA_MODEL}' loaded in {time.time() - started:.1f}s (keep_alive {OLLAMA_KEEP_ALIVE}).")
+    return True
+
+
+def start_ollama_warmup():
+    """
+    Warms the Ollama model on a background thread (see warm_up_ollama) if OLLAMA_WARMUP is set.
+    """
+    if OLLAMA_WARMUP and OLLAMA_MODEL is not None:
+        threading.Thread(target=warm_up_ollama, name="ollama-warmup", daemon=True).start()
+
+
+def query_ollama(prompt, model=None, timeout=60, json_mode=False):
+    """
+    Query the Ollama server for text generation. Returns the generated text or None on failure.
+    With json_mode=True, Ollama constrains the output to valid JSON.
+    """
+    if OLLAMA_MODEL is None:
+        logger.info("Ollama is disabled or unavailable. Skipping Ollama query.")
+        return None
+    if model is None:
+        model = OLLAMA_MODEL
+    cache_key = response_cache_key("ollama", model, prompt, *(["json"] if json_mode else []))
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Using cached Ollama response ({model}).")
+        return cached
+    api_url = f"{OLLAMA_BASE_URL}/api/generate"
+    payload = ollama_payload(model, prompt, stream=False, json_mode=json_mode)
+    with provider_limiters["ollama"].slot(prompt) as slot:
+        if not slot.granted:
+            return None
+        timeout = request_timeout(timeout, "ollama")
+        if not timeout:
+            return None
+        try:
+            logger.info(f"Querying Ollama model: {model}")
+            response = get_provider_client("ollama").post(api_url, json=payload, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+            if "response" in data:
+                text = data["response"].strip()
+                slot.completed(text)
+                response_cache.set(cache_key, text)
+                return text
+            logger.error(f"Unexpected Ollama response format: {data}")
+            return None
+        except requests.exceptions.RequestException as e:
+            note_rate_limit(e)
+            logger.error(f"Ollama API request failed: {e}")
+            return None
+
+
+# --- Streaming ---
+# Each stream_* function is a generator yielding text chunks as the provider produces them.
+# Cached responses are yielded as a single chunk; a response is only cached once the stream
+# has completed, which also sets _call_state.stream_completed. On failure the generator logs
+# the error and stops early, possibly after some chunks were already yielded.
+def stream_ollama(prompt, model=None, timeout=60):
+    if OLLAMA_MODEL is None:
+        logger.info("Ollama is disabled or unavailable. Skipping Ollama stream.")
+        return
+    if model is None:
+        model = OLLAMA_MODEL
+    cache_key = response_cache_key("ollama", model, prompt)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Using cached Ollama response ({model}).")
+        _call_state.stream_completed = True
+        yield cached
+        return
+    api_url = f"{OLLAMA_BASE_URL}/api/generate"
+    payload = ollama_payload(model, prompt, stream=True)
+    chunks = []
+    with provider_limiters["ollama"].slot(prompt) as slot:
+        if not slot.granted:
+            return
+        timeout = request_timeout(timeout, "ollama")
+        if not timeout:
+            return
+        try:
+            logger.info(f"Streaming from Ollama model: {model}")
+            with get_provider_client("ollama").post(api_url, json=payload, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                # Ollama streams newline-delimited JSON objects
+                done = False
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if "error" in data:
+                        logger.error(f"Ollama stream error: {data['error']}")
+                        return
+                    chunk = data.get("response", "")
+                    if chunk:
+                        chunks.append(chunk)
+                        yield chunk
+                    if data.get("done"):
+                        done = True
+                        break
+                if not done:
+                    logger.error("Ollama stream ended before the response was done.")
+                    return
+            text = "".join(chunks).strip()
+            slot.completed(text)
+            response_cache.set(cache_key, text)
+            _call_state.stream_completed = True
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            note_rate_limit(e)
+            logger.error(f"Ollama streaming request failed: {e}")
+
+
+def stream_gemini(prompt, model_instance=None, timeout=60):
+    if not GEMINI_API_KEY:
+        logger.warning("GEMINI_API_KEY not set. Skipping Gemini stream.")
+        return
+    model_name = getattr(model_instance, "model_name", "gemini") if model_instance else f"models/{GEMINI_MODEL_NAME}"
+    cache_key = response_cache_key("gemini", model_name, prompt)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Using cached Gemini response ({model_name}).")
+        _call_state.stream_completed = True
+        yield cached
+        return
+    if model_instance is None:
+        model_instance = try_get_provider_client("gemini")
+        if model_instance is None:
+            return
+    chunks = []
+    with provider_limiters["gemini"].slot(prompt) as slot:
+        if not slot.granted:
+            return
+        timeout = request_timeout(timeout, "gemini")
+        if not timeout:
+            return
+        try:
+            logger.info("Streaming from Gemini model...")
+            # retry=None: api_core's default retry runs for up to 600s regardless of the timeout
+            response = model_instance.generate_content(prompt, stream=True, request_options={'timeout': timeout, 'retry': None})
+            for part in response:
+                chunk = part.text
+                if chunk:
+                    chunks.append(chunk)
+                    yield chunk
+            text = "".join(chunks).strip()
+            slot.completed(text)
+            response_cache.set(cache_key, text)
+            _call_state.stream_completed = True
+        except Exception as e:
+            note_rate_limit(e)
+            logger.error(f"Gemini streaming request failed: {e}")
+
+
+def stream_groq(prompt, system_message=None, model="llama3-8b-8192", timeout=60):
+    if not GROQ_API_KEY:
+        logger.warning("GROQ_API_KEY not set. Skipping Groq stream.")
+        return
+    cache_key = response_cache_key("groq", model, prompt, system_message)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Using cached Groq response ({model}).")
+        _call_state.stream_completed = True
+        yield cached
+        return
+    messages = []
+    if system_message:
+        messages.append({"role": "system", "content": system_message})
+    messages.append({"role": "user", "content": prompt})
+    chunks = []
+    groq_client = try_get_provider_client("groq")
+    if groq_client is None:
+        return
+    with provider_limiters["groq"].slot(prompt) as slot:
+        if not slot.granted:
+            return
+        timeout = request_timeout(timeout, "groq")
+        if not timeout:
+            return
+        try:
+            stream = groq_client.chat.completions.create(messages=messages, model=model, stream=True, timeout=timeout)
+            for part in stream:
+                chunk = part.choices[0].delta.content if part.choices else None
+                if chunk:
+                    chunks.append(chunk)
+                    yield chunk
+            text = "".join(chunks).strip()
+            slot.completed(text)
+            response_cache.set(cache_key, text)
+            _call_state.stream_completed = True
+        except Exception as e:
+            note_rate_limit(e)
+            logger.error(f"Groq streaming request failed: {e}")
+
+
+def stream_cohere(prompt, model="command-r", timeout=60):
+    if not COHERE_API_KEY:
+        logger.warning("COHERE_API_KEY not set. Skipping Cohere stream.")
+        return
+    cache_key = response_cache_key("cohere", model, prompt)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Using cached Cohere response ({model}).")
+        _call_state.stream_completed = True
+        yield cached
+        return
+    cohere_client = try_get_provider_client("cohere")
+    if cohere_client is None:
+        return
+    chunks = []
+    with provider_limiters["cohere"].slot(prompt) as slot:
+        if not slot.granted:
+            return
+        timeout = request_timeout(timeout, "cohere")
+        if not timeout:
+            return
+        try:
+            for event in cohere_client.chat_stream(model=model, message=prompt,
+                                                   request_options={"timeout_in_seconds": math.ceil(timeout)}):
+                if event.event_type == "text-generation" and event.text:
+                    chunks.append(event.text)
+                    yield event.text
+            text = "".join(chunks).strip()
+            slot.completed(text)
+            response_cache.set(cache_key, text)
+            _call_state.stream_completed = True
+        except Exception as e:
+            note_rate_limit(e)
+            logger.error(f"Cohere streaming request failed: {e}")
+
+
+PROVIDER_STREAMS = {
+    "ollama": stream_ollama,
+    "gemini": stream_gemini,
+    "groq": stream_groq,
+    "cohere": stream_cohere,
+}
+
+# Appended to the text kept from a stream that stopped early, so stored results show it
+STREAM_TRUNCATED_NOTE = "\n[Incomplete response: the {provider} stream stopped early ({reason}).]"
+
+
+def stream_and_print(provider, prompt, purpose=None):
+    """
+    Prints a provider's response to stdout as it arrives and returns the full text, or None
+    if nothing was received. Providers without streaming support (and runs with
+    STREAM_OUTPUT disabled) fall back to a blocking query whose result is printed at once.
+
+    A stream that fails or hits the deadline after producing output is recorded as a failed
+    call, and the partial text is returned with STREAM_TRUNCATED_NOTE appended.
+    """
+    if not STREAM_OUTPUT or provider not in PROVIDER_STREAMS:
+        text = call_provider(provider, prompt, purpose)
+        if text:
+            print(text)
+        return text
+
+    if not _admit_call(provider, prompt, purpose):
+        return None
+
+    started = time.time()
+    chunks = []
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        _call_state.stream_completed = False
+        stream = PROVIDER_STREAMS[provider](prompt)
+        for chunk in stream:
+            print(chunk, end="", flush=True) # User-facing streamed output
+            chunks.append(chunk)
+            if time_remaining() <= 0:
+                # Keep what has arrived; an incomplete stream is never cached
+                stream.close()
+                logger.warning(f"⌛ Deadline reached while streaming {purpose} from {provider}. Keeping the partial response.")
+                break
+        # Only retry a stream that was rejected before producing output
+        if chunks or _call_state.rate_limited is None or _call_state.throttled:
+            break
+        logger.info(f"Retrying {provider} for {purpose} after a rate limit (attempt {attempt + 2}).")
+    text = "".join(chunks).strip()
+    truncated = bool(text) and not _call_state.stream_completed
+    error = None
+    if truncated:
+        error = "deadline reached" if time_remaining() <= 0 else \
+            getattr(_call_state, "error", None) or "stream ended before completion"
+        text += STREAM_TRUNCATED_NOTE.format(provider=provider, reason=error)
+        print(STREAM_TRUNCATED_NOTE.format(provider=provider, reason=error), end="")
+    if chunks:
+        print()
+    _finish_call(provider, prompt, text, started, purpose, streamed=True, error=error, truncated=truncated)
+    return text if text else None
+
+
+# --- Provider Health ---
+class ProviderHealth:
+    """
+    Tracks one provider's EWMA latency, EWMA error rate and circuit-breaker state.
+
+    closed:    requests flow normally.
+    open:      requests are rejected until the cool-down expires. Once it has, a background
+               probe may stand in for the trial request.
+    half-open: a single trial request is let through; success closes the circuit,
+               failure re-opens it with a doubled cool-down.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name):
+        self.name = name
+        self.state = self.CLOSED
+        self.ewma_latency = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.failures = 0
+        self.open_seconds = HEALTH_OPEN_SECONDS
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.trial_started_at = None
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.open_seconds:
+                logger.info(f"Circuit for {self.name} is half-open. Sending a trial request.")
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                self.trial_started_at = time.time()
+                return True
+            return False
+
+    def is_available(self):
+        """
+        Like allow_request, but without claiming the half-open trial slot.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                return time.time() - self.opened_at >= self.open_seconds
+            return not self.trial_in_flight
+
+    def record(self, success, latency, cached=False):
+        """
+        Records the outcome of a request. Cache hits say nothing about the provider's
+        latency, so they are ignored apart from freeing the half-open trial slot.
+        """
+        if cached:
+            self.release_trial()
+            return
+        with self._lock:
+            self.trial_in_flight = False
+            if self.ewma_latency is None:
+                self.ewma_latency = latency
+            else:
+                self.ewma_latency = HEALTH_EWMA_ALPHA * latency + (1 - HEALTH_EWMA_ALPHA) * self.ewma_latency
+            self.error_rate = HEALTH_EWMA_ALPHA * (0.0 if success else 1.0) + (1 - HEALTH_EWMA_ALPHA) * self.error_rate
+            if success:
+                self.successes += 1
+                self.consecutive_failures = 0
+                if self.state != self.CLOSED:
+                    logger.info(f"✅ Circuit for {self.name} closed again.")
+                self.state = self.CLOSED
+                self.open_seconds = HEALTH_OPEN_SECONDS
+                return
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN:
+                self.open_seconds = min(self.open_seconds * 2, HEALTH_MAX_OPEN_SECONDS)
+                self._open()
+            elif self.state == self.CLOSED and self.consecutive_failures >= HEALTH_FAILURE_THRESHOLD:
+                self._open()
+
+    def release_trial(self):
+        """
+        Frees the half-open trial slot without recording an outcome (the request was never sent).
+        """
+        with self._lock:
+            self.trial_in_flight = False
+
+    def trial_stuck(self):
+        """
+        True if the half-open trial has been held longer than HEALTH_TRIAL_TIMEOUT without an
+        outcome, so only a health probe can settle the circuit.
+        """
+        with self._lock:
+            return (self.state == self.HALF_OPEN and self.trial_in_flight
+                    and time.time() - self.trial_started_at >= HEALTH_TRIAL_TIMEOUT)
+
+    def probe_due(self):
+        """
+        True if the circuit is open and its cool-down has passed, so the health monitor may probe it.
+        """
+        with self._lock:
+            return self.state == self.OPEN and time.time() - self.opened_at >= self.open_seconds
+
+    def probe_failed(self):
+        """
+        Re-opens the circuit with a doubled cool-down after a failed background probe, like a
+        failed trial. The provider was already reported down, so this only logs at debug level.
+        """
+        with self._lock:
+            self.trial_in_flight = False
+            self.open_seconds = min(self.open_seconds * 2, HEALTH_MAX_OPEN_SECONDS)
+            self.state = self.OPEN
+            self.opened_at = time.time()
+            logger.debug(f"{self.name} is still down. Next probe in {self.open_seconds:.0f}s.")
+
+    def trip(self):
+        """
+        Opens the circuit immediately (e.g. after a failed startup check).
+        """
+        with self._lock:
+            self.trial_in_flight = False
+            if self.state != self.OPEN:
+                self._open()
+
+    def reset(self):
+        """
+        Closes the circuit after a successful background probe.
+        """
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"✅ {self.name} passed its health probe. Closing circuit.")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.trial_in_flight = False
+            self.open_seconds = HEALTH_OPEN_SECONDS
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.time()
+        logger.warning(f"🚨 Circuit for {self.name} opened for {self.open_seconds:.0f}s after {self.consecutive_failures} consecutive failure(s).")
+
+    def routing_latency(self):
+        """
+        Expected latency used for ranking. Each unit of error rate counts as one extra attempt.
+        """
+        latency = self.ewma_latency if self.ewma_latency is not None else HEALTH_UNKNOWN_LATENCY
+        return latency * (1 + self.error_rate)
+
+    def snapshot(self):
+        return {
+            "state": self.state,
+            "ewma_latency": round(self.ewma_latency, 3) if self.ewma_latency is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "successes": self.successes,
+            "failures": self.failures,
+        }
+
+
+provider_health = {name: ProviderHealth(name) for name in PROVIDER_FALLBACK_CHAIN}
+
+
+def rank_providers(providers):
+    """
+    Returns the enabled providers whose circuit is not open, fastest expected latency first.
+    Ties (e.g. providers without samples yet) keep the order given.
+    """
+    available = [name for name in providers if provider_enabled(name) and provider_health[name].is_available()]
+    return sorted(available, key=lambda name: provider_health[name].routing_latency())
+
+
+def _admit_call(name, prompt, purpose=None, queue_timeout=None):
+    """
+    Checks that a provider may be called right now. Rejections are recorded as skipped calls.
+    """
+    if not provider_enabled(name):
+        reason = "provider is not configured"
+    elif time_remaining() <= 0:
+        reason = "deadline reached"
+    elif not provider_health[name].allow_request():
+        reason = f"circuit is {provider_health[name].state}"
+    else:
+        _call_state.cache_hit = False
+        _call_state.cache_key = None
+        _call_state.error = None
+        _call_state.capture_errors = True
+        _call_state.throttled = None
+        _call_state.rate_limited = None
+        _call_state.queue_timeout = queue_timeout
+        return True
+    logger.info(f"Skipping {name}: {reason}.")
+    metrics.record_call(name, provider_model(name), prompt, None, 0.0, "skipped", purpose=purpose, error=reason)
+    return False
+
+
+def _finish_call(name, prompt, result, started, purpose=None, streamed=False, error=None, truncated=False):
+    """
+    Records the outcome of an admitted call in the provider's health and in the run metrics.
+    A truncated result (a stream that stopped early) counts as a failure.
+    """
+    _call_state.capture_errors = False
+    latency = time.time() - started
+    success = _is_valid_response(result) and not truncated
+    cached = _call_state.cache_hit
+    health = provider_health[name]
+    throttled = not success and getattr(_call_state, "throttled", None)
+    if throttled:
+        # The provider was never called: our own rate limiter or deadline stopped the request,
+        # which says nothing about its health
+        health.release_trial()
+        outcome, error = "skipped", throttled
+    elif not success and not cached and time_remaining() <= 0:
+        # Cut short by a timeout shortened to fit the deadline; not held against the provider
+        health.release_trial()
+        outcome = "failure"
+        error = f"deadline reached ({getattr(_call_state, 'error', None) or 'no complete response'})"
+    else:
+        health.record(success, latency, cached=cached)
+        if cached:
+            outcome = "cache_hit"
+        else:
+            outcome = "success" if success else "failure"
+    if not success and error is None:
+        error = getattr(_call_state, "error", None) or "empty response"
+    metrics.record_call(name, provider_model(name), prompt, result, latency, outcome,
+                        purpose=purpose, error=None if success else error, streamed=streamed)
+
+
+def call_provider(name, prompt, purpose=None, json_output=False, queue_timeout=None, validator=None):
+    """
+    Queries a single provider through its circuit breaker and rate limiter and records latency
+    and outcome. Returns None without calling the provider if it is not configured, its circuit
+    is open, or its rate limit would hold the call back longer than queue_timeout (default
+    RATE_LIMIT_MAX_WAIT). A 429 is retried up to RATE_LIMIT_MAX_RETRIES times after the
+    provider's back-off. json_output asks providers that support it (JSON_MODE_PROVIDERS) for
+    valid JSON only. A response that `validator` rejects is returned but removed from the
+    response cache, so the next call asks the provider again.
+
+    With REQUEST_COALESCING, a call identical to one already in flight (same provider, model,
+    prompt and json_output) waits for that call's result instead of sending its own request.
+    """
+    if not REQUEST_COALESCING:
+        return _call_provider(name, prompt, purpose, json_output, queue_timeout, validator)
+    key = response_cache_key(name, provider_model(name), prompt, bool(json_output))
+    started = time.time()
+    remaining = time_remaining()
+    try:
+        result, shared = provider_flights.do(key, _call_provider, name, prompt, purpose, json_output, queue_timeout, validator,
+                                             timeout=None if remaining == math.inf else max(0.0, remaining))
+    except FutureTimeoutError:
+        logger.warning(f"⌛ Deadline reached while waiting for a shared {name} request for {purpose}.")
+        metrics.record_call(name, provider_model(name), prompt, None, time.time() - started, "skipped",
+                            purpose=purpose, error="deadline reached waiting for a shared call")
+        return None
+    if shared:
+        logger.info(f"🔗 Shared an in-flight {name} request for {purpose}.")
+        metrics.record_call(name, provider_model(name), prompt, result, time.time() - started, "coalesced",
+                            purpose=purpose, error=None if _is_valid_response(result) else "shared call failed")
+    return result
+
+
+def _call_provider(name, prompt, purpose=None, json_output=False, queue_timeout=None, validator=None):
+    if not _admit_call(name, prompt, purpose, queue_timeout):
+        return None
+    options = {"json_mode": True} if json_output and name in JSON_MODE_PROVIDERS else {}
+    started = time.time()
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        try:
+            result = PROVIDER_QUERIES[name](prompt, **options)
+        except Exception as e:
+            _finish_call(name, prompt, None, started, purpose, error=str(e))
+            raise
+        if _call_state.rate_limited is None or _call_state.throttled or attempt == RATE_LIMIT_MAX_RETRIES:
+            break
+        # The limiter holds the next attempt back until the provider's back-off window has passed
+        logger.info(f"Retrying {name} for {purpose} after a rate limit (attempt {attempt + 2}).")
+    _finish_call(name, prompt, result, started, purpose)
+    if result is not None and validator is not None and not validator(result):
+        response_cache.delete(_call_state.cache_key)
+    return result
+
+
+def _probe_gemini():
+    import google.generativeai as genai
+    get_provider_client("gemini") # Configures the SDK with the API key
+    genai.get_model(f"models/{GEMINI_MODEL_NAME}")
+    return True
+
+
+def _probe_groq():
+    get_provider_client("groq").models.list()
+    return True
+
+
+def _probe_cohere():
+    get_provider_client("cohere").models.list()
+    return True
+
+
+# Cheap checks that do not spend generation tokens. Providers without a probe are
+# re-tested by letting a single real request through once the cool-down has passed.
+PROVIDER_PROBES = {
+    "ollama": functools.partial(check_ollama_server, quiet=True),
+    "gemini": _probe_gemini,
+    "groq": _probe_groq,
+    "cohere": _probe_cohere,
+}
+
+
+def probe_open_circuits():
+    """
+    Runs the health probe of every provider whose circuit is open with an expired cool-down,
+    or half-open with a trial that never reported back, and closes the circuit of those that
+    respond. A failed probe re-opens the circuit with a doubled cool-down, so a provider that
+    stays down is probed less and less often. A stuck half-open circuit that cannot be probed
+    is opened again so that a new trial follows its cool-down.
+    """
+    for name, health in provider_health.items():
+        probe = PROVIDER_PROBES.get(name)
+        stuck = health.trial_stuck()
+        if stuck and probe is None:
+            health.trip()
+            continue
+        if not (stuck or health.probe_due()) or probe is None:
+            continue
+        # Ollama needs no credentials; it is disabled by clearing OLLAMA_MODEL, which its probe restores
+        if name != "ollama" and not provider_enabled(name):
+            continue
+        try:
+            healthy = probe()
+        except Exception as e:
+            logger.debug(f"Health probe for {name} failed: {e}")
+            healthy = False
+        if healthy:
+            health.reset()
+            if name == "ollama":
+                start_ollama_warmup() # The server may have restarted with the model unloaded
+        else:
+            health.probe_failed()
+
+
+_health_monitor_started = threading.Event()
+
+
+def start_health_monitor(interval=HEALTH_PROBE_INTERVAL):
+    """
+    Starts the background thread that checks every `interval` seconds for circuits due a probe.
+    Calling it more than once has no effect.
+    """
+    if _health_monitor_started.is_set():
+        return
+    _health_monitor_started.set()
+
+    def monitor():
+        while True:
+            time.sleep(interval)
+            try:
+                probe_open_circuits()
+            except Exception as e:
+                logger.error(f"Health monitor error: {e}")
+
+    threading.Thread(target=monitor, name="health-monitor", daemon=True).start()
+
+
+def health_report():
+    return {name: health.snapshot() for name, health in provider_health.items()}
+
+
+# --- Provider Dispatch ---
+PROVIDER_QUERIES = {
+    "ollama": query_ollama,
+    "gemini": query_gemini,
+    "huggingface": query_huggingface,
+    "groq": query_groq,
+    "cohere": query_cohere,
+}
+
+
+
+def provider_enabled(name):
+    """
+    Returns True if the given provider is configured and can be queried.
+    """
+    if name in _provider_init_errors:
+        return False
+    if name == "ollama":
+        return OLLAMA_MODEL is not None
+    if name == "gemini":
+        return bool(GEMINI_API_KEY)
+    if name == "huggingface":
+        return bool(HUGGINGFACE_API_TOKEN)
+    if name == "groq":
+        return bool(GROQ_API_KEY)
+    if name == "cohere":
+        return bool(COHERE_API_KEY)
+    return False
+
+
+def _is_valid_response(text):
+    return isinstance(text, str) and text.strip() != ""
+
+
+def dispatch_query(prompt, providers=None, mode=None, purpose="query", validator=None, json_output=False):
+    """
+    Sends a prompt to the provider fallback chain and returns the first valid response, or None.
+
+    Providers that are unconfigured or whose circuit is open are skipped, and the rest are
+    tried fastest first (see rank_providers). mode "sequential" tries each provider in turn,
+    "race" starts the first PROVIDER_RACE_WIDTH providers concurrently, and "hedge" starts one
+    provider and adds the next one every PROVIDER_HEDGE_DELAY seconds until one answers.
+    A failed request is replaced by the next provider in the chain right away. Requests that
+    have not started yet are cancelled once a winner is found; requests already in flight are
+    left to finish and their results discarded. json_output is passed on to call_provider.
+
+    Under a deadline (see deadline_scope), providers expected to take longer than the time left
+    are not tried (the fastest one always is, while any time remains), no new provider is
+    started once the deadline has passed, and None is returned at the deadline even if
+    requests are still in flight.
+    """
+    if providers is None:
+        providers = PROVIDER_FALLBACK_CHAIN
+    if mode is None:
+        mode = PROVIDER_DISPATCH_MODE
+    if validator is None:
+        validator = _is_valid_response
+
+    candidates = rank_providers(providers)
+    skipped = [name for name in providers if name not in candidates]
+    if skipped:
+        logger.info(f"Skipping unconfigured or unhealthy providers for {purpose}: {', '.join(skipped)}")
+    remaining = time_remaining()
+    if remaining <= 0:
+        logger.warning(f"⌛ Deadline reached before {purpose}. Not querying any provider.")
+        candidates = []
+    else:
+        too_slow = [name for name in candidates[1:] if not _fits_deadline(name)]
+        if too_slow:
+            logger.info(f"⌛ {remaining:.1f}s left for {purpose}. Skipping slower providers: {', '.join(too_slow)}")
+            candidates = [name for name in candidates if name not in too_slow]
+    if not candidates:
+        logger.error(f"🚨 No providers available for {purpose}.")
+        metrics.record_dispatch(purpose, mode, [], None, 0.0)
+        return None
+    if mode not in ("sequential", "race", "hedge"):
+        logger.warning(f"Unknown dispatch mode '{mode}'. Falling back to sequential dispatch.")
+        mode = "sequential"
+
+    started = time.time()
+    attempted = []
+    if mode == "sequential":
+        winner, result = _dispatch_sequential(prompt, candidates, purpose, validator, attempted, json_output)
+    else:
+        winner, result = _dispatch_concurrent(prompt, candidates, mode, purpose, validator, attempted, json_output)
+    metrics.record_dispatch(purpose, mode, attempted, winner, time.time() - started)
+    if winner is None:
+        logger.error(f"🚨 All providers failed for {purpose}.")
+    return result
+
+
+def _fits_deadline(name):
+    """
+    True if the provider's expected latency fits in the time left on the current deadline.
+    """
+    return provider_health[name].routing_latency() <= time_remaining()
+
+
+def _dispatch_sequential(prompt, candidates, purpose, validator, attempted, json_output=False):
+    for idx, name in enumerate(candidates):
+        if idx and not _fits_deadline(name):
+            logger.warning(f"⌛ Not enough time left to fall back to {name} for {purpose}.")
+            continue
+        logger.info(f"🤖 Asking {name} for {purpose}...")
+        attempted.append(name)
+        # Don't queue long behind a rate limit while another provider could answer
+        queue_timeout = RATE_LIMIT_FALLBACK_WAIT if idx + 1 < len(candidates) else None
+        result = call_provider(name, prompt, purpose, json_output, queue_timeout, validator)
+        if validator(result):
+            return name, result
+        if idx + 1 < len(candidates):
+            logger.warning(f"⚠️ {name} failed or was skipped for {purpose}. Falling back to {candidates[idx + 1]}...")
+    return None, None
+
+
+def _dispatch_concurrent(prompt, candidates, mode, purpose, validator, attempted, json_output=False):
+    # One thread per candidate, so concurrent dispatches never queue behind each other. The pool
+    # is shut down without waiting: abandoned requests finish on their own threads (and are still
+    # joined at interpreter exit), but the caller returns as soon as it has a winner.
+    executor = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix="provider")
+    try:
+        return _race_providers(executor, prompt, candidates, mode, purpose, validator, attempted, json_output)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _race_providers(executor, prompt, candidates, mode, purpose, validator, attempted, json_output):
+    queue = list(candidates)
+    pending = {}
+    deadline = current_deadline()
+
+    def launch():
+        while queue:
+            name = queue.pop(0)
+            if pending and not _fits_deadline(name):
+                logger.warning(f"⌛ Not enough time left to add {name} for {purpose}.")
+                continue
+            logger.info(f"🤖 Asking {name} for {purpose} ({mode})...")
+            attempted.append(name)
+            queue_timeout = RATE_LIMIT_FALLBACK_WAIT if queue else None
+            future = executor.submit(run_with_deadline, deadline, call_provider,
+                                     name, prompt, purpose, json_output, queue_timeout, validator)
+            pending[future] = name
+            return
+
+    initial = max(1, PROVIDER_RACE_WIDTH) if mode == "race" else 1
+    for _ in range(min(initial, len(queue))):
+        launch()
+
+    while pending:
+        hedge_timeout = PROVIDER_HEDGE_DELAY if mode == "hedge" and queue else math.inf
+        remaining = time_remaining()
+        timeout = min(hedge_timeout, max(0.0, remaining))
+        done, _ = wait(pending, timeout=None if timeout == math.inf else timeout, return_when=FIRST_COMPLETED)
+        if not done and remaining <= hedge_timeout:
+            logger.warning(f"⌛ Deadline reached for {purpose}. Abandoning: {', '.join(pending.values())}")
+            for other in pending:
+                other.cancel()
+            return None, None
+        if not done:
+            logger.info(f"No response within {PROVIDER_HEDGE_DELAY}s for {purpose}. Sending hedged request...")
+            launch()
+            continue
+        for future in done:
+            name = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"{name} raised an error during {purpose}: {e}")
+                result = None
+            if validator(result):
+                for other in pending:
+                    other.cancel()
+                if pending:
+                    logger.info(f"✅ {name} answered first for {purpose}. Abandoning: {', '.join(pending.values())}")
+                return name, result
+            logger.warning(f"⚠️ {name} failed for {purpose}.")
+            if queue and time_remaining() > 0:
+                launch()
+    return None, None
+
+
+# --- Assessment Journal ---
+class AssessmentJournal:
+    """
+    Append-only JSONL journal of interactive assessments. Every record is flushed and fsynced
+    before the call returns, so a crash or Ctrl-C loses at most the record being written.
+
+    Record types: "session" (start of an assessment, with its initial data), "industry" (the
+    industry as soon as it is typed), "answer" (one typed answer), "task" (a completed workflow
+    task and the values it produced) and "complete". Each new assessment appends a "session" record; resuming continues the last one.
+    """
+
+    def __init__(self, path=ASSESSMENT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def record(self, event):
+        line = json.dumps({"time": round(time.time(), 3), **event}, default=str)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def last_session(self):
+        """
+        Returns the records of the most recent assessment, starting with its "session"
+        record, or an empty list if there is none. A torn final line is ignored.
+        """
+        events = []
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"⚠️ Ignoring unreadable journal line in {self.path}.")
+                        continue
+                    if event.get("type") == "session":
+                        events = []
+                    events.append(event)
+        except FileNotFoundError:
+            return []
+        return events if events and events[0].get("type") == "session" else []
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# --- Workflow Graph ---
+class WorkflowTask:
+    """
+    One unit of an assessment. `func(session)` runs once every name in `inputs` has been
+    produced, after which the task's `outputs` count as produced. func may return a list of
+    further WorkflowTasks to add to the graph (used to fan out per-checkpoint work once the
+    checklist is known). `kind` labels the task in metrics.
+
+    `saves` lists the paths (("data", key, ...) or ("artifacts", key)) whose values are
+    journaled when the task completes. On resume, a journaled task is skipped and those values
+    restored, unless `resumable` is False. `inline` tasks run on the scheduler's own thread,
+    which is needed for anything reading the terminal.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), kind=None, saves=(), resumable=True, inline=False):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.kind = kind or name
+        self.saves = tuple(saves)
+        self.resumable = resumable
+        self.inline = inline
+
+    def __repr__(self):
+        return f"WorkflowTask({self.name!r})"
+
+
+class AssessmentSession:
+    """
+    State of one assessment: the project data that is saved as output, where answers come
+    from, and intermediate results (e.g. each checkpoint's questions) that are not saved.
+    Sessions replace the module-level project_data, so several assessments can run in one
+    process at once.
+    """
+
+    def __init__(self, data=None, industry=None, answer_fn=ask_user_answer, journal=None):
+        self.data = {} if data is None else data
+        self.industry = industry
+        self.answer_fn = answer_fn
+        self.artifacts = {}
+        self.journal = journal
+        self.completed_tasks = set() # Restored from the journal; skipped by run_workflow
+        self.journaled_answers = {} # (item, q_idx, question) -> answer, restored from the journal
+        self.deadline = None # Started by run_workflow; bounds every task's own deadline
+
+    def answer(self, item, q_idx, q_text):
+        """
+        Returns the journaled answer to a question if there is one, otherwise asks answer_fn
+        and journals the answer.
+        """
+        key = (item, q_idx, q_text)
+        if key in self.journaled_answers:
+            answer = self.journaled_answers[key]
+            print(f"    Q{q_idx+1}: {q_text}\n   Your Answer (from journal): {answer}") # User-facing print
+            return answer
+        with deadline_paused(): # Time spent answering does not count against the deadline
+            answer = self.answer_fn(item, q_idx, q_text)
+        if self.journal is not None:
+            self.journal.record({"type": "answer", "item": item, "q_idx": q_idx, "question": q_text, "answer": answer})
+        return answer
+
+    def ask_industry(self):
+        """
+        Asks the user for the industry and journals it right away, so an assessment interrupted
+        during checklist generation resumes without asking again.
+        """
+        with deadline_paused():
+            self.industry = input("Please enter the industry for the software project (e.g., 'FinTech', 'Healthcare', 'E-commerce'): ")
+        if self.journal is not None:
+            self.journal.record({"type": "industry", "industry": self.industry})
+        return self.industry
+
+    def begin(self):
+        if self.journal is not None:
+            self.journal.record({"type": "session", "session_id": uuid.uuid4().hex[:12],
+                                 "industry": self.industry, "data": self.data})
+
+    def restore(self, events):
+        """
+        Rebuilds the session from a journal's last assessment (see AssessmentJournal.last_session).
+        """
+        start = events[0]
+        self.data.update(start.get("data") or {})
+        if self.industry is None:
+            self.industry = start.get("industry")
+        for event in events[1:]:
+            if event["type"] == "industry":
+                self.industry = event["industry"]
+            elif event["type"] == "answer":
+                self.journaled_answers[(event["item"], event["q_idx"], event["question"])] = event["answer"]
+            elif event["type"] == "task":
+                for path, value in event["values"]:
+                    self._set_path(path, value)
+                self.completed_tasks.add(event["task"])
+        logger.info(f"⏪ Restored {len(self.completed_tasks)} completed tasks and {len(self.journaled_answers)} answers from the journal.")
+
+    def journal_task(self, task):
+        if self.journal is None or not task.saves:
+            return
+        values = []
+        for path in task.saves:
+            found, value = self._get_path(path)
+            if found:
+                values.append([list(path), value])
+        self.journal.record({"type": "task", "task": task.name, "values": values})
+
+    def _root(self, name):
+        return self.data if name == "data" else self.artifacts
+
+    def _get_path(self, path):
+        value = self._root(path[0])
+        for key in path[1:]:
+            if not isinstance(value, dict) or key not in value:
+                return False, None
+            value = value[key]
+        return True, (dict(value) if isinstance(value, dict) else value)
+
+    def _set_path(self, path, value):
+        target = self._root(path[0])
+        if len(path) == 1:
+            target.update(value)
+            return
+        for key in path[1:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = value
+
+
+_task_context = threading.local()
+
+
+def current_task():
+    """
+    (session, task) of the workflow task running on this thread, or (None, None).
+    """
+    return getattr(_task_context, "current", (None, None))
+
+
+def _run_task(session, task):
+    started = time.time()
+    previous, _task_context.current = current_task(), (session, task)
+    step_deadline = Deadline(STEP_DEADLINES.get(task.kind), parent=session.deadline, name=task.kind)
+    try:
+        with deadline_scope(step_deadline):
+            new_tasks = task.func(session)
+    except Exception as e:
+        metrics.record_step(task.kind, time.time() - started, error=str(e))
+        raise
+    finally:
+        _task_context.current = previous
+    metrics.record_step(task.kind, time.time() - started)
+    session.journal_task(task)
+    return new_tasks
+
+
+def _start_task(executor, session, task):
+    if not task.inline:
+        return executor.submit(_run_task, session, task)
+    future = Future()
+    try:
+        future.set_result(_run_task(session, task))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def run_workflow(session, tasks):
+    """
+    Runs a graph of WorkflowTasks for one session, starting each task as soon as all of its
+    inputs have been produced. Tasks the session restored from its journal are skipped. If a
+    task raises, no new tasks are started; running ones are awaited and the first error is
+    re-raised. The session's ASSESSMENT_DEADLINE starts here; each task also gets its own
+    STEP_DEADLINES budget within it.
+
+    Each call gets its own pool of WORKFLOW_WORKERS threads. Tasks make their provider calls on
+    those threads (or wait on them), so a pool shared between sessions would cap the provider
+    calls of all sessions together and leave queued tasks spending their deadline. How many
+    sessions run at once is bounded by the caller (batch workers, SERVICE_MAX_SESSIONS).
+    """
+    if session.deadline is None:
+        session.deadline = Deadline(ASSESSMENT_DEADLINE, name="assessment")
+    with ThreadPoolExecutor(max_workers=WORKFLOW_WORKERS, thread_name_prefix="workflow") as executor:
+        return _run_graph(executor, session, tasks)
+
+
+def _run_graph(executor, session, tasks):
+    pending = list(tasks)
+    produced = set()
+    running = {}
+    error = None
+    while True:
+        if error is None:
+            ready = [t for t in pending if produced.issuperset(t.inputs)]
+            restored = [t for t in ready if t.resumable and t.name in session.completed_tasks]
+            if restored:
+                for task in restored:
+                    pending.remove(task)
+                    produced.update(task.outputs)
+                    logger.info(f"⏩ Skipping workflow task '{task.name}': restored from the journal.")
+                continue
+            for task in ready:
+                pending.remove(task)
+                running[_start_task(executor, session, task)] = task
+        if not running:
+            break
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            task = running.pop(future)
+            try:
+                new_tasks = future.result()
+            except Exception as e:
+                logger.error(f"🚨 Workflow task '{task.name}' failed: {e}")
+                error = error or e
+                continue
+            produced.update(task.outputs)
+            pending.extend(new_tasks or [])
+    if error is not None:
+        raise error
+    if pending:
+        raise RuntimeError(f"Workflow tasks with unsatisfiable inputs: {', '.join(t.name for t in pending)}")
+    return session
+
+
+def _task_define_criteria(session):
+    data = session.data
+    if not data.get('checklist_criteria'):
+        logger.info("\n--- 1️⃣ Define the Checklist Criteria ---")
+        define_criteria(data, session.industry if session.industry is not None else session.ask_industry())
+    if not data.get('checklist_criteria') or "Error" in data['checklist_criteria'][0]:
+        halt_assessment(data)
+        return []
+    logger.info("\n--- 2️⃣ Multiprompt Verification & Data Analysis ---")
+    data.setdefault('verification_results', {})
+    return checkpoint_tasks(data['checklist_criteria'])
+
+
+def checkpoint_tasks(checklist):
+    """
+    Tasks that run once the checklist is known:
+
+        question_batch -> questions:<item> (all concurrent) -> answers:<item> (in checklist order)
+        all answers -> analysis, pro_argument (concurrent) -> debate -> conclusion
+
+    With QUESTION_BATCHING, question_batch asks for all checkpoints' questions in one call and
+    each questions:<item> task only calls a provider if the batch did not cover its item.
+    Answers are collected one checkpoint at a time so interactive prompts stay in order.
+    Persona A's argument is drafted from the answers alone, alongside the analysis.
+    """
+    tasks = []
+    batch_inputs = []
+    if QUESTION_BATCHING and len(checklist) > 1:
+        tasks.append(WorkflowTask("question_batch", _task_question_batch, outputs=["question_batch"],
+                                  kind="questions", saves=[("artifacts", "question_batch")]))
+        batch_inputs = ["question_batch"]
+    previous = ()
+    for i, item in enumerate(checklist):
+        tasks.append(WorkflowTask(f"questions:{item}", functools.partial(_task_questions, item),
+                                  inputs=batch_inputs, outputs=[f"questions:{item}"], kind="questions",
+                                  saves=[("artifacts", f"questions:{item}")]))
+        tasks.append(WorkflowTask(f"answers:{item}", functools.partial(_task_answers, i, item),
+                                  inputs=[f"questions:{item}", *previous], outputs=[f"answers:{item}"], kind="answers",
+                                  saves=[("data", "verification_results", item)], inline=True))
+        previous = (f"answers:{item}",)
+    answered = [f"answers:{item}" for item in checklist]
+    tasks += [
+        WorkflowTask("analysis", lambda session: analyze_answers(session.data), inputs=answered, outputs=["analysis"],
+                     saves=[("data", "gemini_analysis_report")]),
+        WorkflowTask("pro_argument", _task_pro_argument, inputs=answered, outputs=["pro_argument"],
+                     saves=[("artifacts", "pro_argument")]),
+        WorkflowTask("debate", _task_debate, inputs=["analysis", "pro_argument"], outputs=["debate"],
+                     saves=[("data", "debate"), ("data", "debate_pro_argument"), ("data", "debate_against_argument")]),
+        WorkflowTask("conclusion", lambda session: generate_conclusion(session.data),
+                     inputs=["debate"], outputs=["conclusion"], saves=[("data", "final_conclusion")]),
+    ]
+    return tasks
+
+
+def _task_question_batch(session):
+    session.artifacts["question_batch"] = generate_question_batch(session.data['checklist_criteria'],
+                                                                  session.data.get('industry'))
+
+
+def _task_questions(item, session):
+    session.artifacts[f"questions:{item}"] = checkpoint_questions(item, session.data.get('industry'),
+                                                                  session.artifacts.get("question_batch"))
+
+
+def _task_answers(i, item, session):
+    print(f"\n🔍 Verifying Checkpoint {i+1}: {item}") # User-facing print
+    questions = session.artifacts[f"questions:{item}"]
+    session.data['verification_results'][item] = collect_checkpoint_answers(item, questions, session.answer)
+
+
+def _task_pro_argument(session):
+    # Not streamed: it runs while the analysis is being printed
+    session.artifacts["pro_argument"] = generate_pro_argument(session.data, include_analysis=False, stream=False)
+
+
+def _task_debate(session):
+    data = session.data
+    logger.info("\n--- 3️⃣ Counterargument Simulation – Debate Between Two AI Personas ---")
+    if debate_inputs_missing(data):
+        logger.warning("🚨 Cannot proceed with debate: Checklist or analysis report missing/skipped.")
+        data['debate'] = {"pro_argument_ollama": "Skipped", "against_argument_gemini": "Skipped due to missing prior data."}
+        return
+    print("\n👍 Persona A (Pro-Project - Ollama):") # User-facing print
+    finish_debate(data, session.artifacts.get("pro_argument"), pro_argument_printed=False)
+
+
+def halt_assessment(data):
+    """
+    Fills the output keys of the steps that could not run after a failed step 1.
+    """
+    logger.error("\n🚨 Workflow halted due to issues in Step 1: Unable to generate valid checklist criteria.")
+    # Ensure essential keys exist for JSON output even if steps are skipped
+    if 'verification_results' not in data: data['verification_results'] = {}
+    if 'gemini_analysis_report' not in data: data['gemini_analysis_report'] = "Skipped due to checklist failure."
+    if 'debate' not in data: data['debate'] = {"pro_argument_ollama": "Skipped", "against_argument_gemini": "Skipped"}
+    if 'final_conclusion' not in data: data['final_conclusion'] = "Reconsider: Workflow halted early."
+
+
+# --- Assessment Pipeline ---
+def assessment_tasks():
+    """
+    The initial workflow graph of an assessment; the criteria task adds the rest.
+    """
+    return [
+        # Not resumable: it is cheap once the checklist is restored, and it fans out the rest of the graph
+        WorkflowTask("criteria", _task_define_criteria, outputs=["checklist_criteria"],
+                     saves=[("data",)], resumable=False, inline=True),
+    ]
+
+
+def run_assessment(data=None, industry=None, answer_fn=ask_user_answer, journal=None, resume=False):
+    """
+    Runs one assessment as a workflow graph and returns its data dict. Step 1 is skipped if
+    the data already contains checklist criteria. With a journal, progress is recorded as it
+    happens; with resume=True the journal's last assessment is restored and continued.
+    """
+    session = AssessmentSession(data, industry, answer_fn, journal)
+    events = journal.last_session() if journal is not None and resume else []
+    if events:
+        session.restore(events)
+    else:
+        if resume:
+            logger.warning("⚠️ No journaled assessment to resume; starting a new one.")
+        session.begin()
+    run_workflow(session, assessment_tasks())
+    if journal is not None:
+        journal.record({"type": "complete"})
+    return session.data
+
+
+# --- Batch Assessment ---
+def make_batch_answer_fn(project):
+    """
+    Builds a step 2 answer source from a batch project's pre-supplied answers.
+
+    `answers` maps a checkpoint name (or "*" for any checkpoint) to either a dict of
+    question -> answer, a list of answers by question position, or a single string used
+    for every question. Questions without an answer get `default_answer`.
+    """
+    answers = project.get("answers") or {}
+    default_answer = project.get("default_answer", BATCH_DEFAULT_ANSWER)
+
+    def answer_fn(item, q_idx, q_text):
+        item_answers = answers.get(item, answers.get("*"))
+        if isinstance(item_answers, dict):
+            return item_answers.get(q_text, default_answer)
+        if isinstance(item_answers, list):
+            return item_answers[q_idx] if q_idx < len(item_answers) else default_answer
+        if isinstance(item_answers, str):
+            return item_answers
+        return default_answer
+
+    return answer_fn
+
+
+def run_batch_project(project):
+    """
+    Assesses a single batch project and returns its output record.
+    """
+    started = time.time()
+    data = {}
+    if project.get("checklist_criteria"):
+        data['industry'] = project["industry"]
+        data['checklist_criteria'] = list(project["checklist_criteria"])
+    try:
+        run_assessment(data, industry=project["industry"], answer_fn=make_batch_answer_fn(project))
+        status, error = "ok", None
+    except Exception as e:
+        logger.exception(f"🚨 Assessment failed for project {project.get('id')}: {e}")
+        status, error = "error", str(e)
+    return {
+        "id": project.get("id"),
+        "status": status,
+        "error": error,
+        "elapsed_seconds": round(time.time() - started, 3),
+        "project_data": data,
+    }
+
+
+def run_batch(input_path, output_path, workers=BATCH_WORKERS):
+    """
+    Assesses every project in a JSONL file (one JSON object per line with at least an
+    "industry" key) on a bounded worker pool. Results are appended to `output_path` as
+    soon as each project finishes. Returns a summary with throughput and failure counts.
+    Lines that are not a valid project are reported as "invalid_lines" and do not count as
+    projects, so projects_per_minute only measures assessments that actually ran.
+    """
+    global STREAM_OUTPUT
+    STREAM_OUTPUT = False # Interleaved token streams from concurrent projects are unreadable
+
+    projects = []
+    failed = 0
+    invalid = 0
+    write_lock = threading.Lock()
+    started = time.time()
+
+    with open(input_path) as f_in, open(output_path, "w") as f_out:
+        def write_record(record):
+            with write_lock:
+                f_out.write(json.dumps(record) + "\n")
+                f_out.flush()
+
+        for line_no, line in enumerate(f_in, start=1):
+            if not line.strip():
+                continue
+            try:
+                project = json.loads(line)
+                if not isinstance(project, dict) or not project.get("industry"):
+                    raise ValueError("Project must be a JSON object with an 'industry' key.")
+            except (json.JSONDecodeError, ValueError) as e:
+                logger.error(f"🚨 Skipping invalid project on line {line_no}: {e}")
+                write_record({"id": None, "line": line_no, "status": "error", "error": str(e)})
+                invalid += 1
+                continue
+            project.setdefault("id", line_no)
+            projects.append(project)
+
+        logger.info(f"Assessing {len(projects)} projects with {workers} workers...")
+        # Per-project console output (checklists, reports) is discarded; results go to the output file
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+             ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+            futures = [pool.submit(run_batch_project, project) for project in projects]
+            for done_count, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                if record["status"] != "ok":
+                    failed += 1
+                write_record(record)
+                logger.info(f"[{done_count}/{len(projects)}] Project {record['id']}: {record['status']} ({record['elapsed_seconds']}s)")
+
+    elapsed = time.time() - started
+    summary = {
+        "projects": len(projects),
+        "succeeded": len(projects) - failed,
+        "failed": failed,
+        "invalid_lines": invalid,
+        "elapsed_seconds": round(elapsed, 3),
+        "projects_per_minute": round(len(projects) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+    }
+    logger.info(f"📦 Batch complete: {summary}")
+    return summary
+
+
+# --- Startup Benchmark ---
+_STARTUP_PROBE = (
+    "import sys, time; started = time.perf_counter(); import main; "
+    "print(time.perf_counter() - started); "
+    "print(','.join(m for m in ('google.generativeai', 'cohere', 'groq') if m in sys.modules))"
+)
+
+
+def benchmark_startup(runs=5):
+    """
+    Measures how long `import main` takes in fresh interpreters and reports which provider
+    SDKs were imported as a side effect (there should be none).
+    """
+    timings = []
+    eager_sdks = set()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", _STARTUP_PROBE],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        )
+        lines = result.stdout.splitlines()
+        timings.append(float(lines[-2]))
+        eager_sdks.update(m for m in lines[-1].split(",") if m)
+    report = {
+        "runs": runs,
+        "min_seconds": round(min(timings), 4),
+        "median_seconds": round(statistics.median(timings), 4),
+        "max_seconds": round(max(timings), 4),
+        "sdks_imported_at_startup": sorted(eager_sdks),
+    }
+    print(f"⏱️ import main: median {report['median_seconds']}s (min {report['min_seconds']}s, max {report['max_seconds']}s) over {runs} runs") # User-facing print
+    if eager_sdks:
+        print(f"   Provider SDKs imported eagerly: {', '.join(sorted(eager_sdks))}")
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AI-Powered Checklist System Prototype")
+    parser.add_argument("--batch", metavar="INPUT_JSONL",
+                        help="Assess every project in a JSONL file non-interactively.")
+    parser.add_argument("--output", default="batch_assessment_output.jsonl",
+                        help="Where batch results are written, one JSON object per line.")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS,
+                        help="Number of projects assessed concurrently in batch mode.")
+    parser.add_argument("--benchmark-startup", type=int, nargs="?", const=5, metavar="RUNS",
+                        help="Report how long importing main takes (default 5 runs) and exit.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last interrupted assessment from the journal (ASSESSMENT_JOURNAL_PATH).")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.benchmark_startup:
+        benchmark_startup(args.benchmark_startup)
+        sys.exit(0)
+
+    print("🚀 AI-Powered Checklist System Prototype 🚀") # User-facing print
+
+    check_ollama_server() # This will set OLLAMA_MODEL to None if server is down
+    start_ollama_warmup() # Loads the model in the background while the user enters the industry
+    start_health_monitor() # Re-probes Ollama and any other provider whose circuit opens
+
+    if args.batch:
+        batch_summary = run_batch(args.batch, args.output, workers=args.workers)
+        logger.info(f"Response cache stats: {response_cache.stats()}")
+        logger.info(f"Semantic cache stats: {semantic_cache.stats()}")
+        logger.info(f"Request coalescing: {provider_flights.stats()}")
+        logger.info(f"Provider health: {health_report()}")
+        logger.info(f"Rate limits: {rate_limit_report()}")
+        metrics.log_summary()
+        metrics.write_prometheus()
+        sys.exit(1 if batch_summary["failed"] or batch_summary["invalid_lines"] else 0)
+
+    if args.resume and not ASSESSMENT_JOURNAL_PATH:
+        logger.error("🚨 --resume needs ASSESSMENT_JOURNAL_PATH to be set.")
+        sys.exit(1)
+    journal = AssessmentJournal(ASSESSMENT_JOURNAL_PATH) if ASSESSMENT_JOURNAL_PATH else None
+    try:
+        run_assessment(project_data, journal=journal, resume=args.resume)
+    except KeyboardInterrupt:
+        if journal is not None:
+            logger.warning(f"\n⚠️ Interrupted. Completed work is in {ASSESSMENT_JOURNAL_PATH}; continue with --resume.")
+        sys.exit(130)
+    finally:
+        if journal is not None:
+            journal.close()
+
+    logger.info("\n--- 📝 Full Project Data Collected ---")
+    try:
+        with open("project_assessment_output.json", "w") as f:
+            json.dump(project_data, f, indent=2)
+        logger.info("\nFull project data saved to project_assessment_output.json")
+    except Exception as e:
+        logger.error(f"Failed to save project data to JSON: {e}")
+
+    logger.info(f"Response cache stats: {response_cache.stats()}")
+    logger.info(f"Semantic cache stats: {semantic_cache.stats()}")
+    logger.info(f"Request coalescing: {provider_flights.stats()}")
+    logger.info(f"Provider health: {health_report()}")
+    logger.info(f"Rate limits: {rate_limit_report()}")
+    metrics.log_summary()
+    metrics.write_prometheus()
         
     print("\n💡 Prototype workflow complete! 💡") # User-facing print
@@ -0,0 +1,400 @@
+"""
+HTTP service mode for the assessment pipeline.
+
+Runs many assessments concurrently in one process. Every session shares main's provider
+clients, response cache, circuit breakers and metrics, so SDKs are loaded once and provider
+health learned by one session benefits all of them.
+
+    POST /assessments                {"industry": "...", "checklist_criteria": [...] (optional)}
+    GET  /assessments/<id>           status, the question being waited on, project data so far
+    GET  /assessments/<id>/questions generated questions and whether each has an answer
+    POST /assessments/<id>/answers   {"answers": [{"checkpoint": "...", "index": 0, "answer": "..."}]}
+    GET  /assessments/<id>/events    Server-Sent Events with the session's output (checklist,
+                                     analysis, debate and conclusion tokens) as it is produced;
+                                     ?after=N resumes after event N
+    GET  /health                     provider health, rate limiter state, cache and coalescing stats, session counts
+    GET  /metrics                    Prometheus text format
+
+    python service.py --host 127.0.0.1 --port 8080
+
+Answers may be submitted as soon as a question appears, in any order; the workflow consumes
+them checkpoint by checkpoint.
+"""
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import main
+
+logger = logging.getLogger(__name__)
+
+# --- Service configuration ---
+SERVICE_MAX_SESSIONS = int(os.environ.get('SERVICE_MAX_SESSIONS', '64')) # Assessments running at once
+SERVICE_ANSWER_TIMEOUT = float(os.environ.get('SERVICE_ANSWER_TIMEOUT', '3600')) # Seconds a session waits for an answer
+SERVICE_SESSION_TTL = float(os.environ.get('SERVICE_SESSION_TTL', '3600')) # Seconds finished sessions stay readable
+SSE_KEEPALIVE_SECONDS = 15
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+class ServiceSession:
+    """
+    One assessment served over HTTP. The workflow runs on its own thread; answer() blocks that
+    thread until the client submits the answer (or SERVICE_ANSWER_TIMEOUT passes). Everything
+    the workflow prints is kept as an ordered list of output events.
+    """
+
+    def __init__(self, industry, checklist_criteria=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.status = "running"
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.events = []
+        self.waiting_for = None
+        self._answers = {} # (checkpoint, index) -> answer
+        self._cond = threading.Condition()
+        data = {}
+        if checklist_criteria:
+            data['industry'] = industry
+            data['checklist_criteria'] = list(checklist_criteria)
+        self.assessment = main.AssessmentSession(data, industry, self.answer)
+        self.assessment.service_session = self # Lets SessionOutputRouter find us from a task thread
+
+    def run(self):
+        try:
+            main.run_workflow(self.assessment, main.assessment_tasks())
+            status, error = "complete", None
+        except Exception as e:
+            logger.exception(f"🚨 Assessment {self.id} failed: {e}")
+            status, error = "error", str(e)
+        with self._cond:
+            self.status, self.error = status, error
+            self.waiting_for = None
+            self.finished = time.time()
+            self._cond.notify_all()
+
+    def answer(self, item, q_idx, q_text):
+        """
+        answer_fn of the workflow: waits until the client has submitted this answer.
+        """
+        key = (item, q_idx)
+        deadline = time.time() + SERVICE_ANSWER_TIMEOUT
+        with self._cond:
+            while key not in self._answers:
+                self.status = "waiting_for_answers"
+                self.waiting_for = {"checkpoint": item, "index": q_idx, "question": q_text}
+                self._cond.notify_all()
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"No answer to question {q_idx+1} of '{item}' within {SERVICE_ANSWER_TIMEOUT}s.")
+                self._cond.wait(remaining)
+            self.status = "running"
+            self.waiting_for = None
+            return self._answers[key]
+
+    def submit_answers(self, entries):
+        """
+        Stores answers given as [{"checkpoint", "index", "answer"}, ...]. Raises ValueError if
+        an entry is malformed or names an unknown checkpoint.
+        """
+        checklist = self.assessment.data.get('checklist_criteria') or []
+        parsed = []
+        for entry in entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get("answer"), str) \
+               or not isinstance(entry.get("index"), int) or entry.get("checkpoint") not in checklist:
+                raise ValueError(f"Invalid answer entry: {entry!r}")
+            parsed.append(((entry["checkpoint"], entry["index"]), entry["answer"]))
+        with self._cond:
+            self._answers.update(parsed)
+            self._cond.notify_all()
+        return len(parsed)
+
+    def questions(self):
+        checklist = self.assessment.data.get('checklist_criteria') or []
+        with self._cond:
+            answered = set(self._answers)
+        return [
+            {"checkpoint": item, "index": idx, "question": question, "answered": (item, idx) in answered}
+            for item in checklist
+            for idx, question in enumerate(self.assessment.artifacts.get(f"questions:{item}") or [])
+        ]
+
+    def write(self, task, text):
+        with self._cond:
+            self.events.append({"task": task.name if task else None, "text": text})
+            self._cond.notify_all()
+
+    def events_after(self, seq, timeout):
+        """
+        Waits up to `timeout` seconds for events after position `seq`. Returns (events, finished).
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.events) > seq or self.finished is not None, timeout)
+            return self.events[seq:], self.finished is not None
+
+    def snapshot(self):
+        # Top-level values are copied one by one; nested dicts are replaced, not mutated, by tasks
+        data = {key: (dict(value) if isinstance(value, dict) else value)
+                for key, value in dict(self.assessment.data).items()}
+        with self._cond:
+            return {
+                "id": self.id,
+                "status": self.status,
+                "error": self.error,
+                "waiting_for": self.waiting_for,
+                "events": len(self.events),
+                "project_data": data,
+            }
+
+
+class SessionOutputRouter:
+    """
+    Replaces sys.stdout: text printed while a workflow task runs is appended to that task's
+    session; anything else goes to the real stdout.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    def write(self, text):
+        session, task = main.current_task()
+        owner = getattr(session, "service_session", None)
+        if owner is None:
+            return self.fallback.write(text)
+        if text:
+            owner.write(task, text)
+        return len(text)
+
+    def flush(self):
+        self.fallback.flush()
+
+
+class SessionRegistry:
+    """
+    Running and recently finished sessions. Each running session occupies one worker of a
+    bounded pool; creating a session while all workers are busy raises ServiceBusy.
+    """
+
+    def __init__(self, max_sessions=SERVICE_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_sessions, thread_name_prefix="session")
+
+    def create(self, industry, checklist_criteria=None):
+        with self._lock:
+            self._evict_expired()
+            if self._active_count() >= self.max_sessions:
+                raise ServiceBusy(f"All {self.max_sessions} session slots are in use.")
+            session = ServiceSession(industry, checklist_criteria)
+            self._sessions[session.id] = session
+        self._executor.submit(session.run)
+        logger.info(f"🆕 Assessment {session.id} started for '{industry}'.")
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def stats(self):
+        with self._lock:
+            statuses = [session.status for session in self._sessions.values()]
+        return {status: statuses.count(status) for status in sorted(set(statuses))}
+
+    def _active_count(self):
+        return sum(1 for session in self._sessions.values() if session.finished is None)
+
+    def _evict_expired(self):
+        cutoff = time.time() - SERVICE_SESSION_TTL
+        for session_id in [sid for sid, s in self._sessions.items() if s.finished and s.finished < cutoff]:
+            del self._sessions[session_id]
+
+
+_SESSION_PATH_RE = re.compile(r"^/assessments/([0-9a-f]+)(?:/(questions|answers|events))?$")
+
+
+def make_handler(registry):
+    class AssessmentHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            logger.debug(f"{self.address_string()} {fmt % args}")
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, default=str).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_text(self, status, text, content_type="text/plain; version=0.0.4"):
+            body = text.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Request body must be a JSON object.")
+            return payload
+
+        def _route_session(self):
+            path = urlparse(self.path).path
+            match = _SESSION_PATH_RE.match(path)
+            if not match:
+                return None, None
+            session = registry.get(match.group(1))
+            if session is None:
+                self._send_json(404, {"error": f"Unknown assessment {match.group(1)}."})
+                return None, "handled"
+            return session, match.group(2)
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/health":
+                self._send_json(200, {
+                    "providers": main.health_report(),
+                    "rate_limits": main.rate_limit_report(),
+                    "cache": main.response_cache.stats(),
+                    "semantic_cache": main.semantic_cache.stats(),
+                    "coalescing": main.provider_flights.stats(),
+                    "sessions": registry.stats(),
+                })
+                return
+            if path == "/metrics":
+                self._send_text(200, main.metrics.prometheus_text())
+                return
+            session, action = self._route_session()
+            if session is None:
+                if action is None:
+                    self._send_json(404, {"error": "Not found."})
+                return
+            if action is None:
+                self._send_json(200, session.snapshot())
+            elif action == "questions":
+                self._send_json(200, {"questions": session.questions(), "waiting_for": session.waiting_for})
+            elif action == "events":
+                after = parse_qs(urlparse(self.path).query).get("after", ["0"])[0]
+                self._stream_events(session, int(after) if after.isdigit() else 0)
+            else:
+                self._send_json(405, {"error": "Use POST to submit answers."})
+
+        def do_POST(self):
+            try:
+                payload = self._read_json()
+            except ValueError as e: # json.JSONDecodeError is a ValueError
+                self._send_json(400, {"error": f"Invalid JSON body: {e}"})
+                return
+            if urlparse(self.path).path == "/assessments":
+                industry = payload.get("industry")
+                checklist = payload.get("checklist_criteria")
+                if not isinstance(industry, str) or not industry.strip():
+                    self._send_json(400, {"error": "'industry' must be a non-empty string."})
+                    return
+                if checklist is not None and (not isinstance(checklist, list) or not all(isinstance(i, str) for i in checklist)):
+                    self._send_json(400, {"error": "'checklist_criteria' must be a list of strings."})
+                    return
+                try:
+                    session = registry.create(industry.strip(), checklist)
+                except ServiceBusy as e:
+                    self._send_json(503, {"error": str(e)})
+                    return
+                self._send_json(201, {"id": session.id, "status": session.status})
+                return
+            session, action = self._route_session()
+            if session is None:
+                if action is None:
+                    self._send_json(404, {"error": "Not found."})
+                return
+            if action != "answers":
+                self._send_json(405, {"error": "Only /answers accepts POST."})
+                return
+            if session.finished is not None:
+                self._send_json(409, {"error": f"Assessment is already {session.status}."})
+                return
+            try:
+                accepted = session.submit_answers(payload.get("answers") or [])
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            self._send_json(202, {"accepted": accepted, "status": session.status})
+
+        def _stream_events(self, session, seq):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            try:
+                while True:
+                    events, finished = session.events_after(seq, SSE_KEEPALIVE_SECONDS)
+                    for event in events:
+                        seq += 1
+                        self.wfile.write(f"id: {seq}\ndata: {json.dumps(event)}\n\n".encode())
+                    if finished and not events:
+                        end = {"status": session.status, "error": session.error}
+                        self.wfile.write(f"event: end\ndata: {json.dumps(end)}\n\n".encode())
+                        self.wfile.flush()
+                        return
+                    if not events:
+                        self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                logger.info(f"Event stream client for assessment {session.id} disconnected.")
+
+    return AssessmentHandler
+
+
+def serve(host="127.0.0.1", port=8080, max_sessions=SERVICE_MAX_SESSIONS):
+    """
+    Starts the service and blocks until interrupted.
+    """
+    main.check_ollama_server()
+    main.start_ollama_warmup()
+    main.start_health_monitor()
+    sys.stdout = SessionOutputRouter(sys.stdout)
+
+    registry = SessionRegistry(max_sessions)
+    server = ThreadingHTTPServer((host, port), make_handler(registry))
+    server.daemon_threads = True
+    logger.info(f"🌐 Assessment service listening on http://{host}:{server.server_address[1]} (max {max_sessions} sessions)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down the assessment service...")
+    finally:
+        server.server_close()
+        main.metrics.log_summary()
+        main.metrics.write_prometheus()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP service for the AI-Powered Checklist System.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-sessions", type=int, default=SERVICE_MAX_SESSIONS,
+                        help="Assessments that may run at the same time.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    serve(args.host, args.port, args.max_sessions)
@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+import atexit
+import shutil
+import tempfile
+
+import pytest
+
+# Set before main is imported: caches stay in memory, and metrics, traces and the journal are
+# either off or written to a scratch directory, so tests never touch the working directory
+_scratch = tempfile.mkdtemp(prefix="assessment_tests_")
+atexit.register(shutil.rmtree, _scratch, ignore_errors=True)
+os.environ.update({
+    'RESPONSE_CACHE_BACKEND': 'memory',
+    'RESPONSE_CACHE_PATH': os.path.join(_scratch, 'llm_response_cache.sqlite3'),
+    'SEMANTIC_CACHE_PATH': '',
+    'METRICS_TRACE_PATH': '',
+    'METRICS_PROMETHEUS_PATH': '',
+    'ASSESSMENT_JOURNAL_PATH': os.path.join(_scratch, 'assessment_journal.jsonl'),
+})
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Replaces time.monotonic with a clock that only moves when advance() is called.
+    """
+    class Clock:
+        now = 1000.0
+
+        def advance(self, seconds):
+            self.now += seconds
+
+    fake = Clock()
+    monkeypatch.setattr(time, "monotonic", lambda: fake.now)
+    return fake
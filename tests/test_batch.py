@@ -0,0 +1,76 @@
+import json
+import time
+
+import pytest
+
+import main
+from main import make_batch_answer_fn
+
+
+@pytest.mark.parametrize("answers, item, q_idx, q_text, expected", [
+    ({"Budget": ["First", "Second"]}, "Budget", 1, "Who pays?", "Second"),
+    ({"Budget": ["First"]}, "Budget", 1, "Who pays?", "No information provided."),
+    ({"Budget": {"Who pays?": "The client."}}, "Budget", 0, "Who pays?", "The client."),
+    ({"Budget": {"Who pays?": "The client."}}, "Budget", 0, "How much?", "No information provided."),
+    ({"Budget": "Approved."}, "Budget", 3, "Anything?", "Approved."),
+    ({"*": "In progress.", "Budget": "Approved."}, "Security", 0, "Audited?", "In progress."),
+    ({"*": "In progress.", "Budget": "Approved."}, "Budget", 0, "Approved?", "Approved."),
+    ({}, "Budget", 0, "Approved?", "No information provided."),
+])
+def test_answer_resolution(answers, item, q_idx, q_text, expected):
+    answer_fn = make_batch_answer_fn({"industry": "Retail", "answers": answers})
+    assert answer_fn(item, q_idx, q_text) == expected
+
+
+def test_custom_default_answer():
+    answer_fn = make_batch_answer_fn({"industry": "Retail", "default_answer": "Unknown."})
+    assert answer_fn("Budget", 0, "Approved?") == "Unknown."
+
+
+@pytest.fixture
+def assessments(monkeypatch):
+    """
+    Replaces the workflow with one that answers the first question of each checkpoint and
+    fails for industries named "Broken".
+    """
+    monkeypatch.setattr(main, "STREAM_OUTPUT", main.STREAM_OUTPUT) # run_batch turns it off
+    industries = []
+
+    def run_assessment(data, industry=None, answer_fn=None):
+        industries.append(industry)
+        time.sleep(0.05) # Long enough for a meaningful projects_per_minute
+        if industry == "Broken":
+            raise RuntimeError("provider chain exhausted")
+        data["industry"] = industry
+        data["answers"] = {item: answer_fn(item, 0, "Ready?") for item in data.get("checklist_criteria", [])}
+        return data
+    monkeypatch.setattr(main, "run_assessment", run_assessment)
+    return industries
+
+
+def test_run_batch_writes_a_record_per_line_and_summarizes(tmp_path, assessments):
+    input_path, output_path = tmp_path / "projects.jsonl", tmp_path / "results.jsonl"
+    input_path.write_text("\n".join([
+        json.dumps({"id": "a", "industry": "Retail", "checklist_criteria": ["Budget"], "answers": {"*": "Yes."}}),
+        "",
+        "{not json",
+        json.dumps({"id": "b", "industry": "Broken"}),
+        json.dumps({"checklist_criteria": ["Budget"]}),
+        json.dumps({"industry": "Healthcare"}),
+    ]) + "\n")
+
+    summary = main.run_batch(str(input_path), str(output_path), workers=2)
+
+    assert sorted(assessments) == ["Broken", "Healthcare", "Retail"]
+    assert {key: summary[key] for key in ("projects", "succeeded", "failed", "invalid_lines")} == \
+        {"projects": 3, "succeeded": 2, "failed": 1, "invalid_lines": 2}
+    assert summary["projects_per_minute"] == pytest.approx(3 / summary["elapsed_seconds"] * 60, rel=0.05)
+
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    by_id = {record["id"]: record for record in records if record["id"] is not None}
+    assert by_id["a"]["status"] == "ok"
+    assert by_id["a"]["project_data"]["answers"] == {"Budget": "Yes."}
+    assert by_id["b"]["status"] == "error"
+    assert by_id["b"]["error"] == "provider chain exhausted"
+    assert by_id[6]["status"] == "ok" # Projects without an id are numbered by line
+    assert sorted(record["line"] for record in records if record["id"] is None) == [3, 5]
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from benchmark import PROFILES, load_profiles, parse_args
+
+
+@pytest.fixture
+def profile_file(tmp_path):
+    def write(profiles):
+        path = tmp_path / "profiles.json"
+        path.write_text(json.dumps(profiles))
+        return str(path)
+    return write
+
+
+def test_override_changes_only_the_given_settings(profile_file):
+    profiles = load_profiles(profile_file({"flaky": {"groq": {"error_rate": 0.5}}}))
+    groq, builtin = profiles["flaky"]["groq"], PROFILES["flaky"]["groq"]
+    assert groq.error_rate == 0.5
+    assert (groq.median_latency, groq.sigma) == (builtin.median_latency, builtin.sigma)
+    assert profiles["flaky"]["gemini"] is PROFILES["flaky"]["gemini"]
+    assert PROFILES["flaky"]["groq"].error_rate == 0.1 # Built-in profiles are left alone
+
+
+def test_new_profile_starts_from_healthy(profile_file):
+    profiles = load_profiles(profile_file({"slow-groq": {"groq": {"median_latency": 8}, "ollama": None}}))
+    assert profiles["slow-groq"]["groq"].median_latency == 8
+    assert profiles["slow-groq"]["ollama"] is None
+    assert profiles["slow-groq"]["cohere"] is PROFILES["healthy"]["cohere"]
+    assert set(PROFILES) < set(profiles)
+
+
+def test_removed_provider_can_be_restored(profile_file):
+    profiles = load_profiles(profile_file({"ollama-down": {"ollama": {"timeout_rate": 0.5}}}))
+    assert profiles["ollama-down"]["ollama"].timeout_rate == 0.5
+    assert profiles["ollama-down"]["ollama"].median_latency == PROFILES["healthy"]["ollama"].median_latency
+
+
+@pytest.mark.parametrize("profiles, message", [
+    ({"healthy": {"openai": {"median_latency": 1}}}, "unknown provider 'openai'"),
+    ({"healthy": {"groq": {"latency": 1}}}, "bad settings for groq"),
+])
+def test_invalid_profiles_are_rejected(profile_file, profiles, message):
+    with pytest.raises(ValueError, match=message):
+        load_profiles(profile_file(profiles))
+
+
+def test_cli_accepts_profiles_from_the_file(profile_file):
+    path = profile_file({"slow-groq": {"groq": {"median_latency": 8}}})
+    args = parse_args(["--profile-file", path, "--profile", "slow-groq"])
+    assert args.profiles["slow-groq"]["groq"].median_latency == 8
+
+
+def test_cli_rejects_unknown_profiles():
+    with pytest.raises(SystemExit):
+        parse_args(["--profile", "slow-groq"])
@@ -0,0 +1,88 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import main
+from main import Deadline
+
+
+def test_remaining_counts_down(clock):
+    deadline = Deadline(10)
+    clock.advance(4)
+    assert deadline.remaining() == pytest.approx(6)
+    clock.advance(10)
+    assert deadline.remaining() == pytest.approx(-4)
+
+
+@pytest.mark.parametrize("seconds", [None, 0])
+def test_no_limit(clock, seconds):
+    deadline = Deadline(seconds)
+    clock.advance(1e6)
+    assert deadline.remaining() == math.inf
+
+
+def test_child_never_outlasts_parent(clock):
+    parent = Deadline(10)
+    child = Deadline(30, parent=parent)
+    assert child.remaining() == pytest.approx(10)
+    unlimited_child = Deadline(None, parent=parent)
+    assert unlimited_child.remaining() == pytest.approx(10)
+    short_child = Deadline(3, parent=parent)
+    assert short_child.remaining() == pytest.approx(3)
+
+
+def test_paused_time_does_not_count_for_the_deadline_or_its_parents(clock):
+    parent = Deadline(10)
+    child = Deadline(5, parent=parent)
+    clock.advance(1)
+    with child.paused():
+        clock.advance(100)
+        assert child.remaining() == pytest.approx(4)
+    clock.advance(1)
+    assert child.remaining() == pytest.approx(3)
+    assert parent.remaining() == pytest.approx(8)
+
+
+def test_nested_pauses_resume_once(clock):
+    deadline = Deadline(10)
+    with deadline.paused():
+        with deadline.paused():
+            clock.advance(5)
+        clock.advance(5)
+    clock.advance(2)
+    assert deadline.remaining() == pytest.approx(8)
+
+
+def test_time_remaining_follows_the_current_scope(clock):
+    assert main.time_remaining() == math.inf
+    outer = Deadline(10)
+    with main.deadline_scope(outer):
+        assert main.time_remaining() == pytest.approx(10)
+        with main.deadline_scope(Deadline(2, parent=outer)):
+            assert main.time_remaining() == pytest.approx(2)
+        assert main.current_deadline() is outer
+    assert main.current_deadline() is None
+
+
+def test_run_with_deadline_carries_the_deadline_into_pool_threads(clock):
+    deadline = Deadline(10)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(main.run_with_deadline, deadline, main.current_deadline).result() is deadline
+        assert pool.submit(main.current_deadline).result() is None
+
+
+def test_deadline_paused_without_a_deadline_is_a_no_op():
+    with main.deadline_paused():
+        assert main.time_remaining() == math.inf
+
+
+def test_request_timeout_is_clamped_to_the_deadline(clock):
+    main._call_state.throttled = None
+    with main.deadline_scope(Deadline(10)):
+        assert main.request_timeout(60, "groq") == pytest.approx(10)
+        assert main.request_timeout(5, "groq") == 5
+        clock.advance(10)
+        assert main.request_timeout(60, "groq") == 0
+    assert main._call_state.throttled == "deadline reached"
+    main._call_state.throttled = None
@@ -0,0 +1,78 @@
+import json
+import time
+import threading
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """
+    groq then cohere are enabled, without rate limits, in front of an in-memory response cache.
+    """
+    enabled = ("groq", "cohere")
+    monkeypatch.setattr(main, "provider_enabled", lambda name: name in enabled)
+    monkeypatch.setattr(main, "rank_providers", lambda names: [name for name in names if name in enabled])
+    monkeypatch.setattr(main, "PROVIDER_DISPATCH_MODE", "sequential")
+    for name in enabled:
+        monkeypatch.setitem(main.provider_health, name, main.ProviderHealth(name))
+        monkeypatch.setitem(main.provider_limiters, name, main.ProviderRateLimiter(name))
+    monkeypatch.setattr(main, "response_cache", main.MemoryResponseCache())
+    monkeypatch.setattr(main, "metrics", main.RunMetrics())
+    calls = []
+
+    def install(name, reply):
+        def query(prompt, **options):
+            calls.append(name)
+            key = main.response_cache_key(name, "model", prompt)
+            cached = main.response_cache.get(key)
+            if cached is not None:
+                return cached
+            main.response_cache.set(key, reply)
+            return reply
+        monkeypatch.setitem(main.PROVIDER_QUERIES, name, query)
+    return install, calls
+
+
+def test_unparseable_checklist_falls_through_and_is_not_cached(providers):
+    install, calls = providers
+    install("groq", "I am sorry, I cannot help with that.")
+    install("cohere", json.dumps(["Security", "Budget"]))
+
+    assert main.generate_checklist("Retail") == ["Security", "Budget"]
+    assert calls == ["groq", "cohere"]
+    assert main.response_cache.stats()["hits"] == 0
+
+    # groq's rejected reply was dropped, so groq is asked again; cohere's answer is cached
+    assert main.generate_checklist("Retail") == ["Security", "Budget"]
+    assert calls == ["groq", "cohere", "groq", "cohere"]
+    assert main.response_cache.stats()["hits"] == 1
+
+
+def test_unparseable_questions_fall_through(monkeypatch, providers):
+    install, calls = providers
+    monkeypatch.setattr(main, "semantic_cache", main.SemanticCache(enabled=False))
+    install("groq", "Here are some questions: none.")
+    install("cohere", json.dumps(["Is there a budget?"]))
+
+    assert main.generate_validation_questions("Budget", "Retail") == ["Is there a budget?"]
+    assert calls == ["groq", "cohere"]
+
+
+def test_race_returns_without_waiting_for_the_losing_request(monkeypatch, providers):
+    install, calls = providers
+    released = threading.Event()
+    monkeypatch.setattr(main, "PROVIDER_DISPATCH_MODE", "race")
+
+    def slow(prompt, **options):
+        released.wait(5)
+        return "late"
+    install("cohere", json.dumps(["Security"]))
+    monkeypatch.setitem(main.PROVIDER_QUERIES, "groq", slow)
+
+    started = time.monotonic()
+    assert main.dispatch_query("prompt", purpose="test") == json.dumps(["Security"])
+    assert time.monotonic() - started < 2
+    released.set()
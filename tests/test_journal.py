@@ -0,0 +1,94 @@
+import builtins
+
+import pytest
+
+import main
+from main import AssessmentJournal, AssessmentSession, WorkflowTask
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = AssessmentJournal(str(tmp_path / "journal.jsonl"))
+    yield journal
+    journal.close()
+
+
+def test_last_session_returns_only_the_latest_assessment(journal):
+    journal.record({"type": "session", "industry": "Retail", "data": {}})
+    journal.record({"type": "complete"})
+    journal.record({"type": "session", "industry": "FinTech", "data": {}})
+    journal.record({"type": "answer", "item": "Budget", "q_idx": 0, "question": "Budget?", "answer": "Yes"})
+    events = journal.last_session()
+    assert [event["type"] for event in events] == ["session", "answer"]
+    assert events[0]["industry"] == "FinTech"
+
+
+def test_torn_final_line_is_ignored(journal):
+    journal.record({"type": "session", "industry": "FinTech", "data": {}})
+    journal.close()
+    with open(journal.path, "a") as f:
+        f.write('{"type": "answer", "item": "Bud')
+    assert [event["type"] for event in journal.last_session()] == ["session"]
+
+
+def test_missing_journal_has_no_session(journal):
+    assert journal.last_session() == []
+
+
+def test_restore_replays_industry_answers_and_tasks(journal):
+    session = AssessmentSession(journal=journal)
+    session.begin()
+    journal.record({"type": "industry", "industry": "FinTech"})
+    journal.record({"type": "task", "task": "criteria", "values": [[["data"], {"checklist_criteria": ["Budget"]}]]})
+    journal.record({"type": "task", "task": "questions:Budget",
+                    "values": [[["artifacts", "questions:Budget"], ["Budget?"]]]})
+    journal.record({"type": "answer", "item": "Budget", "q_idx": 0, "question": "Budget?", "answer": "Approved"})
+
+    restored = AssessmentSession(answer_fn=lambda *args: pytest.fail("answer was journaled"))
+    restored.restore(journal.last_session())
+    assert restored.industry == "FinTech"
+    assert restored.data["checklist_criteria"] == ["Budget"]
+    assert restored.artifacts["questions:Budget"] == ["Budget?"]
+    assert restored.completed_tasks == {"criteria", "questions:Budget"}
+    assert restored.answer("Budget", 0, "Budget?") == "Approved"
+
+
+def test_resumed_workflow_skips_completed_tasks(journal):
+    calls = []
+
+    def task(name, inputs=()):
+        def func(session):
+            calls.append(name)
+            session.artifacts[name] = name.upper()
+        return WorkflowTask(name, func, inputs=inputs, outputs=[name], saves=[("artifacts", name)])
+
+    def tasks():
+        return [task("first"), task("second", ["first"])]
+
+    session = AssessmentSession(journal=journal)
+    session.begin()
+    main.run_workflow(session, tasks()[:1]) # Interrupted after the first task
+
+    resumed = AssessmentSession()
+    resumed.restore(journal.last_session())
+    main.run_workflow(resumed, tasks())
+    assert calls == ["first", "second"]
+    assert resumed.artifacts == {"first": "FIRST", "second": "SECOND"}
+
+
+def test_industry_survives_an_interrupted_checklist_generation(monkeypatch, journal):
+    monkeypatch.setattr(main, "semantic_cache", main.SemanticCache(enabled=False))
+    monkeypatch.setattr(main, "checkpoint_tasks", lambda checklist: [])
+    monkeypatch.setattr(builtins, "input", lambda prompt: "FinTech")
+
+    def interrupted(industry):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(main, "generate_checklist", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        main.run_assessment({}, journal=journal)
+
+    monkeypatch.setattr(builtins, "input", lambda prompt: pytest.fail("industry was journaled"))
+    monkeypatch.setattr(main, "generate_checklist", lambda industry: [f"{industry} compliance"])
+    data = main.run_assessment({}, journal=journal, resume=True)
+    assert data["industry"] == "FinTech"
+    assert data["checklist_criteria"] == ["FinTech compliance"]
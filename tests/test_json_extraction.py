@@ -0,0 +1,86 @@
+import pytest
+
+from main import extract_json_list, extract_json_object, _parse_list_candidate
+
+CHECKLIST = ["Technical feasibility", "Regulatory compliance", "Market demand"]
+
+
+@pytest.mark.parametrize("text", [
+    '["Technical feasibility", "Regulatory compliance", "Market demand"]',
+    '```json\n["Technical feasibility", "Regulatory compliance", "Market demand"]\n```',
+    'Here is the checklist:\n["Technical feasibility", "Regulatory compliance", "Market demand"]\nGood luck!',
+    '["Technical feasibility", "Regulatory compliance", "Market demand",]',
+    "['Technical feasibility', 'Regulatory compliance', 'Market demand']",
+    '[“Technical feasibility”, “Regulatory compliance”, “Market demand”]',
+    '["  Technical feasibility ", "Regulatory compliance", "Market demand", "  "]',
+])
+def test_extract_json_list_repairs(text):
+    assert extract_json_list(text) == CHECKLIST
+
+
+def test_extract_json_list_skips_non_string_arrays():
+    text = 'Scores: [1, 2, 3]. Checklist: ["Technical feasibility", "Regulatory compliance", "Market demand"]'
+    assert extract_json_list(text) == CHECKLIST
+
+
+def test_extract_json_list_ignores_brackets_inside_strings():
+    assert extract_json_list('["Budget [phase 1]", "Team size"]') == ["Budget [phase 1]", "Team size"]
+
+
+def test_extract_json_list_falls_back_to_bulleted_lines():
+    text = "Checklist:\n- Technical feasibility\n* Regulatory compliance\n3. Market demand"
+    assert extract_json_list(text) == CHECKLIST
+
+
+def test_extract_json_list_needs_two_lines_for_the_line_fallback():
+    assert extract_json_list("- Technical feasibility") is None
+
+
+def test_extract_json_list_min_items():
+    assert extract_json_list('["Only one"]', min_items=2) is None
+    assert extract_json_list('["Only one"]') == ["Only one"]
+
+
+@pytest.mark.parametrize("text", [None, "", "No list here.", '["never closed", "list"'])
+def test_extract_json_list_returns_none_without_a_list(text):
+    assert extract_json_list(text) is None
+
+
+def test_parse_list_candidate_rejects_empty_and_mixed_lists():
+    assert _parse_list_candidate("[]") is None
+    assert _parse_list_candidate('["a", 1]') is None
+    assert _parse_list_candidate('{"a": ["b"]}') is None
+
+
+QUESTIONS = {
+    "Technical feasibility": ["Is there a prototype?", "Who owns the architecture?"],
+    "Market demand": ["Who are the first customers?"],
+}
+
+
+@pytest.mark.parametrize("text", [
+    '{"Technical feasibility": ["Is there a prototype?", "Who owns the architecture?"], '
+    '"Market demand": ["Who are the first customers?"]}',
+    '```json\n{"Technical feasibility": ["Is there a prototype?", "Who owns the architecture?"],\n'
+    '"Market demand": ["Who are the first customers?"],}\n```',
+    "Sure! {'Technical feasibility': ['Is there a prototype?', 'Who owns the architecture?'], "
+    "'Market demand': ['Who are the first customers?']} Hope this helps.",
+])
+def test_extract_json_object_repairs(text):
+    assert extract_json_object(text) == QUESTIONS
+
+
+def test_extract_json_object_drops_entries_that_are_not_string_lists():
+    text = '{"Technical feasibility": ["Is there a prototype?"], "Market demand": "none", "Team": [1, 2]}'
+    assert extract_json_object(text) == {"Technical feasibility": ["Is there a prototype?"]}
+
+
+def test_extract_json_object_collects_complete_entries_of_truncated_output():
+    text = ('{"Technical feasibility": ["Is there a prototype?", "Who owns the architecture?"], '
+            '"Market demand": ["Who are the first customers?"], "Regulatory compliance": ["Which lic')
+    assert extract_json_object(text) == QUESTIONS
+
+
+@pytest.mark.parametrize("text", [None, "", "No object here.", '{"a": "b"}', '["a list", "not a mapping"]'])
+def test_extract_json_object_returns_none_without_a_mapping(text):
+    assert extract_json_object(text) is None
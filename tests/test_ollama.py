@@ -0,0 +1,76 @@
+import pytest
+
+import main
+from main import ollama_payload
+
+
+def test_payload_keeps_the_model_loaded_with_the_budgeted_context(monkeypatch):
+    monkeypatch.setattr(main, "OLLAMA_KEEP_ALIVE", "45m")
+    monkeypatch.setattr(main, "OLLAMA_NUM_PREDICT", 256)
+    monkeypatch.setitem(main.PROVIDER_CONTEXT_TOKENS, "ollama", 4096)
+    assert ollama_payload("llama3", "Hello", stream=True) == {
+        "model": "llama3",
+        "prompt": "Hello",
+        "stream": True,
+        "keep_alive": "45m",
+        "options": {"num_ctx": 4096, "num_predict": 256},
+    }
+
+
+def test_json_mode_sets_the_format():
+    assert ollama_payload("llama3", "Hello", stream=False, json_mode=True)["format"] == "json"
+    assert "format" not in ollama_payload("llama3", "Hello", stream=False)
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    def __init__(self):
+        self.posts = []
+
+    def post(self, url, json=None, timeout=None):
+        self.posts.append((url, json))
+        return FakeResponse({"response": " [\"Security\"] "})
+
+
+@pytest.fixture
+def ollama(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setitem(main._provider_clients, "ollama", session)
+    monkeypatch.setitem(main.provider_limiters, "ollama", main.ProviderRateLimiter("ollama"))
+    monkeypatch.setattr(main, "OLLAMA_MODEL", "llama3")
+    monkeypatch.setattr(main, "response_cache", main.ResponseCache())
+    return session
+
+
+def test_query_sends_the_payload_and_caches_json_mode_separately(monkeypatch, ollama):
+    monkeypatch.setattr(main, "response_cache", main.MemoryResponseCache())
+    assert main.query_ollama("Checklist?", json_mode=True) == '["Security"]'
+    assert main.query_ollama("Checklist?") == '["Security"]'
+    assert [payload.get("format") for _, payload in ollama.posts] == ["json", None]
+    assert ollama.posts[0][0].endswith("/api/generate")
+    assert ollama.posts[0][1]["keep_alive"] == main.OLLAMA_KEEP_ALIVE
+
+
+def test_warm_up_loads_the_model_without_generating(ollama):
+    assert main.warm_up_ollama()
+    (url, payload), = ollama.posts
+    assert payload["prompt"] == ""
+    assert payload["options"] == {"num_ctx": main.PROVIDER_CONTEXT_TOKENS["ollama"]}
+    assert payload["keep_alive"] == main.OLLAMA_KEEP_ALIVE
+
+
+def test_disabled_ollama_is_not_queried(monkeypatch, ollama):
+    monkeypatch.setattr(main, "OLLAMA_MODEL", None)
+    assert main.query_ollama("Checklist?") is None
+    assert not main.warm_up_ollama()
+    assert ollama.posts == []
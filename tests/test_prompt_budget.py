@@ -0,0 +1,60 @@
+import pytest
+
+import main
+from main import build_budgeted_prompt, estimate_tokens
+
+TEMPLATE = "Industry: {industry}\nAnswers:\n{verification}\nAnalysis: {analysis}\nPro: {pro_argument}"
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    """
+    Gives the "test" provider a budget of 200 tokens (300 minus a 100-token output reserve).
+    """
+    monkeypatch.setitem(main.PROVIDER_CONTEXT_TOKENS, "test", 300)
+    monkeypatch.setattr(main, "PROMPT_OUTPUT_RESERVE_TOKENS", 100)
+    return 200
+
+
+def sections(verification="Approved.", analysis="Looks fine.", pro="Go ahead."):
+    data = {
+        "industry": "FinTech",
+        "verification_results": {"Budget": {"answers": [{"question": "Budget?", "answer": verification}]}},
+        "gemini_analysis_report": analysis,
+    }
+    result = main.debate_context_sections(data)
+    result["pro_argument"] = {"text": pro, "priority": 3}
+    return result
+
+
+def test_prompt_that_fits_is_unchanged(budget):
+    specs = sections()
+    prompt = build_budgeted_prompt(TEMPLATE, specs, "test")
+    assert prompt == TEMPLATE.format(**{name: spec["text"] for name, spec in specs.items()})
+
+
+def test_oversized_prompt_stays_within_budget(budget):
+    prompt = build_budgeted_prompt(TEMPLATE, sections("a" * 2000, "b" * 2000, "c" * 2000), "test")
+    assert estimate_tokens(prompt) <= budget
+    assert "Industry: FinTech" in prompt
+
+
+def test_derived_text_is_cut_before_the_answers(budget):
+    answer = "The budget was approved by the board in March. " * 3 # Short enough to survive the compact summary
+    prompt = build_budgeted_prompt(TEMPLATE, sections(answer, "b" * 2000, "c" * 2000), "test")
+    assert answer.strip() in prompt # Answers kept in full
+    assert "Analysis: [omitted to fit the context budget]" in prompt
+    assert "c [...truncated]" in prompt
+    assert estimate_tokens(prompt) <= budget
+
+
+def test_analysis_is_truncated_before_the_persona_argument(budget):
+    prompt = build_budgeted_prompt(TEMPLATE, sections(analysis="b" * 700, pro="c" * 100), "test")
+    assert "c" * 100 in prompt
+    assert "[...truncated]" in prompt.split("Analysis: ")[1].split("\nPro:")[0]
+
+
+def test_long_answers_are_shortened_before_anything_is_truncated(budget):
+    prompt = build_budgeted_prompt(TEMPLATE, sections("a" * 900), "test")
+    assert "A: " + "a" * main.COMPACT_ANSWER_CHARS + "...\n" in prompt
+    assert "[...truncated]" not in prompt
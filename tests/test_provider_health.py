@@ -0,0 +1,185 @@
+import pytest
+
+import main
+from main import ProviderHealth
+
+
+@pytest.fixture
+def health(monkeypatch):
+    monkeypatch.setattr(main, "HEALTH_FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(main, "HEALTH_OPEN_SECONDS", 30)
+    monkeypatch.setattr(main, "HEALTH_MAX_OPEN_SECONDS", 600)
+    return ProviderHealth("groq")
+
+
+def open_circuit(health):
+    for _ in range(main.HEALTH_FAILURE_THRESHOLD):
+        health.record(False, 1.0)
+    assert health.state == ProviderHealth.OPEN
+
+
+def expire_cool_down(health):
+    health.opened_at -= health.open_seconds
+
+
+def test_opens_after_consecutive_failures(health):
+    health.record(False, 1.0)
+    health.record(False, 1.0)
+    assert health.state == ProviderHealth.CLOSED
+    health.record(False, 1.0)
+    assert health.state == ProviderHealth.OPEN
+    assert not health.allow_request()
+    assert not health.is_available()
+
+
+def test_success_resets_failure_count(health):
+    health.record(False, 1.0)
+    health.record(False, 1.0)
+    health.record(True, 1.0)
+    health.record(False, 1.0)
+    assert health.state == ProviderHealth.CLOSED
+
+
+def test_half_open_allows_a_single_trial(health):
+    open_circuit(health)
+    expire_cool_down(health)
+    assert health.is_available()
+    assert health.allow_request()
+    assert health.state == ProviderHealth.HALF_OPEN
+    assert not health.allow_request()
+    assert not health.is_available()
+
+
+def test_successful_trial_closes_circuit(health):
+    open_circuit(health)
+    expire_cool_down(health)
+    health.allow_request()
+    health.record(True, 0.5)
+    assert health.state == ProviderHealth.CLOSED
+    assert health.allow_request()
+
+
+def test_failed_trial_reopens_with_doubled_cool_down(health):
+    open_circuit(health)
+    expire_cool_down(health)
+    health.allow_request()
+    health.record(False, 1.0)
+    assert health.state == ProviderHealth.OPEN
+    assert health.open_seconds == 60
+
+
+def test_cached_trial_frees_the_trial_slot(health):
+    open_circuit(health)
+    expire_cool_down(health)
+    health.allow_request()
+    health.record(True, 0.0, cached=True)
+    assert health.state == ProviderHealth.HALF_OPEN
+    assert health.is_available()
+    assert health.allow_request()
+
+
+def test_cache_hits_do_not_change_latency(health):
+    health.record(True, 2.0)
+    health.record(True, 0.0, cached=True)
+    assert health.ewma_latency == 2.0
+    assert health.successes == 1
+
+
+def test_release_trial_frees_the_trial_slot(health):
+    open_circuit(health)
+    expire_cool_down(health)
+    health.allow_request()
+    health.release_trial()
+    assert health.allow_request()
+
+
+def test_ewma_latency_and_routing_latency(health, monkeypatch):
+    monkeypatch.setattr(main, "HEALTH_EWMA_ALPHA", 0.5)
+    health.record(True, 2.0)
+    health.record(True, 4.0)
+    assert health.ewma_latency == pytest.approx(3.0)
+    health.record(False, 3.0)
+    assert health.error_rate == pytest.approx(0.5)
+    assert health.routing_latency() == pytest.approx(4.5)
+
+
+def test_unmeasured_provider_uses_unknown_latency(health, monkeypatch):
+    monkeypatch.setattr(main, "HEALTH_UNKNOWN_LATENCY", 7.0)
+    assert health.routing_latency() == 7.0
+
+
+@pytest.fixture
+def stuck_groq(monkeypatch, health):
+    monkeypatch.setitem(main.provider_health, "groq", health)
+    monkeypatch.setattr(main, "provider_enabled", lambda name: True)
+    open_circuit(health)
+    expire_cool_down(health)
+    health.allow_request()
+    health.trial_started_at -= main.HEALTH_TRIAL_TIMEOUT
+    assert health.trial_stuck()
+    return health
+
+
+def test_probe_closes_stuck_half_open_circuit(monkeypatch, stuck_groq):
+    monkeypatch.setitem(main.PROVIDER_PROBES, "groq", lambda: True)
+    main.probe_open_circuits()
+    assert stuck_groq.state == ProviderHealth.CLOSED
+    assert stuck_groq.allow_request()
+
+
+def test_failed_probe_reopens_stuck_half_open_circuit(monkeypatch, stuck_groq):
+    monkeypatch.setitem(main.PROVIDER_PROBES, "groq", lambda: False)
+    main.probe_open_circuits()
+    assert stuck_groq.state == ProviderHealth.OPEN
+    assert not stuck_groq.trial_in_flight
+
+
+def test_recent_trial_is_not_probed(monkeypatch, health):
+    monkeypatch.setitem(main.provider_health, "groq", health)
+    monkeypatch.setattr(main, "provider_enabled", lambda name: True)
+    probes = []
+    monkeypatch.setitem(main.PROVIDER_PROBES, "groq", lambda: probes.append(1) or True)
+    open_circuit(health)
+    expire_cool_down(health)
+    health.allow_request()
+    main.probe_open_circuits()
+    assert probes == []
+    assert health.state == ProviderHealth.HALF_OPEN
+
+
+@pytest.fixture
+def probed_groq(monkeypatch, health):
+    monkeypatch.setitem(main.provider_health, "groq", health)
+    monkeypatch.setattr(main, "provider_enabled", lambda name: True)
+    probes = []
+    monkeypatch.setitem(main.PROVIDER_PROBES, "groq", lambda: probes.append(1) and False)
+    open_circuit(health)
+    return probes
+
+
+def test_open_circuit_is_probed_only_after_its_cool_down(health, probed_groq):
+    main.probe_open_circuits()
+    assert probed_groq == []
+    expire_cool_down(health)
+    main.probe_open_circuits()
+    assert probed_groq == [1]
+
+
+def test_failed_probes_back_off_like_failed_trials(health, probed_groq):
+    for expected_open_seconds in (60, 120, 240):
+        expire_cool_down(health)
+        main.probe_open_circuits()
+        assert health.state == ProviderHealth.OPEN
+        assert health.open_seconds == expected_open_seconds
+        main.probe_open_circuits() # Not due again until the doubled cool-down has passed
+    assert len(probed_groq) == 3
+
+
+def test_rank_providers_orders_by_latency_and_skips_open(monkeypatch):
+    healths = {name: ProviderHealth(name) for name in ("a", "b", "c")}
+    monkeypatch.setattr(main, "provider_health", healths)
+    monkeypatch.setattr(main, "provider_enabled", lambda name: True)
+    healths["a"].record(True, 3.0)
+    healths["b"].record(True, 1.0)
+    healths["c"].trip()
+    assert main.rank_providers(["a", "b", "c"]) == ["b", "a"]
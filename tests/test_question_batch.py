@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+import main
+from main import _checkpoint_key
+
+CHECKLIST = ["Regulatory compliance", "Budget approval", "Data security"]
+
+
+@pytest.mark.parametrize("reply_key, item", [
+    ("Regulatory compliance", "Regulatory compliance"),
+    ("1. Regulatory Compliance:", "Regulatory compliance"),
+    ("REGULATORY COMPLIANCE.", "Regulatory compliance"),
+    ("E-commerce readiness", "Ecommerce readiness"),
+    ("  **Data Security**  ", "Data security"),
+    ("Budget & approval", "Budget and approval"),
+])
+def test_checkpoint_key_matches_reformatted_items(reply_key, item):
+    assert _checkpoint_key(reply_key) == _checkpoint_key(item)
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Phase 2 trial", "Phase 3 trial"),
+    ("2FA rollout", "FA rollout"),
+    ("Budget approval", "Budget"),
+])
+def test_checkpoint_key_keeps_distinct_items_apart(a, b):
+    assert _checkpoint_key(a) != _checkpoint_key(b)
+
+
+@pytest.fixture
+def dispatch(monkeypatch):
+    """
+    Replaces dispatch_query with scripted replies; returns the list of prompts sent.
+    """
+    monkeypatch.setattr(main, "semantic_cache", main.SemanticCache(path="", enabled=True))
+    prompts = []
+    replies = []
+
+    def fake_dispatch(prompt, **kwargs):
+        prompts.append(prompt)
+        return replies.pop(0)
+    monkeypatch.setattr(main, "dispatch_query", fake_dispatch)
+    return prompts, replies
+
+
+def test_only_failing_checkpoints_are_requested_again(dispatch):
+    prompts, replies = dispatch
+    replies.append(json.dumps({
+        "1. Regulatory Compliance": ["Is there a licence?"],
+        "Budget approval": "not a list",
+    }))
+    batch = main.generate_question_batch(CHECKLIST, "FinTech")
+    assert batch == {"Regulatory compliance": ["Is there a licence?"]}
+    assert len(prompts) == 1
+
+    replies.extend([json.dumps(["Who approved it?"]), json.dumps(["Is data encrypted?"])])
+    questions = {item: main.checkpoint_questions(item, "FinTech", batch) for item in CHECKLIST}
+    assert questions == {
+        "Regulatory compliance": ["Is there a licence?"],
+        "Budget approval": ["Who approved it?"],
+        "Data security": ["Is data encrypted?"],
+    }
+    assert len(prompts) == 3
+    assert "'Budget approval'" in prompts[1]
+    assert "'Data security'" in prompts[2]
+
+
+def test_semantically_cached_items_are_left_out_of_the_batch(dispatch):
+    prompts, replies = dispatch
+    main.semantic_cache.add("questions", ["FinTech", "Regulatory compliance"], ["Is there a licence?"])
+    replies.append(json.dumps({"Budget approval": ["Who approved it?"], "Data security": ["Is data encrypted?"]}))
+
+    batch = main.generate_question_batch(CHECKLIST, "Fin-Tech")
+    assert batch["Regulatory compliance"] == ["Is there a licence?"]
+    assert "- Regulatory compliance" not in prompts[0]
+    assert "- Budget approval" in prompts[0] and "- Data security" in prompts[0]
+
+
+def test_single_pending_item_is_not_batched(dispatch):
+    prompts, _ = dispatch
+    for item in CHECKLIST[:2]:
+        main.semantic_cache.add("questions", ["FinTech", item], ["Q?"])
+    batch = main.generate_question_batch(CHECKLIST, "FinTech")
+    assert set(batch) == set(CHECKLIST[:2])
+    assert prompts == []
+
+
+def test_unparseable_batch_leaves_every_item_to_individual_requests(dispatch):
+    _, replies = dispatch
+    replies.append(None) # No provider returned a usable object
+    assert main.generate_question_batch(CHECKLIST, "FinTech") == {}
@@ -0,0 +1,113 @@
+import pytest
+
+import main
+from main import ProviderRateLimiter
+
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch):
+    monkeypatch.setattr(main, "PROVIDER_INITIAL_CONCURRENCY", 2)
+    monkeypatch.setattr(main, "PROVIDER_MAX_CONCURRENCY", 8)
+    monkeypatch.setattr(main, "RATE_LIMIT_BACKOFF_BASE", 1.0)
+    monkeypatch.setattr(main, "RATE_LIMIT_MAX_BACKOFF", 60.0)
+
+
+def test_request_bucket_refills_over_time(clock):
+    limiter = ProviderRateLimiter("groq", rpm=2)
+    for _ in range(2):
+        assert limiter.acquire(10, max_wait=0)
+        limiter.release(10, used_tokens=10)
+    assert not limiter.acquire(10, max_wait=0)
+    assert limiter.timeouts == 1
+    clock.advance(30) # One request's worth at 2/min
+    assert limiter.acquire(10, max_wait=0)
+
+
+def test_token_bucket_is_corrected_by_actual_usage(clock):
+    limiter = ProviderRateLimiter("groq", tpm=100)
+    assert limiter.acquire(80, max_wait=0)
+    limiter.release(80, used_tokens=20) # 60 reserved tokens come back
+    assert limiter.acquire(80, max_wait=0)
+    limiter.release(80, used_tokens=80)
+    assert not limiter.acquire(80, max_wait=0)
+
+
+def test_concurrency_limit_applies_to_providers_with_a_quota(clock):
+    limiter = ProviderRateLimiter("groq", rpm=100)
+    assert limiter.acquire(1, max_wait=0)
+    assert limiter.acquire(1, max_wait=0)
+    assert not limiter.acquire(1, max_wait=0)
+    limiter.release(1, used_tokens=1)
+    assert limiter.acquire(1, max_wait=0)
+
+
+def test_successes_raise_the_concurrency_limit_up_to_the_maximum(clock):
+    limiter = ProviderRateLimiter("groq", rpm=1000)
+    for _ in range(200):
+        assert limiter.acquire(1, max_wait=0)
+        limiter.release(1, used_tokens=1)
+    assert limiter.concurrency_limit == 8
+
+
+def test_provider_without_quota_is_not_capped(clock):
+    limiter = ProviderRateLimiter("ollama")
+    for _ in range(20):
+        assert limiter.acquire(1, max_wait=0)
+    limiter.release(1, used_tokens=1)
+    assert limiter.snapshot()["concurrency_limit"] is None
+
+
+def test_first_429_caps_an_uncapped_provider_from_its_load(clock):
+    limiter = ProviderRateLimiter("ollama")
+    for _ in range(6):
+        assert limiter.acquire(1, max_wait=0)
+    assert limiter.release(1, retry_after=1.0) == 1.0
+    assert limiter.concurrency_limit == 3 # Six in flight, halved
+
+
+def test_429_halves_the_limit_and_blocks_for_retry_after(clock):
+    limiter = ProviderRateLimiter("groq", rpm=100)
+    assert limiter.acquire(1, max_wait=0)
+    assert limiter.release(1, retry_after=5.0) == 5.0
+    assert limiter.concurrency_limit == 1
+    assert limiter.throttled == 1
+    assert not limiter.acquire(1, max_wait=0)
+    clock.advance(5)
+    assert limiter.acquire(1, max_wait=0)
+
+
+def test_429_without_retry_after_backs_off_exponentially(clock):
+    limiter = ProviderRateLimiter("groq", rpm=100)
+    delays = []
+    for _ in range(3):
+        assert limiter.acquire(1, max_wait=0)
+        delays.append(limiter.release(1, retry_after=0))
+        clock.advance(60) # Past the back-off and refills the request bucket emptied by the 429
+    for attempt, delay in enumerate(delays):
+        assert 0.5 * 2 ** attempt <= delay <= 2 ** attempt
+    assert limiter.acquire(1, max_wait=0)
+    limiter.release(1, used_tokens=1)
+    assert limiter._backoff_attempts == 0
+
+
+def test_slot_is_refused_once_the_deadline_has_passed(clock):
+    limiter = ProviderRateLimiter("groq")
+    main._call_state.queue_timeout = None
+    with main.deadline_scope(main.Deadline(1)):
+        clock.advance(2)
+        with limiter.slot("prompt") as slot:
+            assert not slot.granted
+    assert "deadline reached" in main._call_state.throttled
+    assert limiter.in_flight == 0
+    main._call_state.throttled = None
+
+
+def test_slot_releases_and_reports_429(clock):
+    limiter = ProviderRateLimiter("groq", rpm=100)
+    main._call_state.queue_timeout = None
+    with limiter.slot("prompt") as slot:
+        assert slot.granted
+        main.note_rate_limit(type("RateLimited", (Exception,), {"status_code": 429, "headers": {"retry-after": "3"}})())
+    assert limiter.in_flight == 0
+    assert limiter.throttled == 1
+    main._call_state.rate_limited = None
@@ -0,0 +1,113 @@
+import pytest
+
+import main
+from main import MemoryResponseCache, ResponseCache, SQLiteResponseCache, response_cache_key
+
+
+@pytest.fixture
+def now(monkeypatch):
+    """
+    Replaces time.time, which the caches use for TTLs and LRU order, with a settable clock.
+    """
+    clock = [1000.0]
+    monkeypatch.setattr(main.time, "time", lambda: clock[0])
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        if request.param == "memory":
+            cache = MemoryResponseCache(**kwargs)
+        else:
+            cache = SQLiteResponseCache(path=str(tmp_path / f"cache{len(caches)}.sqlite3"), **kwargs)
+        caches.append(cache)
+        return cache
+    return make
+
+
+def test_key_depends_on_provider_model_prompt_and_extras():
+    key = response_cache_key("groq", "llama", "prompt")
+    assert key == response_cache_key("groq", "llama", "prompt")
+    assert len({key, response_cache_key("cohere", "llama", "prompt"), response_cache_key("groq", "other", "prompt"),
+                response_cache_key("groq", "llama", "prompt 2"), response_cache_key("groq", "llama", "prompt", "json")}) == 5
+
+
+def test_hits_and_misses_are_counted(make_cache):
+    cache = make_cache()
+    assert cache.get("k") is None
+    cache.set("k", "value")
+    assert cache.get("k") == "value"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_none_is_never_stored(make_cache):
+    cache = make_cache()
+    cache.set("k", None)
+    assert cache.get("k") is None
+
+
+def test_entries_expire_after_the_ttl(make_cache, now):
+    cache = make_cache(ttl=60)
+    cache.set("k", "value")
+    now[0] += 59
+    assert cache.get("k") == "value"
+    now[0] += 2
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_entry_is_evicted(make_cache, now):
+    cache = make_cache(max_entries=2)
+    cache.set("a", "A")
+    now[0] += 1
+    cache.set("b", "B")
+    now[0] += 1
+    assert cache.get("a") == "A" # b is now the least recently used
+    now[0] += 1
+    cache.set("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_delete_and_clear(make_cache):
+    cache = make_cache()
+    cache.set("a", "A")
+    cache.set("b", "B")
+    cache.delete("a")
+    cache.delete(None) # From a provider call that never looked anything up
+    assert cache.get("a") is None
+    assert cache.get("b") == "B"
+    cache.clear()
+    assert cache.get("b") is None
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteResponseCache(path=path).set("k", "value")
+    assert SQLiteResponseCache(path=path).get("k") == "value"
+
+
+def test_none_backend_stores_nothing():
+    cache = main.create_response_cache("none")
+    assert type(cache) is ResponseCache
+    cache.set("k", "value")
+    assert cache.get("k") is None
+    assert cache.stats()["backend"] == "ResponseCache"
+
+
+def test_unknown_backend_falls_back_to_memory():
+    assert isinstance(main.create_response_cache("redis"), MemoryResponseCache)
+
+
+def test_cache_hit_is_flagged_for_the_calling_thread(make_cache):
+    cache = make_cache()
+    cache.set("k", "value")
+    main._call_state.cache_hit = False
+    cache.get("k")
+    assert main._call_state.cache_hit
@@ -0,0 +1,90 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import main
+from main import SemanticCache
+
+CHECKLIST = ["Security", "Budget"]
+
+
+def make_cache(**kwargs):
+    return SemanticCache(**{"path": "", "enabled": True, **kwargs})
+
+
+@pytest.mark.parametrize("stored, industry", [
+    ("FinTech", "fintech"), ("FinTech", "Fin-Tech"), ("FinTech", " FinTech "), ("Healthcare", "health care"),
+])
+def test_spelling_variants_hit(stored, industry):
+    cache = make_cache()
+    cache.add("checklist", [stored], CHECKLIST)
+    assert cache.lookup("checklist", industry) == CHECKLIST
+
+
+def test_dissimilar_industry_misses():
+    cache = make_cache()
+    cache.add("checklist", ["FinTech"], CHECKLIST)
+    assert cache.lookup("checklist", "Healthcare") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_threshold_decides_a_hit():
+    strict, loose = make_cache(threshold=0.99), make_cache(threshold=0.5)
+    for cache in (strict, loose):
+        cache.add("checklist", ["Retail banking"], CHECKLIST)
+    assert strict.lookup("checklist", "Retail bank") is None
+    assert loose.lookup("checklist", "Retail bank") == CHECKLIST
+
+
+def test_numbers_must_match():
+    cache = make_cache(threshold=0.5)
+    cache.add("questions", ["Healthcare", "Phase 2 trial"], ["Q?"])
+    assert cache.lookup("questions", "Healthcare", "Phase 3 trial") is None
+    assert cache.lookup("questions", "Healthcare", "phase 2 trial") == ["Q?"]
+
+
+def test_every_key_text_must_be_similar():
+    cache = make_cache()
+    cache.add("questions", ["FinTech", "Security"], ["Q?"])
+    assert cache.lookup("questions", "fintech", "Budget") is None
+    assert cache.lookup("checklist", "fintech") is None # Other kinds never match
+
+
+def test_least_recently_used_entry_is_replaced(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(main.time, "time", lambda: now[0])
+    cache = make_cache(max_entries=2)
+    for industry in ("FinTech", "Healthcare"):
+        cache.add("checklist", [industry], [industry])
+        now[0] += 1
+    assert cache.lookup("checklist", "fintech") == ["FinTech"] # Healthcare is now the oldest
+    now[0] += 1
+    cache.add("checklist", ["Agriculture"], ["Agriculture"])
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.lookup("checklist", "Healthcare") is None
+    assert cache.lookup("checklist", "FinTech") == ["FinTech"]
+    assert cache.lookup("checklist", "Agriculture") == ["Agriculture"]
+
+
+def test_expired_entries_are_not_served(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(main.time, "time", lambda: now[0])
+    cache = make_cache(ttl=60)
+    cache.add("checklist", ["FinTech"], CHECKLIST)
+    now[0] += 61
+    assert cache.lookup("checklist", "FinTech") is None
+
+
+def test_returned_values_are_copies():
+    cache = make_cache()
+    cache.add("checklist", ["FinTech"], CHECKLIST)
+    cache.lookup("checklist", "FinTech").append("Mutated")
+    assert cache.lookup("checklist", "FinTech") == CHECKLIST
+
+
+def test_disabled_cache_stores_nothing():
+    cache = make_cache(enabled=False)
+    cache.add("checklist", ["FinTech"], CHECKLIST)
+    assert cache.lookup("checklist", "FinTech") is None
+    assert cache.stats()["entries"] == 0
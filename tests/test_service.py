@@ -0,0 +1,131 @@
+import json
+import threading
+import http.client
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import main
+import service
+from benchmark import scripted_response
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """
+    Only groq is enabled, without rate limits or caches; tests install its query function.
+    """
+    monkeypatch.setattr(main, "provider_enabled", lambda name: name == "groq")
+    monkeypatch.setattr(main, "STREAM_OUTPUT", False)
+    monkeypatch.setattr(main, "PROVIDER_DISPATCH_MODE", "sequential")
+    monkeypatch.setitem(main.provider_health, "groq", main.ProviderHealth("groq"))
+    monkeypatch.setitem(main.provider_limiters, "groq", main.ProviderRateLimiter("groq"))
+    monkeypatch.setattr(main, "response_cache", main.ResponseCache())
+    monkeypatch.setattr(main, "semantic_cache", main.SemanticCache(enabled=False))
+    monkeypatch.setattr(main, "metrics", main.RunMetrics())
+    monkeypatch.setattr(service, "SERVICE_ANSWER_TIMEOUT", 0.2)
+
+
+@pytest.fixture
+def server():
+    """
+    Serves a registry with two session slots on a free local port.
+    """
+    registry = service.SessionRegistry(max_sessions=2)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), service.make_handler(registry))
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield registry, httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def request(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    payload = response.read().decode()
+    conn.close()
+    return response.status, payload
+
+
+class FinishedSession:
+    """
+    Stands in for a ServiceSession whose workflow has already printed three events.
+    """
+
+    def __init__(self):
+        self.id = "abc123"
+        self.status = "complete"
+        self.error = None
+        self.finished = 1.0
+        self.events = [{"task": "conclusion", "text": f"line {idx}"} for idx in range(3)]
+
+    def events_after(self, seq, timeout):
+        return self.events[seq:], True
+
+
+def test_concurrent_sessions_reach_concurrent_provider_calls(monkeypatch, offline):
+    sessions = 12 # More than any fixed-size pool the workflow used to share
+    lock = threading.Lock()
+    all_in = threading.Event()
+    state = {"in_flight": 0, "peak": 0}
+
+    def query(prompt, **options):
+        with lock:
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+            if state["peak"] >= sessions:
+                all_in.set()
+        all_in.wait(5)
+        with lock:
+            state["in_flight"] -= 1
+        return scripted_response(prompt)
+    monkeypatch.setitem(main.PROVIDER_QUERIES, "groq", query)
+
+    registry = service.SessionRegistry(max_sessions=sessions)
+    created = [registry.create(f"Industry {idx}") for idx in range(sessions)]
+    assert all_in.wait(10)
+    assert state["peak"] == sessions
+    registry._executor.shutdown(wait=True) # Unanswered sessions time out after 0.2s
+    assert all(session.finished for session in created)
+
+
+def test_invalid_json_body_is_rejected(server):
+    _, port = server
+    status, payload = request(port, "POST", "/assessments", body="{not json")
+    assert status == 400
+    assert "Invalid JSON body" in json.loads(payload)["error"]
+
+
+@pytest.mark.parametrize("body", [{"industry": "  "}, {"industry": "Retail", "checklist_criteria": "Safety"}])
+def test_invalid_assessment_request_is_rejected(server, body):
+    _, port = server
+    status, _ = request(port, "POST", "/assessments", body=json.dumps(body))
+    assert status == 400
+
+
+@pytest.mark.parametrize("path", ["/assessments/0123456789ab", "/nowhere"])
+def test_unknown_paths_are_not_found(server, path):
+    _, port = server
+    status, _ = request(port, "GET", path)
+    assert status == 404
+
+
+def test_full_registry_answers_service_unavailable(monkeypatch, server):
+    registry, port = server
+    monkeypatch.setattr(registry, "_active_count", lambda: registry.max_sessions)
+    status, payload = request(port, "POST", "/assessments", body=json.dumps({"industry": "Retail"}))
+    assert status == 503
+    assert "2 session slots" in json.loads(payload)["error"]
+
+
+def test_event_stream_resumes_after_the_given_event(server):
+    registry, port = server
+    registry._sessions["abc123"] = FinishedSession()
+    status, payload = request(port, "GET", "/assessments/abc123/events?after=1")
+    assert status == 200
+    messages = payload.strip().split("\n\n")
+    assert messages[0] == 'id: 2\ndata: {"task": "conclusion", "text": "line 1"}'
+    assert messages[1].startswith("id: 3\n")
+    assert messages[2] == 'event: end\ndata: {"status": "complete", "error": null}'
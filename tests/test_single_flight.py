@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import pytest
+
+from main import SingleFlight
+
+
+def wait_until(predicate, timeout=5):
+    give_up = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < give_up, "timed out"
+        time.sleep(0.001)
+
+
+def test_single_caller_runs_the_call():
+    flights = SingleFlight()
+    assert flights.do("key", lambda a, b=0: a + b, 1, b=2) == (3, False)
+    assert flights.stats() == {"leaders": 1, "coalesced": 0, "in_flight": 0}
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow_call():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(flights.do, "key", slow_call)
+        wait_until(lambda: flights.stats()["in_flight"] == 1)
+        followers = [pool.submit(flights.do, "key", slow_call) for _ in range(3)]
+        wait_until(lambda: flights.stats()["coalesced"] == 3)
+        release.set()
+        assert leader.result(5) == ("result", False)
+        assert [f.result(5) for f in followers] == [("result", True)] * 3
+    assert calls == [1]
+    assert flights.stats() == {"leaders": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_different_keys_do_not_share():
+    flights = SingleFlight()
+    assert flights.do("a", lambda: 1) == (1, False)
+    assert flights.do("b", lambda: 2) == (2, False)
+    assert flights.stats()["leaders"] == 2
+
+
+def test_finished_calls_are_not_reused():
+    flights = SingleFlight()
+    results = iter([1, 2])
+    assert flights.do("key", lambda: next(results)) == (1, False)
+    assert flights.do("key", lambda: next(results)) == (2, False)
+
+
+def test_leader_exception_reaches_waiters():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def failing_call():
+        release.wait(5)
+        raise ValueError("provider down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.do, "key", failing_call)
+        wait_until(lambda: flights.stats()["in_flight"] == 1)
+        follower = pool.submit(flights.do, "key", failing_call)
+        wait_until(lambda: flights.stats()["coalesced"] == 1)
+        release.set()
+        with pytest.raises(ValueError):
+            leader.result(5)
+        with pytest.raises(ValueError):
+            follower.result(5)
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_waiter_timeout_leaves_the_leader_running():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(flights.do, "key", lambda: release.wait(5) and "done")
+        wait_until(lambda: flights.stats()["in_flight"] == 1)
+        with pytest.raises(FutureTimeoutError):
+            flights.do("key", lambda: "never called", timeout=0.05)
+        release.set()
+        assert leader.result(5) == ("done", False)
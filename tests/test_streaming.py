@@ -0,0 +1,51 @@
+import pytest
+
+import main
+
+
+@pytest.fixture
+def groq(monkeypatch):
+    health = main.ProviderHealth("groq")
+    monkeypatch.setitem(main.provider_health, "groq", health)
+    monkeypatch.setattr(main, "provider_enabled", lambda name: True)
+    monkeypatch.setattr(main, "STREAM_OUTPUT", True)
+    monkeypatch.setattr(main, "metrics", main.RunMetrics())
+    return health
+
+
+def test_completed_stream_is_a_success(monkeypatch, groq):
+    def stream(prompt):
+        yield "Hello, "
+        yield "world."
+        main._call_state.stream_completed = True
+    monkeypatch.setitem(main.PROVIDER_STREAMS, "groq", stream)
+
+    assert main.stream_and_print("groq", "prompt", purpose="test") == "Hello, world."
+    assert groq.successes == 1
+    assert groq.failures == 0
+
+
+def test_stream_failing_midway_is_marked_and_recorded_as_failure(monkeypatch, groq):
+    def stream(prompt):
+        yield "Partial "
+        yield "answer"
+        main.logger.error("Groq streaming request failed: connection reset")
+    monkeypatch.setitem(main.PROVIDER_STREAMS, "groq", stream)
+
+    text = main.stream_and_print("groq", "prompt", purpose="test")
+    assert text.startswith("Partial answer")
+    assert "[Incomplete response: the groq stream stopped early" in text
+    assert "connection reset" in text
+    assert groq.failures == 1
+    assert groq.successes == 0
+
+
+def test_empty_failed_stream_returns_none(monkeypatch, groq):
+    def stream(prompt):
+        main.logger.error("Groq streaming request failed: 500")
+        return
+        yield
+    monkeypatch.setitem(main.PROVIDER_STREAMS, "groq", stream)
+
+    assert main.stream_and_print("groq", "prompt", purpose="test") is None
+    assert groq.failures == 1